@@ -11,16 +11,20 @@ import json
 import base64
 import time
 import requests
+import cv2
 from PIL import Image
 
+from Functions.Vision.roi import crop_to_roi
+
 class AllergyChecker:
-    def __init__(self, api_key=None, user_data_path="../current_user.json"):
+    def __init__(self, api_key=None, user_data_path="../current_user.json", crop_roi=True):
         """
         Initialize allergy checker with OpenRouter API.
         
         Args:
             api_key (str): OpenRouter API key (or set OPENROUTER_API_KEY env var)
             user_data_path (str): Path to current_user.json file
+            crop_roi (bool): Send only the detected label/food region to the model
         """
         # Get API key from parameter or environment
         self.api_key = api_key or os.getenv('OPENROUTER_API_KEY')
@@ -37,6 +41,10 @@ class AllergyChecker:
             user_data_path
         )
         self.current_user = self.load_user_data()
+        self.crop_roi = crop_roi
+        
+        # Reused connection pool: TLS is negotiated once (or ahead of time by warm_up)
+        self.session = requests.Session()
         
     def load_user_data(self):
         """Load current user allergy data from JSON file."""
@@ -50,10 +58,49 @@ class AllergyChecker:
             print(f"Error loading user data: {e}")
             return {"name": "Guest", "allergies": [], "conditions": [], "medications": []}
     
+    def warm_up(self):
+        """
+        Open the TLS connection to the API ahead of a request (e.g. while the
+        wake phrase is still being spoken) so the analysis call skips the handshake.
+        
+        Returns:
+            bool: True if the connection is now open
+        """
+        try:
+            # Any response will do; the point is the pooled keep-alive connection
+            self.session.head(self.api_url, timeout=5)
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"API warm-up failed: {e}")
+            return False
+    
     def get_all_allergies(self):
         """Get allergies for the current logged-in user."""
         return self.current_user.get('allergies', [])
     
+    def load_image_bytes(self, image_path):
+        """
+        Load the JPEG bytes to send for analysis, cropped to the ROI if enabled.
+        
+        Args:
+            image_path (str): Path to food image
+            
+        Returns:
+            bytes: JPEG-encoded image data
+        """
+        if self.crop_roi:
+            image = cv2.imread(image_path)
+            if image is not None:
+                cropped, roi = crop_to_roi(image)
+                if roi:
+                    ok, encoded = cv2.imencode('.jpg', cropped, [cv2.IMWRITE_JPEG_QUALITY, 90])
+                    if ok:
+                        print(f"Cropped to {roi['kind']} region {roi['bbox']}")
+                        return encoded.tobytes()
+        
+        with open(image_path, 'rb') as f:
+            return f.read()
+    
     def check_food_safety(self, image_path):
         """
         Analyze food image and check for allergens.
@@ -85,9 +132,8 @@ class AllergyChecker:
         print(f"Checking for allergies: {', '.join(allergies)}")
         
         try:
-            # Load image and encode as base64
-            with open(image_path, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
+            # Load image (cropped to the region of interest) and encode as base64
+            image_data = base64.b64encode(self.load_image_bytes(image_path)).decode('utf-8')
             
             # Create prompt for Gemini
             prompt = f"""FOOD ANALYSIS AND ALLERGEN DETECTION TASK
@@ -156,7 +202,7 @@ Respond in this EXACT JSON format:
             
             for attempt in range(max_retries):
                 try:
-                    resp = requests.post(self.api_url, headers=headers, json=payload, timeout=60)
+                    resp = self.session.post(self.api_url, headers=headers, json=payload, timeout=60)
                     
                     if resp.status_code == 429:
                         if attempt < max_retries - 1:
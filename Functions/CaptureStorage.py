@@ -0,0 +1,332 @@
+"""
+Capture storage manager
+Keeps captured photos within size/age quotas, skips byte-identical
+duplicates by content hash and maintains small thumbnails plus an index for
+fast listing
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime
+
+# Files this storage manages: "<prefix>_<YYYYmmdd>_<HHMMSS>[_<hash>[_<n>]].jpg"
+# (older captures have no hash). Anything else in the directory is left alone.
+CAPTURE_NAME_RE = re.compile(r'^[A-Za-z]+_\d{8}_\d{6}(?:_[0-9a-f]{8}(?:_\d+)?)?\.(?:jpe?g|png)$', re.IGNORECASE)
+
+
+def _is_capture(name):
+    return CAPTURE_NAME_RE.match(name) is not None
+
+
+class CaptureStorage:
+    def __init__(self, root, max_bytes=200 * 1024 * 1024, max_age_days=7,
+                 max_files=None, thumbnail_size=(160, 120), jpeg_quality=90):
+        """
+        Initialize capture storage.
+
+        Args:
+            root (str): Directory holding the captures
+            max_bytes (int): Maximum total size of stored captures (None for no limit)
+            max_age_days (float): Delete captures older than this (None for no limit);
+                captures found on disk when the index is first built get this long
+                from then, not from their file date
+            max_files (int): Maximum number of stored captures (None for no limit)
+            thumbnail_size (tuple): Bounding box (width, height) for thumbnails
+            jpeg_quality (int): JPEG quality used when saving images
+        """
+        self.root = root
+        self.thumb_dir = os.path.join(root, "thumbs")
+        self.index_path = os.path.join(root, "index.json")
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.max_files = max_files
+        self.thumbnail_size = thumbnail_size
+        self.jpeg_quality = jpeg_quality
+
+        self.lock = threading.RLock()
+        self.compaction_thread = None
+        self.stop_event = threading.Event()
+
+        os.makedirs(self.thumb_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        """Load the capture index, rebuilding it from disk if missing or corrupt."""
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Capture index unreadable, rebuilding: {e}")
+
+        index = {}
+        now = time.time()
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not _is_capture(name) or not os.path.isfile(path):
+                continue
+            with open(path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            index[digest] = {
+                'filename': name,
+                'thumbnail': None,
+                'size': os.path.getsize(path),
+                'created': os.path.getmtime(path),
+                'adopted': now
+            }
+        if index:
+            print(f"Capture storage: indexed {len(index)} existing capture(s)")
+        self.index = index
+        self._save_index()
+        return index
+
+    def _save_index(self):
+        """Write the index atomically."""
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _write_atomic(self, path, data):
+        """Write bytes so readers never see a partial file."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _make_thumbnail(self, image, name):
+        """Write a thumbnail for image and return its filename."""
+        height, width = image.shape[:2]
+        scale = min(self.thumbnail_size[0] / width, self.thumbnail_size[1] / height, 1.0)
+        thumb = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode('.jpg', thumb, [cv2.IMWRITE_JPEG_QUALITY, 75])
+        if not ok:
+            return None
+        self._write_atomic(os.path.join(self.thumb_dir, name), encoded.tobytes())
+        return name
+
+    def save(self, image, prefix="capture", dedup=True):
+        """
+        Save an image, reusing the existing file if identical content is stored.
+
+        Args:
+            image (numpy.ndarray): BGR image to save
+            prefix (str): Filename prefix (e.g. "wake", "photo")
+            dedup (bool): Reuse a stored file with identical bytes; False always
+                writes a new file (for captures that are analysed afterwards)
+
+        Returns:
+            str: Path to the stored image, or None if failed
+        """
+        try:
+            ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                print("Error: Failed to encode image")
+                return None
+            data = encoded.tobytes()
+            digest = hashlib.sha1(data).hexdigest()
+
+            with self.lock:
+                existing = self.index.get(digest)
+                if existing and os.path.exists(os.path.join(self.root, existing['filename'])):
+                    if dedup:
+                        print(f"Duplicate capture, reusing: {existing['filename']}")
+                        return os.path.join(self.root, existing['filename'])
+                    # Keep both entries: the index is keyed by content hash
+                    digest = f"{digest}_{time.time_ns()}"
+
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"{prefix}_{timestamp}_{digest[:8]}.jpg"
+                count = 1
+                while os.path.exists(os.path.join(self.root, filename)):
+                    # Same frame saved again within the second (dedup=False)
+                    filename = f"{prefix}_{timestamp}_{digest[:8]}_{count}.jpg"
+                    count += 1
+                filepath = os.path.join(self.root, filename)
+                self._write_atomic(filepath, data)
+
+                self.index[digest] = {
+                    'filename': filename,
+                    'thumbnail': self._make_thumbnail(image, filename),
+                    'size': len(data),
+                    'created': time.time()
+                }
+                # The new capture itself is never evicted, so the returned path stays valid
+                self.enforce_quota(save=False, keep=digest)
+                self._save_index()
+
+            print(f"Image saved to: {filepath}")
+            return filepath
+        except Exception as e:
+            print(f"Error saving capture: {e}")
+            return None
+
+    def list_captures(self, newest_first=True):
+        """
+        List stored captures from the index without scanning the directory.
+
+        Args:
+            newest_first (bool): Sort newest capture first
+
+        Returns:
+            list: Dicts with path, thumbnail, size, created and hash
+        """
+        with self.lock:
+            entries = [
+                {
+                    'path': os.path.join(self.root, entry['filename']),
+                    'thumbnail': os.path.join(self.thumb_dir, entry['thumbnail']) if entry['thumbnail'] else None,
+                    'size': entry['size'],
+                    'created': entry['created'],
+                    'hash': digest
+                }
+                for digest, entry in self.index.items()
+            ]
+        entries.sort(key=lambda e: e['created'], reverse=newest_first)
+        return entries
+
+    def total_bytes(self):
+        """Total size of stored captures in bytes."""
+        with self.lock:
+            return sum(entry['size'] for entry in self.index.values())
+
+    def _remove(self, digest):
+        """Delete a capture and its thumbnail."""
+        entry = self.index.pop(digest)
+        paths = [os.path.join(self.root, entry['filename'])]
+        if entry['thumbnail']:
+            paths.append(os.path.join(self.thumb_dir, entry['thumbnail']))
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def enforce_quota(self, save=True, keep=None):
+        """
+        Delete expired captures, then the oldest ones until within quota.
+
+        Args:
+            save (bool): Write the index afterwards
+            keep (str): Hash of a capture that must not be removed
+
+        Returns:
+            int: Number of captures removed
+        """
+        removed = 0
+        with self.lock:
+            oldest_first = sorted((d for d in self.index if d != keep), key=lambda d: self.index[d]['created'])
+
+            if self.max_age_days is not None:
+                cutoff = time.time() - self.max_age_days * 86400
+                for digest in list(oldest_first):
+                    entry = self.index[digest]
+                    # Captures adopted from disk age from when they were indexed
+                    if max(entry['created'], entry.get('adopted', 0)) >= cutoff:
+                        continue
+                    self._remove(digest)
+                    oldest_first.remove(digest)
+                    removed += 1
+
+            total = sum(entry['size'] for entry in self.index.values())
+            while oldest_first and (
+                (self.max_bytes is not None and total > self.max_bytes) or
+                (self.max_files is not None and len(self.index) > self.max_files)
+            ):
+                digest = oldest_first.pop(0)
+                total -= self.index[digest]['size']
+                self._remove(digest)
+                removed += 1
+
+            if removed and save:
+                self._save_index()
+
+        if removed:
+            print(f"Capture storage: removed {removed} old capture(s)")
+        return removed
+
+    def compact(self):
+        """
+        Reconcile the index with the disk and enforce quotas.
+
+        Drops index entries whose file is gone, deletes untracked capture
+        files (see CAPTURE_NAME_RE), thumbnails and stale temp files, and
+        regenerates missing thumbnails. Other files are never touched.
+        """
+        with self.lock:
+            tracked = {entry['filename'] for entry in self.index.values()}
+
+            for digest in list(self.index):
+                entry = self.index[digest]
+                path = os.path.join(self.root, entry['filename'])
+                if not os.path.exists(path):
+                    del self.index[digest]
+                    tracked.discard(entry['filename'])
+                elif not entry['thumbnail'] or not os.path.exists(os.path.join(self.thumb_dir, entry['thumbnail'])):
+                    image = cv2.imread(path)
+                    if image is not None:
+                        entry['thumbnail'] = self._make_thumbnail(image, entry['filename'])
+
+            index_tmp = os.path.basename(self.index_path) + ".tmp"
+            for directory in (self.root, self.thumb_dir):
+                for name in os.listdir(directory):
+                    path = os.path.join(directory, name)
+                    if not os.path.isfile(path):
+                        continue
+                    if name.endswith(".tmp"):
+                        stale = name == index_tmp or _is_capture(name[:-len(".tmp")])
+                    else:
+                        stale = _is_capture(name) and name not in tracked
+                    if stale:
+                        os.remove(path)
+
+            self.enforce_quota(save=False)
+            self._save_index()
+
+    def start_background_compaction(self, interval=300):
+        """
+        Run compact() periodically on a daemon thread.
+
+        Args:
+            interval (float): Seconds between compaction passes
+        """
+        if self.compaction_thread and self.compaction_thread.is_alive():
+            return
+
+        def run():
+            while not self.stop_event.wait(interval):
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"Capture compaction failed: {e}")
+
+        self.stop_event.clear()
+        self.compaction_thread = threading.Thread(target=run, name="CaptureCompaction", daemon=True)
+        self.compaction_thread.start()
+
+    def stop(self):
+        """Stop background compaction."""
+        self.stop_event.set()
+        if self.compaction_thread:
+            self.compaction_thread.join(timeout=5)
+            self.compaction_thread = None
+
+
+if __name__ == "__main__":
+    # Show what is stored and compact it
+    storage = CaptureStorage(sys.argv[1] if len(sys.argv) > 1 else "/tmp/baymin_captures")
+    storage.compact()
+    captures = storage.list_captures()
+    print(f"{len(captures)} capture(s), {storage.total_bytes() / 1024:.0f} KB")
+    for capture in captures[:10]:
+        print(f"  {os.path.basename(capture['path'])}  {capture['size'] / 1024:.0f} KB")
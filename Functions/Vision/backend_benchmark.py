@@ -0,0 +1,109 @@
+"""
+Benchmark OCR inference backends
+Runs each backend in its own process (so memory numbers don't mix) on the
+same synthetic labels and reports load time, peak memory, latency and
+character accuracy
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+
+from Functions.Vision.ocr_corpus import LABEL_LINES, char_accuracy, render_label
+from Functions.Vision.reader_registry import LOADERS
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB (ru_maxrss is KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(backend, samples, scale, preprocess, queue):
+    """Child process: load one backend and time it on the synthetic labels."""
+    from Functions.Vision.ocr_reader import OCRReader
+
+    images = [render_label(LABEL_LINES, seed=i, scale=scale) for i in range(samples)]
+    baseline = _peak_rss_mb()
+
+    start = time.perf_counter()
+    ocr = OCRReader(use_roi=False, preprocess=preprocess, backend=backend)
+    if not ocr.initialize():
+        queue.put({'backend': backend, 'error': 'failed to load'})
+        return
+    load_s = time.perf_counter() - start
+    loaded_mb = _peak_rss_mb()
+
+    ocr.read_text(images[0])  # warm-up
+
+    latencies, accuracy = [], []
+    for image in images:
+        start = time.perf_counter()
+        results = ocr.read_text(image)
+        latencies.append((time.perf_counter() - start) * 1000)
+        accuracy.append(char_accuracy(results, LABEL_LINES))
+
+    queue.put({
+        'backend': backend,
+        'load_s': load_s,
+        'model_mb': loaded_mb - baseline,
+        'peak_mb': _peak_rss_mb(),
+        'mean_ms': float(np.mean(latencies)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'accuracy': float(np.mean(accuracy))
+    })
+
+
+def run(backends, samples=10, scale=1.0, preprocess='label'):
+    """
+    Benchmark each backend in a fresh process.
+
+    Returns:
+        list: Dicts with backend, load_s, model_mb, peak_mb, mean_ms, p95_ms
+              and accuracy (or error)
+    """
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    for backend in backends:
+        queue = context.Queue()
+        process = context.Process(target=_measure, args=(backend, samples, scale, preprocess, queue))
+        process.start()
+        process.join()
+        rows.append(queue.get() if not queue.empty()
+                    else {'backend': backend, 'error': f'exit code {process.exitcode}'})
+    return rows
+
+
+def main():
+    """Print a load/memory/latency/accuracy table for the OCR backends."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='OCR backend benchmark')
+    parser.add_argument('--backends', default=','.join(LOADERS),
+                        help='Comma-separated backends to compare')
+    parser.add_argument('--samples', type=int, default=10, help='Synthetic labels per backend')
+    parser.add_argument('--scale', type=float, default=1.0, help='Text size multiplier')
+    parser.add_argument('--preprocess', default='label', help='Preprocessing preset')
+
+    args = parser.parse_args()
+    rows = run(args.backends.split(','), samples=args.samples, scale=args.scale,
+               preprocess=args.preprocess)
+
+    print(f"\n{'Backend':<10} {'Load s':>7} {'Model MB':>9} {'Peak MB':>8} "
+          f"{'Mean ms':>8} {'p95 ms':>8} {'Char acc':>9}")
+    print("-" * 65)
+    for row in rows:
+        if 'error' in row:
+            print(f"{row['backend']:<10} {row['error']}")
+            continue
+        print(f"{row['backend']:<10} {row['load_s']:>7.1f} {row['model_mb']:>9.0f} {row['peak_mb']:>8.0f} "
+              f"{row['mean_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['accuracy']:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
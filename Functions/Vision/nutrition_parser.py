@@ -0,0 +1,269 @@
+"""
+Nutrition label parser
+Turns EasyOCR results into typed nutrition facts by grouping boxes into
+rows with their geometry and pairing each nutrient label with its amount,
+unit and %DV, plus serving size and allergen statements
+"""
+
+import re
+
+# Most specific names first so "Saturated Fat" doesn't match "Fat"
+NUTRIENT_PATTERNS = [
+    ('saturated_fat', r'sat(?:urated|\.)?\s*fat'),
+    ('trans_fat', r'trans\.?\s*fat'),
+    ('polyunsaturated_fat', r'poly(?:unsaturated)?\s*fat'),
+    ('monounsaturated_fat', r'mono(?:unsaturated)?\s*fat'),
+    ('total_fat', r'(?:total\s*)?fat'),
+    ('cholesterol', r'cholest\w*'),
+    ('sodium', r'sodium'),
+    ('dietary_fiber', r'(?:dietary\s*)?fib(?:er|re)'),
+    ('added_sugars', r'added\s*sugars?'),
+    ('total_sugars', r'(?:total\s*)?sugars?'),
+    ('total_carbohydrate', r'(?:total\s*)?carb\w*'),
+    ('protein', r'protein'),
+    ('vitamin_d', r'vit(?:amin|\.)?\s*d'),
+    ('calcium', r'calcium'),
+    ('iron', r'iron'),
+    ('potassium', r'potassium'),
+]
+
+# One pass per row instead of a chain of substring checks
+NUTRIENT_RE = re.compile(
+    r'\b(?:' + '|'.join(f'(?P<{key}>{pattern})' for key, pattern in NUTRIENT_PATTERNS) + r')\b',
+    re.IGNORECASE
+)
+CALORIES_RE = re.compile(r'\b(?:calories|energy)\b', re.IGNORECASE)
+# "Calories from Fat 90" (with its amount) is neither the calorie count nor a fat amount
+CALORIES_FROM_RE = re.compile(r'calories\s*from\s*(?:sat(?:urated|\.)?\s*)?\w+\s*:?\s*(?:\d+(?:[.,]\d+)?\s*(?:kcal)?)?',
+                              re.IGNORECASE)
+KCAL_RE = re.compile(r'(\d+(?:[.,]\d+)?)\s*kcal', re.IGNORECASE)
+# The number right after the label ("Calories 250"), but not a nutrient amount or %DV
+CALORIES_VALUE_RE = re.compile(r'\s*:?\s*(\d+(?:[.,]\d+)?)(?![\d.,])(?!\s*(?:%|(?:mg|mcg|µg|ug|g|kj|iu)\b))',
+                               re.IGNORECASE)
+# Large-print labels put the calorie number alone on the next row
+BARE_NUMBER_RE = re.compile(r'^\s*(\d+(?:[.,]\d+)?)\s*(?:kcal)?\s*$', re.IGNORECASE)
+AMOUNT_RE = re.compile(r'(<\s*)?(\d+(?:[.,]\d+)?)\s*(mg|mcg|µg|ug|g|kcal|kj|iu)?(?![\w%])', re.IGNORECASE)
+PERCENT_RE = re.compile(r'(\d+(?:[.,]\d+)?)\s*%')
+SERVING_SIZE_RE = re.compile(r'serving\s*size\s*:?\s*(.+)', re.IGNORECASE)
+SERVINGS_RE = re.compile(r'(\d+(?:[.,]\d+)?)\s*servings?\s*per\s*container'
+                         r'|servings?\s*per\s*container\s*:?\s*(?:about\s*)?(\d+(?:[.,]\d+)?)',
+                         re.IGNORECASE)
+MAY_CONTAIN_RE = re.compile(r'may\s*contain\s*:?\s*([^.]+)', re.IGNORECASE)
+# The allergen statement: a row starting "Contains" or "Contains:" anywhere, but
+# not ingredient wording such as "Contains 2% or less of salt"
+CONTAINS_RE = re.compile(r'(?:^\s*contains\b\s*:?|(?<!may )\bcontains\s*:)'
+                         r'(?!\s*\d+(?:[.,]\d+)?\s*%\s*or\s*less)\s*([^.]+)', re.IGNORECASE)
+# Ingredient lists mention nutrients ("sugar ... 2%") without giving amounts
+INGREDIENTS_RE = re.compile(r'^\s*ingredients\b', re.IGNORECASE)
+ALLERGEN_SPLIT_RE = re.compile(r'\s*(?:,|;|\band\b|&)\s*', re.IGNORECASE)
+
+# Common OCR confusions inside numbers (e.g. "1Og" -> "10g", "l2g" -> "12g")
+DIGIT_FIXES = [
+    (re.compile(r'(?<=\d)[oO]|[oO](?=\d)'), '0'),
+    (re.compile(r'(?<=\d)[lI|]|[lI|](?=\d)'), '1'),
+]
+
+
+def _fix_digits(text):
+    """Undo common letter-for-digit OCR errors next to digits."""
+    for pattern, replacement in DIGIT_FIXES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _to_float(value):
+    """Parse "12", "1.5" or "1,5" as a float."""
+    return float(value.replace(',', '.'))
+
+
+def group_rows(results):
+    """
+    Group OCR boxes into text rows using their geometry.
+
+    Args:
+        results (list): EasyOCR results [(bbox, text, confidence), ...]
+
+    Returns:
+        list: Rows top-to-bottom, each a list of (x, text) sorted left-to-right
+    """
+    boxes = []
+    for (bbox, text, confidence) in results:
+        ys = [p[1] for p in bbox]
+        xs = [p[0] for p in bbox]
+        boxes.append({
+            'x': min(xs),
+            'y': (min(ys) + max(ys)) / 2,
+            'height': max(ys) - min(ys),
+            'text': text
+        })
+    if not boxes:
+        return []
+
+    heights = sorted(b['height'] for b in boxes)
+    tolerance = max(heights[len(heights) // 2] * 0.5, 2)
+
+    rows = []
+    for box in sorted(boxes, key=lambda b: b['y']):
+        # Same row if vertically centred within half a line of the row so far
+        if rows and abs(box['y'] - rows[-1]['y']) <= tolerance:
+            row = rows[-1]
+            row['items'].append(box)
+            row['y'] = sum(b['y'] for b in row['items']) / len(row['items'])
+        else:
+            rows.append({'y': box['y'], 'items': [box]})
+
+    return [
+        [(b['x'], b['text']) for b in sorted(row['items'], key=lambda b: b['x'])]
+        for row in rows
+    ]
+
+
+def parse_amount(text):
+    """
+    Parse the first amount and the %DV from the text following a label.
+
+    Args:
+        text (str): e.g. "12g 18%" or "<1g" or "470mg 20%"
+
+    Returns:
+        tuple: (amount, unit, dv_percent) - any may be None
+    """
+    text = _fix_digits(text)
+    dv = None
+    percent = PERCENT_RE.search(text)
+    if percent:
+        dv = _to_float(percent.group(1))
+        text = text[:percent.start()] + ' ' + text[percent.end():]
+
+    amount = unit = None
+    match = AMOUNT_RE.search(text)
+    if match:
+        amount = _to_float(match.group(2))
+        unit = match.group(3).lower() if match.group(3) else None
+        if unit in ('µg', 'ug'):
+            unit = 'mcg'
+    return amount, unit, dv
+
+
+def parse_serving_size(text):
+    """
+    Parse a serving size like "1 cup (228g)".
+
+    Returns:
+        dict: {'text', 'amount', 'unit'} preferring the metric amount in brackets
+    """
+    text = text.strip()
+    fixed = _fix_digits(text)
+    metric = re.search(r'\(\s*(\d+(?:[.,]\d+)?)\s*(g|mg|ml)\s*\)', fixed, re.IGNORECASE)
+    if metric:
+        return {'text': text, 'amount': _to_float(metric.group(1)), 'unit': metric.group(2).lower()}
+    amount, unit, _ = parse_amount(fixed)
+    return {'text': text, 'amount': amount, 'unit': unit}
+
+
+def _split_allergens(text):
+    """Split "Milk, Soy and Wheat" into ['Milk', 'Soy', 'Wheat']."""
+    return [item.strip(' :.') for item in ALLERGEN_SPLIT_RE.split(text) if item.strip(' :.')]
+
+
+def parse_nutrition_label(results):
+    """
+    Parse EasyOCR results of a nutrition label into typed values.
+
+    Args:
+        results (list): EasyOCR results [(bbox, text, confidence), ...]
+
+    Returns:
+        dict: {
+            'raw_text': list,
+            'serving_size': dict or None,
+            'servings_per_container': float or None,
+            'calories': float or None,
+            'nutrients': {name: {'amount', 'unit', 'dv_percent'}},
+            'contains': list,
+            'may_contain': list,
+            'protein', 'fat', 'carbs': float grams or None
+        }
+    """
+    rows = [' '.join(text for (_, text) in row) for row in group_rows(results)]
+
+    info = {
+        'raw_text': [text for (bbox, text, confidence) in results],
+        'serving_size': None,
+        'servings_per_container': None,
+        'calories': None,
+        'nutrients': {},
+        'contains': [],
+        'may_contain': [],
+    }
+
+    for index, row in enumerate(rows):
+        servings = SERVINGS_RE.search(_fix_digits(row))
+        if servings and info['servings_per_container'] is None:
+            info['servings_per_container'] = _to_float(servings.group(1) or servings.group(2))
+
+        row = CALORIES_FROM_RE.sub(' ', row)
+
+        serving = SERVING_SIZE_RE.search(row)
+        if serving and info['serving_size'] is None:
+            # The rest of the row may hold other facts ("Serving size 1 cup (228g) Calories 250")
+            text = serving.group(1)
+            following = [m.start() for m in (CALORIES_RE.search(text), SERVINGS_RE.search(text)) if m]
+            end = min(following) if following else len(text)
+            info['serving_size'] = parse_serving_size(text[:end])
+            row = row[:serving.start()] + ' ' + text[end:]
+
+        calories = CALORIES_RE.search(row)
+        if calories and info['calories'] is None:
+            # _fix_digits keeps positions, so spans found in it also apply to row
+            fixed = _fix_digits(row)
+            amount = None
+            spans = [calories.span()]
+            kcal = KCAL_RE.search(fixed)
+            value = CALORIES_VALUE_RE.match(fixed, calories.end())
+            if kcal:
+                amount = _to_float(kcal.group(1))
+                spans.append(kcal.span())
+            elif value:
+                amount = _to_float(value.group(1))
+                spans = [(calories.start(), value.end())]
+            elif index + 1 < len(rows):
+                bare = BARE_NUMBER_RE.match(_fix_digits(rows[index + 1]))
+                if bare:
+                    amount = _to_float(bare.group(1))
+            info['calories'] = amount
+            # Other nutrients can share the row ("Calories 250 Total Fat 8g")
+            for start, end in sorted(spans, reverse=True):
+                row = row[:start] + ' ' + row[end:]
+
+        may_contain = MAY_CONTAIN_RE.search(row)
+        if may_contain:
+            info['may_contain'].extend(_split_allergens(may_contain.group(1)))
+        contains = CONTAINS_RE.search(row)
+        if contains:
+            info['contains'].extend(_split_allergens(contains.group(1)))
+        if may_contain or contains or INGREDIENTS_RE.match(row):
+            continue
+
+        # A row can hold several nutrients (e.g. "Vitamin D 2mcg 10% Calcium 260mg 20%")
+        matches = list(NUTRIENT_RE.finditer(row))
+        for i, match in enumerate(matches):
+            key = match.lastgroup
+            if key in info['nutrients']:
+                continue
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(row)
+            amount, unit, dv = parse_amount(row[match.end():end])
+            if amount is None:
+                # "Includes 10g Added Sugars 20%" puts the amount before the name
+                start = matches[i - 1].end() if i > 0 else 0
+                amount, unit, _ = parse_amount(row[start:match.start()])
+            if amount is None and dv is None:
+                continue
+            info['nutrients'][key] = {'amount': amount, 'unit': unit, 'dv_percent': dv}
+
+    # Flat shortcuts kept for existing callers
+    for short, key in (('protein', 'protein'), ('fat', 'total_fat'), ('carbs', 'total_carbohydrate')):
+        nutrient = info['nutrients'].get(key)
+        info[short] = nutrient['amount'] if nutrient else None
+
+    return info
@@ -0,0 +1,198 @@
+"""
+OCR accuracy/latency regression benchmark
+Runs OCRReader configurations (preprocessing preset x backend) over the
+synthetic corpus and reports character accuracy, field-extraction accuracy
+from read_nutrition_label, per-image latency and peak memory. Results can be
+saved and later compared against as a regression baseline.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import json
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+
+from Functions.Vision import ocr_corpus
+from Functions.Vision.nutrition_parser import parse_nutrition_label
+from Functions.Vision.ocr_corpus import char_accuracy
+
+# Allowed slack before a metric counts as a regression against the baseline
+ACCURACY_TOLERANCE = 0.02
+LATENCY_TOLERANCE = 0.25
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB (ru_maxrss is KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def field_accuracy(info, fields):
+    """
+    Fraction of expected nutrition values that read_nutrition_label got right.
+
+    Args:
+        info (dict): parse_nutrition_label() output
+        fields (dict): Ground truth from ocr_corpus.make_label()
+
+    Returns:
+        tuple: (correct, total)
+    """
+    checks = [
+        ((info['serving_size'] or {}).get('amount'), fields['serving_size']),
+        (info['servings_per_container'], fields['servings_per_container']),
+        (info['calories'], fields['calories']),
+    ]
+    for key, amount in fields['nutrients'].items():
+        checks.append(((info['nutrients'].get(key) or {}).get('amount'), amount))
+
+    correct = sum(1 for got, expected in checks if got is not None and abs(got - expected) < 1e-6)
+    # Allergens score as one field: the whole list must match
+    contains = {item.lower() for item in info['contains']}
+    correct += contains == {item.lower() for item in fields['contains']}
+    return correct, len(checks) + 1
+
+
+def _measure(config, corpus_dir, samples, queue):
+    """Child process: run one configuration over the corpus."""
+    from Functions.Vision.ocr_reader import OCRReader
+
+    entries = ocr_corpus.load(corpus_dir, samples)
+    ocr = OCRReader(use_roi=config['roi'], preprocess=config['preprocess'], backend=config['backend'])
+    if not ocr.initialize():
+        queue.put(dict(config, error='failed to load'))
+        return
+    ocr.read_text(entries[0]['image'])  # warm-up
+
+    latencies, accuracy = [], []
+    correct = total = 0
+    per_profile = {}
+    for entry in entries:
+        start = time.perf_counter()
+        results = ocr.read_text(entry['image'])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        accuracy.append(char_accuracy(results, entry['lines']))
+        right, count = field_accuracy(parse_nutrition_label(results), entry['fields'])
+        correct += right
+        total += count
+        per_profile.setdefault(entry['profile'], []).append(right / count)
+
+    queue.put(dict(
+        config,
+        mean_ms=float(np.mean(latencies)),
+        p95_ms=float(np.percentile(latencies, 95)),
+        char_accuracy=float(np.mean(accuracy)),
+        field_accuracy=correct / total,
+        field_accuracy_by_profile={name: float(np.mean(v)) for name, v in per_profile.items()},
+        peak_mb=_peak_rss_mb()
+    ))
+
+
+def config_name(config):
+    """Short label for a configuration, e.g. 'label/onnx'."""
+    return f"{config['preprocess']}/{config['backend']}" + ('' if config['roi'] else '/noroi')
+
+
+def run(configs, corpus_dir=ocr_corpus.DEFAULT_DIR, samples=25):
+    """
+    Benchmark each configuration in a fresh process so memory numbers don't mix.
+
+    Args:
+        configs (list): Dicts with 'preprocess', 'backend' and 'roi'
+        corpus_dir (str): Corpus directory (generated if missing)
+        samples (int): Corpus size
+
+    Returns:
+        list: One result dict per configuration
+    """
+    ocr_corpus.load(corpus_dir, samples)  # generate once, up front
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    for config in configs:
+        queue = context.Queue()
+        process = context.Process(target=_measure, args=(config, corpus_dir, samples, queue))
+        process.start()
+        process.join()
+        rows.append(queue.get() if not queue.empty()
+                    else dict(config, error=f'exit code {process.exitcode}'))
+    return rows
+
+
+def compare(rows, baseline):
+    """
+    Find regressions against a saved baseline.
+
+    Returns:
+        list: Human-readable regression messages (empty if none)
+    """
+    previous = {config_name(row): row for row in baseline if 'error' not in row}
+    problems = []
+    for row in rows:
+        name = config_name(row)
+        if 'error' in row:
+            problems.append(f"{name}: {row['error']}")
+            continue
+        old = previous.get(name)
+        if old is None:
+            continue
+        for metric in ('char_accuracy', 'field_accuracy'):
+            if row[metric] < old[metric] - ACCURACY_TOLERANCE:
+                problems.append(f"{name}: {metric} {old[metric]:.1%} -> {row[metric]:.1%}")
+        if row['mean_ms'] > old['mean_ms'] * (1 + LATENCY_TOLERANCE):
+            problems.append(f"{name}: mean latency {old['mean_ms']:.0f}ms -> {row['mean_ms']:.0f}ms")
+    return problems
+
+
+def main():
+    """Print the benchmark table; optionally save results or check them against a baseline."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='OCR accuracy/latency benchmark')
+    parser.add_argument('--presets', default='none,label', help='Comma-separated preprocessing presets')
+    parser.add_argument('--backends', default='easyocr', help='Comma-separated backends')
+    parser.add_argument('--no-roi', action='store_true', help='Disable ROI cropping')
+    parser.add_argument('--corpus', default=ocr_corpus.DEFAULT_DIR, help='Corpus directory')
+    parser.add_argument('--samples', type=int, default=25, help='Corpus size')
+    parser.add_argument('--save', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against a saved JSON file; exit 1 on regression')
+
+    args = parser.parse_args()
+    configs = [
+        {'preprocess': preset, 'backend': backend, 'roi': not args.no_roi}
+        for backend in args.backends.split(',')
+        for preset in args.presets.split(',')
+    ]
+    rows = run(configs, args.corpus, args.samples)
+
+    print(f"\n{'Config':<22} {'Mean ms':>8} {'p95 ms':>8} {'Char acc':>9} {'Field acc':>10} {'Peak MB':>8}")
+    print("-" * 70)
+    for row in rows:
+        if 'error' in row:
+            print(f"{config_name(row):<22} {row['error']}")
+            continue
+        print(f"{config_name(row):<22} {row['mean_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+              f"{row['char_accuracy']:>9.1%} {row['field_accuracy']:>10.1%} {row['peak_mb']:>8.0f}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(rows, json.load(f))
+        if problems:
+            print("\nRegressions:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+LRU cache for OCR results
+Keyed by a hash of the preprocessed image bytes plus the ROI/transform and
+language set, so retries and re-scans of the same label skip recognition
+"""
+
+import atexit
+import collections
+import copy
+import hashlib
+import os
+import pickle
+import threading
+
+import numpy as np
+
+
+class OCRCache:
+    def __init__(self, max_entries=256, persist_path=None, autosave_every=16):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum cached results before the least recently used is evicted
+            persist_path (str): Pickle file to load from and save to (None for memory only)
+            autosave_every (int): Save to disk after this many new entries
+        """
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.autosave_every = autosave_every
+
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.unsaved = 0
+
+        if persist_path:
+            self.load()
+            atexit.register(self.save)
+
+    @staticmethod
+    def make_key(image, matrix=None, languages=(), extra=None):
+        """
+        Build a cache key.
+
+        Args:
+            image (numpy.ndarray): The image exactly as it will be sent to OCR
+            matrix (numpy.ndarray): Transform back to the original image (encodes the ROI)
+            languages (list): Language codes
+            extra: Anything else that changes the output (e.g. backend name)
+
+        Returns:
+            str: Hex digest
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((image.shape, str(image.dtype))).encode())
+        digest.update(np.ascontiguousarray(image).data)
+        if matrix is not None:
+            digest.update(np.round(matrix, 4).tobytes())
+        digest.update(repr((tuple(sorted(languages)), extra)).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Look up a result.
+
+        Returns:
+            A copy of the cached result (callers may modify it), or None on a miss
+        """
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(result)
+
+    def put(self, key, result):
+        """Store a copy of a result, evicting the least recently used entry if full."""
+        result = copy.deepcopy(result)
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self.unsaved += 1
+            save_now = self.persist_path and self.unsaved >= self.autosave_every
+        if save_now:
+            self.save()
+
+    def clear(self):
+        """Drop all entries and reset statistics."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+            self.unsaved = 0
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: entries, hits, misses, evictions and hit_rate
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def load(self):
+        """Load entries from persist_path if it exists."""
+        try:
+            with open(self.persist_path, 'rb') as f:
+                entries = pickle.load(f)
+            with self.lock:
+                self.entries = collections.OrderedDict(list(entries.items())[-self.max_entries:])
+            print(f"Loaded {len(self.entries)} cached OCR results")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Could not load OCR cache: {e}")
+
+    def save(self):
+        """Write entries to persist_path atomically."""
+        if not self.persist_path:
+            return
+        with self.lock:
+            entries = collections.OrderedDict(self.entries)
+            self.unsaved = 0
+        try:
+            directory = os.path.dirname(self.persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.persist_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            print(f"Could not save OCR cache: {e}")
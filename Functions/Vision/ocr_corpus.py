@@ -0,0 +1,215 @@
+"""
+Synthetic OCR benchmark corpus
+Generates nutrition label images with known text and nutrition values plus
+a labels.json ground truth, deterministically from a seed so every machine
+benchmarks against the same images, and the character accuracy metric
+used to score OCR against it
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import json
+import random
+import tempfile
+
+import cv2
+import numpy as np
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), 'baymin_ocr_corpus')
+ALLERGENS = ['Milk', 'Soy', 'Wheat', 'Eggs', 'Peanuts', 'Tree Nuts', 'Fish', 'Sesame']
+
+# Distortion profiles; each sample uses one, in rotation
+PROFILES = {
+    'clean': {'skew': 0.0, 'glare': False, 'blur': False, 'noise': 2.0, 'scale': 1.0},
+    'skewed': {'skew': 8.0, 'glare': False, 'blur': True, 'noise': 6.0, 'scale': 1.0},
+    'glare': {'skew': 3.0, 'glare': True, 'blur': True, 'noise': 6.0, 'scale': 1.0},
+    'small': {'skew': 3.0, 'glare': False, 'blur': True, 'noise': 8.0, 'scale': 0.6},
+    'large': {'skew': 5.0, 'glare': True, 'blur': True, 'noise': 8.0, 'scale': 1.6},
+}
+
+# Fixed label used by the preset and backend benchmarks
+LABEL_LINES = [
+    "Nutrition Facts",
+    "Serving Size 1 cup (228g)",
+    "Calories 250",
+    "Total Fat 12g 18%",
+    "Sodium 470mg 20%",
+    "Total Carbohydrate 31g 10%",
+    "Protein 5g",
+    "Contains: Milk, Soy",
+]
+
+
+def render_label(lines, seed=0, skew=6.0, glare=True, blur=True, noise=8.0, scale=1.0):
+    """
+    Render a synthetic label photo.
+
+    Args:
+        lines (list): Text lines to draw
+        seed (int): Random seed for the distortions
+        skew (float): Maximum rotation in degrees
+        glare (bool): Add a saturated highlight
+        blur (bool): Add slight defocus blur
+        noise (float): Standard deviation of sensor noise
+        scale (float): Text size multiplier
+
+    Returns:
+        numpy.ndarray: BGR image
+    """
+    rng = random.Random(seed)
+    line_height = int(42 * scale)
+    width, height = int(900 * scale), line_height * (len(lines) + 2)
+    image = np.full((height, width, 3), 235, np.uint8)
+    for i, line in enumerate(lines):
+        cv2.putText(image, line, (int(40 * scale), line_height * (i + 1) + line_height // 2),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0 * scale, (25, 25, 25), max(1, int(2 * scale)))
+
+    if skew:
+        rotation = cv2.getRotationMatrix2D((width / 2, height / 2), rng.uniform(-skew, skew), 1.0)
+        image = cv2.warpAffine(image, rotation, (width, height), borderMode=cv2.BORDER_REPLICATE)
+    if glare:
+        center = (rng.randint(width // 4, 3 * width // 4), rng.randint(height // 4, 3 * height // 4))
+        highlight = np.zeros((height, width), np.float32)
+        cv2.circle(highlight, center, int(60 * scale), 1.0, -1)
+        highlight = cv2.GaussianBlur(highlight, (0, 0), 15 * scale)
+        image = np.clip(image + highlight[..., None] * 200, 0, 255).astype(np.uint8)
+    if blur:
+        image = cv2.GaussianBlur(image, (3, 3), 0)
+    if noise:
+        np_rng = np.random.default_rng(seed)
+        image = np.clip(image + np_rng.normal(0, noise, image.shape), 0, 255).astype(np.uint8)
+    return image
+
+
+def levenshtein(a, b):
+    """Edit distance between two strings."""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def char_accuracy(results, truth):
+    """Character accuracy of OCR results (read top-to-bottom) against the truth text."""
+    ordered = sorted(results, key=lambda r: (min(p[1] for p in r[0]), min(p[0] for p in r[0])))
+    text = " ".join(t for (_, t, _) in ordered).lower()
+    target = " ".join(truth).lower()
+    return max(0.0, 1.0 - levenshtein(text, target) / len(target))
+
+
+def make_label(seed):
+    """
+    Make the text and expected values of one label.
+
+    Returns:
+        tuple: (lines, fields) where fields holds serving_size, servings_per_container,
+               calories, nutrients {key: amount} and contains
+    """
+    rng = random.Random(seed)
+    serving_g = rng.randrange(20, 250, 5)
+    servings = rng.randint(2, 12)
+    calories = rng.randrange(40, 500, 10)
+    fat = rng.randint(0, 25)
+    sat_fat = rng.randint(0, min(fat, 8))
+    sodium = rng.randrange(0, 900, 10)
+    carbs = rng.randint(0, 60)
+    sugars, protein = rng.randint(0, min(carbs, 30)), rng.randint(0, 30)
+    contains = rng.sample(ALLERGENS, rng.randint(1, 3))
+
+    lines = [
+        "Nutrition Facts",
+        f"{servings} servings per container",
+        f"Serving Size 1 cup ({serving_g}g)",
+        f"Calories {calories}",
+        f"Total Fat {fat}g {round(fat / 78 * 100)}%",
+        f"Saturated Fat {sat_fat}g {round(sat_fat / 20 * 100)}%",
+        f"Sodium {sodium}mg {round(sodium / 2300 * 100)}%",
+        f"Total Carbohydrate {carbs}g {round(carbs / 275 * 100)}%",
+        f"Total Sugars {sugars}g",
+        f"Protein {protein}g",
+        "Contains: " + ", ".join(contains),
+    ]
+    fields = {
+        'serving_size': serving_g,
+        'servings_per_container': servings,
+        'calories': calories,
+        'nutrients': {
+            'total_fat': fat,
+            'saturated_fat': sat_fat,
+            'sodium': sodium,
+            'total_carbohydrate': carbs,
+            'total_sugars': sugars,
+            'protein': protein,
+        },
+        'contains': contains,
+    }
+    return lines, fields
+
+
+def generate(directory=DEFAULT_DIR, samples=25, seed=0):
+    """
+    Write the corpus images and labels.json.
+
+    Args:
+        directory (str): Output directory
+        samples (int): Number of labels
+        seed (int): Base seed (same seed = identical corpus)
+
+    Returns:
+        list: Ground-truth entries {'file', 'profile', 'lines', 'fields'}
+    """
+    os.makedirs(directory, exist_ok=True)
+    names = list(PROFILES)
+    entries = []
+    for i in range(samples):
+        profile = names[i % len(names)]
+        lines, fields = make_label(seed + i)
+        image = render_label(lines, seed=seed + i, **PROFILES[profile])
+        filename = f"label_{i:03d}_{profile}.png"
+        cv2.imwrite(os.path.join(directory, filename), image)
+        entries.append({'file': filename, 'profile': profile, 'lines': lines, 'fields': fields})
+
+    with open(os.path.join(directory, 'labels.json'), 'w') as f:
+        json.dump({'seed': seed, 'samples': entries}, f, indent=2)
+    return entries
+
+
+def load(directory=DEFAULT_DIR, samples=25, seed=0):
+    """
+    Load the corpus, generating it first if it is missing or was made with
+    different settings.
+
+    Returns:
+        list: Ground-truth entries with an added 'image' (BGR numpy array)
+    """
+    path = os.path.join(directory, 'labels.json')
+    entries = None
+    if os.path.exists(path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('seed') == seed and len(data['samples']) == samples:
+            entries = data['samples']
+    if entries is None:
+        entries = generate(directory, samples, seed)
+
+    for entry in entries:
+        entry['image'] = cv2.imread(os.path.join(directory, entry['file']))
+    return entries
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate the synthetic OCR corpus')
+    parser.add_argument('--output', default=DEFAULT_DIR, help='Output directory')
+    parser.add_argument('--samples', type=int, default=25, help='Number of labels')
+    parser.add_argument('--seed', type=int, default=0, help='Base random seed')
+
+    args = parser.parse_args()
+    entries = generate(args.output, args.samples, args.seed)
+    print(f"Wrote {len(entries)} labels to {args.output}")
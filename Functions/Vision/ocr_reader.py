@@ -2,30 +2,137 @@
 OCR Reader for scanning and reading text from images
 """
 
-import easyocr
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import cv2
 import numpy as np
 
+from Functions.Vision.roi import crop_to_roi
+from Functions.Vision.preprocess import OCRPreprocessor, map_points
+from Functions.Vision.reader_registry import get_reader, preload_reader
+from Functions.Vision.nutrition_parser import parse_nutrition_label
+from Functions.Vision.ocr_cache import OCRCache
+from Functions.Vision.text_tracker import TextTracker
+from Functions.Vision.thread_tuning import load_profile
+
+# Inference backend used when OCRReader isn't given one ('easyocr', 'onnx', 'onnx-int8')
+DEFAULT_BACKEND = os.environ.get('BAYMIN_OCR_BACKEND', 'easyocr')
+
+
+def _translation(x, y):
+    """3x3 matrix shifting points by (x, y)."""
+    return np.array([[1.0, 0.0, x], [0.0, 1.0, y], [0.0, 0.0, 1.0]])
+
+
+def _background_colour(image):
+    """Median colour of an image's outermost pixels (the label background, usually)."""
+    edges = np.concatenate([image[0], image[-1], image[:, 0], image[:, -1]])
+    median = np.median(edges.reshape(len(edges), -1), axis=0)
+    return tuple(int(v) for v in median)
+
+
+def _map_results(results, matrix):
+    """Map result bounding boxes from processed-image coordinates back to the original."""
+    if matrix is None or np.allclose(matrix, np.eye(3)):
+        return results
+    return [
+        (map_points(bbox, matrix), text, confidence)
+        for (bbox, text, confidence) in results
+    ]
+
+
 class OCRReader:
-    def __init__(self, languages=['en']):
+    def __init__(self, languages=['en'], use_roi=True, preload=False, preprocess='label', cache=None,
+                 backend=None, tune=True):
         """
         Initialize the OCR reader.
         
         Args:
             languages (list): List of language codes to recognize (default: ['en'])
+            use_roi (bool): Crop to the detected label region before recognition
+            preload (bool): Start loading the shared models in the background now
+            preprocess (str or OCRPreprocessor): Preprocessing preset name
+                ('none', 'fast', 'label', 'binary') or a configured OCRPreprocessor
+            cache (OCRCache or bool): Memoize results by image hash (True for an
+                in-memory cache, or a configured OCRCache e.g. with disk persistence)
+            backend (str): Inference backend - 'easyocr' (PyTorch), 'onnx' or
+                'onnx-int8' (onnxruntime); defaults to $BAYMIN_OCR_BACKEND or 'easyocr'
+            tune (bool): Use the batch size stored by thread_tuning.py for this
+                backend, if calibrated on this machine (the registry applies the
+                stored thread count once when the shared models load)
         """
         self.languages = languages
+        self.use_roi = use_roi
+        self.backend = backend or DEFAULT_BACKEND
+        self.tune = tune
+        self.batch_size = None
         self.reader = None
+        self.tracker = None
         
-    def initialize(self):
-        """Initialize the EasyOCR reader."""
-        try:
-            print(f"Initializing OCR reader for languages: {self.languages}")
-            self.reader = easyocr.Reader(self.languages, gpu=False)
-            print("OCR reader initialized")
-            return True
-        except Exception as e:
-            print(f"Error initializing OCR reader: {e}")
+        if cache is True:
+            cache = OCRCache()
+        self.cache = cache or None
+        
+        if isinstance(preprocess, str):
+            preprocess = OCRPreprocessor.from_preset(preprocess)
+        self.preprocessor = preprocess
+        
+        if preload:
+            preload_reader(self.languages, backend=self.backend)
+        
+    def initialize(self, timeout=None):
+        """
+        Attach to the shared EasyOCR reader for this language set.
+        
+        Models are loaded once per process; if a preload is in progress this
+        waits for it instead of loading a second copy.
+        
+        Args:
+            timeout (float): Maximum seconds to wait for loading (None = forever)
+        """
+        print(f"Initializing OCR reader for languages: {self.languages} ({self.backend})")
+        self.reader = get_reader(self.languages, timeout=timeout, backend=self.backend)
+        if self.reader is None:
+            print("Error initializing OCR reader")
             return False
+        
+        profile = load_profile(self.backend) if self.tune else None
+        if profile:
+            self.batch_size = profile['batch_size']
+            print(f"Using tuned batch size {self.batch_size}")
+        print("OCR reader initialized")
+        return True
+    
+    def prepare_image(self, image, use_roi=None):
+        """
+        Crop to the ROI and preprocess an image for recognition.
+        
+        Args:
+            image: Image array (numpy array from OpenCV)
+            use_roi (bool): Crop to the label region (None = the reader's setting)
+            
+        Returns:
+            tuple: (prepared_image, matrix, roi) - matrix maps prepared-image
+                   coordinates back to the original image
+        """
+        matrix = np.eye(3)
+        roi = None
+        if self.use_roi if use_roi is None else use_roi:
+            image, roi = crop_to_roi(image)
+            if roi:
+                matrix = _translation(*roi['bbox'][:2])
+        
+        if self.preprocessor is not None:
+            image, forward = self.preprocessor.process(image)
+            matrix = matrix @ np.linalg.inv(forward)
+        
+        return image, matrix, roi
+    
+    def cache_key(self, image, matrix):
+        """Cache key for a prepared image and its transform back to the original."""
+        return OCRCache.make_key(image, matrix, self.languages, extra=self.backend)
     
     def read_text(self, image):
         """
@@ -42,13 +149,180 @@ class OCRReader:
                 return []
         
         try:
+            # Only recognise the cleaned-up label region; boxes are mapped back below
+            image, matrix, roi = self.prepare_image(image)
+            
+            key = None
+            if self.cache is not None:
+                key = self.cache_key(image, matrix)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+            
             # Perform OCR
-            results = self.reader.readtext(image)
+            results = _map_results(self.reader.readtext(image, batch_size=self.batch_size or 1), matrix)
+            
+            if key is not None:
+                self.cache.put(key, results)
             return results
         except Exception as e:
             print(f"Error reading text from image: {e}")
             return []
     
+    def read_text_batch(self, images, images_per_batch=4, batch_size=None, use_roi=None):
+        """
+        Read text from several images (frames or crops) in batched passes.
+        
+        Images are grouped by size and padded to a common canvas so EasyOCR
+        runs text detection on each group in a single forward pass, and
+        recognises the found boxes batch_size at a time.
+        
+        Args:
+            images (list): Image arrays (numpy arrays from OpenCV)
+            images_per_batch (int): Images per detection pass
+            batch_size (int): Text boxes per recognition batch (default: tuned
+                profile, else 8)
+            use_roi (bool): Crop each image to its label region (None = the
+                reader's setting)
+            
+        Returns:
+            list: One read_text()-style result list per input image, in order
+        """
+        if not images:
+            return []
+        batch_size = batch_size or self.batch_size or 8
+        
+        if self.reader is None:
+            if not self.initialize():
+                return [[] for _ in images]
+        
+        # Prepare first so grouping and padding work on the pixels actually read
+        crops = [self.prepare_image(image, use_roi)[:2] for image in images]
+        all_results = [[] for _ in images]
+        
+        # Only images not already in the cache need recognition
+        keys = [None] * len(crops)
+        todo = range(len(crops))
+        if self.cache is not None:
+            todo = []
+            for i, (image, matrix) in enumerate(crops):
+                keys[i] = self.cache_key(image, matrix)
+                cached = self.cache.get(keys[i])
+                if cached is None:
+                    todo.append(i)
+                else:
+                    all_results[i] = cached
+        
+        # Similar-sized images share a batch to keep padding waste low
+        order = sorted(todo, key=lambda i: crops[i][0].shape[0] * crops[i][0].shape[1])
+        
+        for start in range(0, len(order), images_per_batch):
+            group = order[start:start + images_per_batch]
+            canvas_h = max(crops[i][0].shape[0] for i in group)
+            canvas_w = max(crops[i][0].shape[1] for i in group)
+            
+            # Pad at the bottom/right so box coordinates stay unchanged, in the
+            # background colour (replicating edges smears strokes that touch
+            # them); the group can only be stacked if every image has the same channels
+            colour = any(crops[i][0].ndim == 3 for i in group)
+            padded = []
+            for i in group:
+                image = crops[i][0]
+                if colour and image.ndim == 2:
+                    image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+                pad_h, pad_w = canvas_h - image.shape[0], canvas_w - image.shape[1]
+                if pad_h or pad_w:
+                    image = cv2.copyMakeBorder(image, 0, pad_h, 0, pad_w, cv2.BORDER_CONSTANT,
+                                               value=_background_colour(image))
+                padded.append(image)
+            
+            try:
+                if len(padded) == 1:
+                    batch_results = [self.reader.readtext(padded[0], batch_size=batch_size)]
+                else:
+                    batch_results = self.reader.readtext_batched(padded, batch_size=batch_size)
+            except Exception as e:
+                print(f"Error reading text from image batch: {e}")
+                continue
+            
+            for i, results in zip(group, batch_results):
+                all_results[i] = _map_results(results, crops[i][1])
+                if keys[i] is not None:
+                    self.cache.put(keys[i], all_results[i])
+        
+        return all_results
+    
+    def read_text_tiled(self, image, tile_width=640, overlap=80, images_per_batch=4):
+        """
+        Read text from a very wide image (e.g. a whole side of a box) in tiles.
+        
+        Args:
+            image: Image array (numpy array from OpenCV)
+            tile_width (int): Width of each tile in pixels
+            overlap (int): Overlap between neighbouring tiles so words on a seam are kept
+            images_per_batch (int): Tiles per detection pass
+            
+        Returns:
+            list: List of tuples containing (bounding_box, text, confidence)
+        """
+        width = image.shape[1]
+        if width <= tile_width:
+            return self.read_text(image)
+        
+        step = tile_width - overlap
+        starts = list(range(0, width - tile_width, step)) + [width - tile_width]
+        tiles = [image[:, x:x + tile_width] for x in starts]
+        
+        # Tiles are already regions of interest; don't crop them again
+        tile_results = self.read_text_batch(tiles, images_per_batch=images_per_batch, use_roi=False)
+        
+        results = []
+        for index, (x, tile) in enumerate(zip(starts, tile_results)):
+            # Each tile owns the pixels up to the middle of its overlaps, so a
+            # word seen by two tiles is only reported once
+            own_start = 0 if index == 0 else (x + starts[index - 1] + tile_width) / 2
+            own_end = width if index == len(starts) - 1 else (starts[index + 1] + x + tile_width) / 2
+            for (bbox, text, confidence) in _map_results(tile, _translation(x, 0)):
+                center_x = sum(px for (px, py) in bbox) / len(bbox)
+                if own_start <= center_x < own_end:
+                    results.append((bbox, text, confidence))
+        
+        return results
+    
+    def read_text_tracked(self, frame, **tracker_options):
+        """
+        Read text from consecutive video frames of the same label.
+        
+        Detection runs once and its boxes are followed across frames; only
+        boxes whose pixels changed are recognised again. Frames are read as-is
+        (no ROI crop or preprocessing) so box positions stay comparable.
+        
+        Args:
+            frame: Image array (numpy array from OpenCV)
+            **tracker_options: TextTracker settings, used when tracking starts
+            
+        Returns:
+            list: List of tuples containing (bounding_box, text, confidence)
+        """
+        if self.reader is None:
+            if not self.initialize():
+                return []
+        
+        if self.tracker is None:
+            tracker_options.setdefault('batch_size', self.batch_size or 8)
+            self.tracker = TextTracker(self.reader, **tracker_options)
+        
+        try:
+            return self.tracker.update(frame)
+        except Exception as e:
+            print(f"Error reading text from frame: {e}")
+            self.tracker.reset()
+            return []
+    
+    def stop_tracking(self):
+        """Drop tracked boxes (call when the camera moves to a new label)."""
+        self.tracker = None
+    
     def read_text_simple(self, image):
         """
         Read text from an image and return simple list of strings.
@@ -70,34 +344,12 @@ class OCRReader:
             image: Image array (numpy array from OpenCV)
             
         Returns:
-            dict: Dictionary containing nutrition information
+            dict: Typed nutrition information (see nutrition_parser.parse_nutrition_label):
+                  calories, serving size, per-nutrient amount/unit/%DV and
+                  Contains/May contain allergen lists
         """
         results = self.read_text(image)
-        
-        nutrition_info = {
-            'raw_text': [],
-            'calories': None,
-            'protein': None,
-            'fat': None,
-            'carbs': None
-        }
-        
-        # Extract all text
-        for (bbox, text, confidence) in results:
-            nutrition_info['raw_text'].append(text)
-            text_lower = text.lower()
-            
-            # Look for common nutrition keywords
-            if 'calor' in text_lower:
-                nutrition_info['calories'] = text
-            elif 'protein' in text_lower:
-                nutrition_info['protein'] = text
-            elif 'fat' in text_lower and 'trans' not in text_lower:
-                nutrition_info['fat'] = text
-            elif 'carb' in text_lower:
-                nutrition_info['carbs'] = text
-        
-        return nutrition_info
+        return parse_nutrition_label(results)
 
 
 # Example usage
@@ -113,3 +365,21 @@ if __name__ == "__main__":
     # 
     # for (bbox, text, confidence) in results:
     #     print(f"Text: {text} (Confidence: {confidence:.2f})")
+    
+    # Example: Run the networks in onnxruntime (exported on first use)
+    # ocr = OCRReader(backend='onnx-int8')
+    
+    # Example: Memoize results so re-scans of the same label are free
+    # ocr = OCRReader(cache=OCRCache(persist_path='/tmp/baymin_ocr_cache.pkl'))
+    # ocr.read_text(image); ocr.read_text(image)
+    # print(ocr.cache.stats())
+    
+    # Example: Follow a label across video frames, recognising only changed boxes
+    # for frame in frames:
+    #     print([text for (bbox, text, confidence) in ocr.read_text_tracked(frame)])
+    # print(ocr.tracker.stats)
+    
+    # Example: Read several frames of the same box in one batched pass
+    # frames = [cv2.imread(path) for path in ['side1.jpg', 'side2.jpg']]
+    # for results in ocr.read_text_batch(frames):
+    #     print([text for (bbox, text, confidence) in results])
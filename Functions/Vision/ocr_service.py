@@ -0,0 +1,370 @@
+"""
+OCR service backed by a pool of worker processes
+Each worker preloads its own OCRReader; jobs carry deadlines and workers
+stuck past a deadline are killed and replaced, so OCR never blocks the
+caller's thread or holds its GIL
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import collections
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+
+
+def _worker_main(worker_id, conn, reader_options):
+    """Worker process: load the OCR models once, then serve jobs until told to stop."""
+    from Functions.Vision.ocr_reader import OCRReader
+
+    start = time.perf_counter()
+    reader = OCRReader(**reader_options)
+    if not reader.initialize():
+        conn.send(('failed', worker_id, None, None))
+        return
+    conn.send(('ready', worker_id, None, time.perf_counter() - start))
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if job is None:
+            return
+
+        job_id, method, image, kwargs = job
+        start = time.perf_counter()
+        try:
+            result = getattr(reader, method)(image, **kwargs)
+            conn.send(('done', job_id, result, time.perf_counter() - start))
+        except Exception as e:
+            conn.send(('error', job_id, str(e), time.perf_counter() - start))
+
+
+class _Worker:
+    def __init__(self, worker_id, process, conn):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.job = None
+        self.deadline = None
+
+
+class _Job:
+    def __init__(self, job_id, method, image, kwargs, deadline):
+        self.job_id = job_id
+        self.method = method
+        self.image = image
+        self.kwargs = kwargs
+        self.deadline = deadline
+        self.future = Future()
+
+
+class OCRService:
+    def __init__(self, num_workers=2, default_timeout=30.0, max_pending=None,
+                 max_load_failures=3, restart_backoff=1.0, max_restart_backoff=60.0, **reader_options):
+        """
+        Initialize the OCR service.
+
+        Args:
+            num_workers (int): Number of worker processes
+            default_timeout (float): Seconds a job may take (queueing included) before it is cancelled
+            max_pending (int): Reject new jobs when this many are queued (None for unlimited)
+            max_load_failures (int): Consecutive model load failures after which queued
+                and new jobs fail immediately (until a worker loads successfully)
+            restart_backoff (float): Seconds before respawning after the first load
+                failure; doubles with each consecutive failure
+            max_restart_backoff (float): Upper limit for the respawn delay
+            **reader_options: Passed to OCRReader in each worker (languages, preprocess, ...)
+        """
+        self.num_workers = num_workers
+        self.default_timeout = default_timeout
+        self.max_pending = max_pending
+        self.max_load_failures = max_load_failures
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.reader_options = reader_options
+
+        # spawn: forking a process that already has threads/torch state is unsafe
+        self.context = multiprocessing.get_context('spawn')
+        self.workers = []
+        self.respawn_at = []  # monotonic times when replacement workers are due
+        self.load_failures = 0  # consecutive; reset when a worker becomes ready
+        self.pending = collections.deque()
+        self.lock = threading.Lock()
+        self.job_ids = itertools.count()
+        self.worker_ids = itertools.count()
+
+        self.running = False
+        self.dispatcher = None
+        self.stats = {'completed': 0, 'failed': 0, 'timed_out': 0, 'restarts': 0}
+
+    def _spawn_worker(self):
+        """Start one worker process."""
+        parent_conn, child_conn = self.context.Pipe()
+        worker_id = next(self.worker_ids)
+        process = self.context.Process(
+            target=_worker_main,
+            args=(worker_id, child_conn, self.reader_options),
+            name=f"OCRWorker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(worker_id, process, parent_conn)
+
+    def start(self):
+        """Start the worker processes and the dispatcher thread."""
+        if self.running:
+            return
+        self.running = True
+        self.load_failures = 0
+        self.respawn_at = []
+        self.workers = [self._spawn_worker() for _ in range(self.num_workers)]
+        self.dispatcher = threading.Thread(target=self._dispatch_loop, name="OCRDispatcher", daemon=True)
+        self.dispatcher.start()
+        print(f"OCR service started with {self.num_workers} worker(s)")
+
+    def submit(self, image, method='read_text', timeout=None, **kwargs):
+        """
+        Queue an OCR job.
+
+        Args:
+            image: Image array (numpy array from OpenCV)
+            method (str): OCRReader method to call ('read_text', 'read_nutrition_label', ...)
+            timeout (float): Seconds until the job is cancelled (default_timeout if None)
+            **kwargs: Extra arguments for the method
+
+        Returns:
+            concurrent.futures.Future: Resolves to the method's return value, or
+            raises TimeoutError/RuntimeError
+        """
+        if not self.running:
+            self.start()
+
+        deadline = time.monotonic() + (self.default_timeout if timeout is None else timeout)
+        job = _Job(next(self.job_ids), method, image, kwargs, deadline)
+        with self.lock:
+            if self.load_failures >= self.max_load_failures:
+                job.future.set_exception(RuntimeError("OCR workers failed to load their models"))
+                return job.future
+            if self.max_pending is not None and len(self.pending) >= self.max_pending:
+                job.future.set_exception(RuntimeError("OCR service queue is full"))
+                return job.future
+            self.pending.append(job)
+        return job.future
+
+    def read_text(self, image, timeout=None):
+        """Blocking convenience wrapper: OCR one image in a worker process."""
+        return self.submit(image, timeout=timeout).result()
+
+    def _replace_worker(self, worker, delay=0.0):
+        """Kill a stuck or dead worker and schedule a fresh one in its place after delay seconds."""
+        if worker.process.is_alive():
+            worker.process.terminate()
+        worker.process.join(timeout=1)
+        worker.conn.close()
+        self.workers.remove(worker)
+        self.respawn_at.append(time.monotonic() + delay)
+        self.stats['restarts'] += 1
+
+    def _load_failed(self, worker):
+        """Replace a worker that never got ready, backing off while loads keep failing."""
+        with self.lock:
+            self.load_failures += 1
+            failures = self.load_failures
+        delay = min(self.restart_backoff * 2 ** (failures - 1), self.max_restart_backoff)
+        print(f"Restarting OCR worker in {delay:.1f}s ({failures} consecutive load failure(s))")
+        self._replace_worker(worker, delay)
+        if failures == self.max_load_failures:
+            print("OCR models keep failing to load; failing queued jobs")
+            self._fail_pending(RuntimeError("OCR workers failed to load their models"))
+
+    def _respawn_due(self, now):
+        """Start the replacement workers whose backoff has elapsed."""
+        due = [at for at in self.respawn_at if at <= now]
+        if due:
+            self.respawn_at = [at for at in self.respawn_at if at > now]
+            self.workers.extend(self._spawn_worker() for _ in due)
+
+    def _finish(self, worker, ok, value, counter='failed'):
+        """Resolve the worker's current job and mark the worker idle."""
+        job = worker.job
+        worker.job = None
+        worker.deadline = None
+        if job is None:
+            return
+        if ok:
+            self.stats['completed'] += 1
+            job.future.set_result(value)
+        else:
+            self.stats[counter] += 1
+            job.future.set_exception(value)
+
+    def _handle_message(self, worker):
+        """Process one message from a worker."""
+        try:
+            kind, job_id, payload, elapsed = worker.conn.recv()
+        except (EOFError, OSError):
+            # Worker died (crash or OOM); fail its job and replace it
+            self._finish(worker, False, RuntimeError("OCR worker exited unexpectedly"))
+            if worker.ready:
+                self._replace_worker(worker)
+            else:
+                self._load_failed(worker)
+            return
+
+        if kind == 'ready':
+            worker.ready = True
+            with self.lock:
+                self.load_failures = 0
+            print(f"OCR worker {worker.worker_id} ready in {elapsed:.1f}s")
+        elif kind == 'failed':
+            print(f"OCR worker {worker.worker_id} failed to load models")
+            self._load_failed(worker)
+        elif kind == 'done':
+            self._finish(worker, True, payload)
+        elif kind == 'error':
+            self._finish(worker, False, RuntimeError(payload))
+
+    def _dispatch_loop(self):
+        """Match queued jobs to idle workers and enforce deadlines."""
+        while self.running:
+            conns = {worker.conn: worker for worker in self.workers}
+            if conns:
+                for conn in wait(list(conns), timeout=0.05):
+                    self._handle_message(conns[conn])
+            else:
+                time.sleep(0.05)  # every worker is waiting out its restart backoff
+
+            now = time.monotonic()
+            self._respawn_due(now)
+            self._expire_pending(now)
+            for worker in list(self.workers):
+                if worker.job is not None and now > worker.deadline:
+                    print(f"OCR job {worker.job.job_id} timed out; restarting worker {worker.worker_id}")
+                    self._finish(worker, False, TimeoutError("OCR job exceeded its deadline"), 'timed_out')
+                    self._replace_worker(worker)
+
+            for worker in self.workers:
+                if not worker.ready or worker.job is not None:
+                    continue
+                job = self._next_job(now)
+                if job is None:
+                    break
+                worker.job = job
+                worker.deadline = job.deadline
+                try:
+                    worker.conn.send((job.job_id, job.method, job.image, job.kwargs))
+                except (BrokenPipeError, OSError):
+                    self._finish(worker, False, RuntimeError("OCR worker exited unexpectedly"))
+                    self._replace_worker(worker)
+
+    def _expire_pending(self, now):
+        """Fail queued jobs whose deadline passed, even while no worker is free."""
+        with self.lock:
+            if not any(now > job.deadline for job in self.pending):
+                return
+            kept = collections.deque()
+            for job in self.pending:
+                if now <= job.deadline:
+                    kept.append(job)
+                elif job.future.set_running_or_notify_cancel():
+                    self.stats['timed_out'] += 1
+                    job.future.set_exception(TimeoutError("OCR job expired before a worker was free"))
+            self.pending = kept
+
+    def _fail_pending(self, error):
+        """Fail every queued job with error."""
+        with self.lock:
+            jobs, self.pending = self.pending, collections.deque()
+        for job in jobs:
+            if job.future.set_running_or_notify_cancel():
+                self.stats['failed'] += 1
+                job.future.set_exception(error)
+
+    def _next_job(self, now):
+        """Pop the next runnable job, expiring ones whose deadline already passed."""
+        with self.lock:
+            while self.pending:
+                job = self.pending.popleft()
+                if not job.future.set_running_or_notify_cancel():
+                    continue  # cancelled by the caller while queued
+                if now > job.deadline:
+                    self.stats['timed_out'] += 1
+                    job.future.set_exception(TimeoutError("OCR job expired before a worker was free"))
+                    continue
+                return job
+        return None
+
+    def status(self):
+        """
+        Get service status.
+
+        Returns:
+            dict: Worker readiness, queue depth and job counters
+        """
+        with self.lock:
+            pending = len(self.pending)
+        return dict(self.stats,
+                    workers=len(self.workers),
+                    ready=sum(1 for w in self.workers if w.ready),
+                    busy=sum(1 for w in self.workers if w.job is not None),
+                    restarting=len(self.respawn_at),
+                    pending=pending)
+
+    def stop(self):
+        """Stop the dispatcher and workers; queued jobs are cancelled."""
+        if not self.running:
+            return
+        self.running = False
+        if self.dispatcher:
+            self.dispatcher.join(timeout=2)
+            self.dispatcher = None
+
+        for worker in self.workers:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self.workers:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            self._finish(worker, False, RuntimeError("OCR service stopped"))
+            worker.conn.close()
+        self.workers = []
+        self.respawn_at = []
+
+        with self.lock:
+            while self.pending:
+                self.pending.popleft().future.cancel()
+        print("OCR service stopped")
+
+
+if __name__ == "__main__":
+    import cv2
+
+    if len(sys.argv) < 2:
+        print("Usage: python ocr_service.py <image_path> [<image_path> ...]")
+        sys.exit(1)
+
+    service = OCRService(num_workers=2)
+    service.start()
+
+    # Jobs run concurrently in the workers while this thread stays free
+    futures = [service.submit(cv2.imread(path), timeout=60) for path in sys.argv[1:]]
+    for path, future in zip(sys.argv[1:], futures):
+        try:
+            print(f"{path}: {[text for (bbox, text, confidence) in future.result()]}")
+        except Exception as e:
+            print(f"{path}: failed ({e})")
+
+    print(service.status())
+    service.stop()
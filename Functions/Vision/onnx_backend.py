@@ -0,0 +1,198 @@
+"""
+ONNX Runtime backend for EasyOCR
+Exports the CRAFT detector and the recognition network to ONNX once, then
+swaps them into an easyocr.Reader as onnxruntime sessions so EasyOCR's own
+pre/post-processing (box grouping, CTC decoding) stays unchanged
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import gc
+
+import easyocr
+import numpy as np
+import torch
+
+# Where exported models are kept (next to EasyOCR's own downloads by default)
+MODEL_DIR = os.environ.get('BAYMIN_ONNX_DIR', os.path.join(os.path.expanduser('~'), '.EasyOCR', 'onnx'))
+OPSET = 13
+
+
+class _MeanPoolLastAxis(torch.nn.Module):
+    """Export-friendly stand-in for AdaptiveAvgPool2d((None, 1))."""
+
+    def forward(self, x):
+        return x.mean(dim=3, keepdim=True)
+
+
+class _RecognizerExport(torch.nn.Module):
+    """Recognizer with the unused CTC 'text' argument removed, for export."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, image):
+        return self.model(image, None)
+
+
+class _DetectorExport(torch.nn.Module):
+    """CRAFT returning only the score maps (EasyOCR ignores the feature output)."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, image):
+        return self.model(image)[0]
+
+
+class OnnxModule(torch.nn.Module):
+    """
+    torch.nn.Module facade over an onnxruntime session, so EasyOCR can call it
+    exactly like the network it replaces.
+    """
+
+    def __init__(self, path, num_threads=None, extra_outputs=0):
+        """
+        Args:
+            path (str): ONNX model file
+            num_threads (int): Intra-op threads (None = onnxruntime default)
+            extra_outputs (int): Number of None values appended to the output
+                (CRAFT callers unpack (y, feature))
+        """
+        super().__init__()
+        self.path = path
+        self.extra_outputs = extra_outputs
+        self.set_num_threads(num_threads)
+
+    def set_num_threads(self, num_threads):
+        """(Re)create the session with a given intra-op thread count."""
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(self.path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.num_threads = num_threads
+
+    def forward(self, image, *unused):
+        array = image.detach().cpu().numpy().astype(np.float32, copy=False)
+        output = torch.from_numpy(self.session.run(None, {self.input_name: array})[0])
+        if self.extra_outputs:
+            return (output,) + (None,) * self.extra_outputs
+        return output
+
+
+def model_paths(languages, quantized=False, model_dir=MODEL_DIR):
+    """
+    Paths of the exported detector and recognizer for a language set.
+
+    Returns:
+        tuple: (detector_path, recognizer_path)
+    """
+    suffix = '.int8.onnx' if quantized else '.onnx'
+    recognizer_name = 'recognizer_' + '_'.join(sorted(languages))
+    return (os.path.join(model_dir, 'detector' + suffix),
+            os.path.join(model_dir, recognizer_name + suffix))
+
+
+def _quantize(source, destination):
+    """Dynamic int8 quantization of weights (activations stay float)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(source, destination, weight_type=QuantType.QInt8)
+
+
+def export_models(languages, quantized=False, model_dir=MODEL_DIR):
+    """
+    Export EasyOCR's networks for a language set to ONNX.
+
+    Args:
+        languages (list): Language codes
+        quantized (bool): Also write int8-quantized copies
+        model_dir (str): Output directory
+
+    Returns:
+        tuple: (detector_path, recognizer_path) of the requested variant
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    detector_path, recognizer_path = model_paths(languages, False, model_dir)
+    print(f"Exporting OCR models to ONNX for languages: {list(languages)}")
+
+    # quantize=False: torch's dynamically quantized LSTMs cannot be exported
+    reader = easyocr.Reader(list(languages), gpu=False, quantize=False)
+
+    if not os.path.exists(detector_path):
+        detector = _DetectorExport(reader.detector).eval()
+        torch.onnx.export(
+            detector, torch.zeros(1, 3, 640, 640), detector_path,
+            input_names=['image'], output_names=['scores'], opset_version=OPSET,
+            dynamic_axes={'image': {0: 'batch', 2: 'height', 3: 'width'},
+                          'scores': {0: 'batch', 1: 'height', 2: 'width'}}
+        )
+
+    if not os.path.exists(recognizer_path):
+        model = reader.recognizer
+        if isinstance(getattr(model, 'AdaptiveAvgPool', None), torch.nn.AdaptiveAvgPool2d):
+            model.AdaptiveAvgPool = _MeanPoolLastAxis()
+        recognizer = _RecognizerExport(model).eval()
+        torch.onnx.export(
+            recognizer, torch.zeros(1, 1, getattr(reader, 'imgH', 64), 256), recognizer_path,
+            input_names=['image'], output_names=['preds'], opset_version=OPSET,
+            dynamic_axes={'image': {0: 'batch', 3: 'width'},
+                          'preds': {0: 'batch', 1: 'steps'}}
+        )
+
+    if quantized:
+        for source in (detector_path, recognizer_path):
+            destination = source[:-len('.onnx')] + '.int8.onnx'
+            if not os.path.exists(destination):
+                _quantize(source, destination)
+
+    del reader
+    gc.collect()
+    return model_paths(languages, quantized, model_dir)
+
+
+def load_onnx_reader(languages, quantized=False, model_dir=MODEL_DIR, num_threads=None):
+    """
+    Build an easyocr.Reader whose detector and recognizer run in onnxruntime.
+    Models are exported on first use.
+
+    Args:
+        languages (list): Language codes
+        quantized (bool): Use the int8-quantized models
+        model_dir (str): Directory holding the exported models
+        num_threads (int): onnxruntime intra-op threads (None = default)
+
+    Returns:
+        easyocr.Reader: Reader with the networks replaced
+    """
+    detector_path, recognizer_path = model_paths(languages, quantized, model_dir)
+    if not (os.path.exists(detector_path) and os.path.exists(recognizer_path)):
+        export_models(languages, quantized, model_dir)
+
+    # The reader still provides the character set, converter and box
+    # post-processing; its torch networks are dropped right after loading
+    reader = easyocr.Reader(list(languages), gpu=False)
+    reader.detector = OnnxModule(detector_path, num_threads, extra_outputs=1)
+    reader.recognizer = OnnxModule(recognizer_path, num_threads)
+    gc.collect()
+    return reader
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export EasyOCR networks to ONNX')
+    parser.add_argument('--languages', default='en', help='Comma-separated language codes')
+    parser.add_argument('--int8', action='store_true', help='Also write int8-quantized models')
+    parser.add_argument('--output', default=MODEL_DIR, help='Output directory')
+
+    args = parser.parse_args()
+    for path in export_models(args.languages.split(','), args.int8, args.output):
+        print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
@@ -0,0 +1,217 @@
+"""
+OCR preprocessing for nutrition and ingredient labels
+Grayscale, text-height normalisation, deskew, glare suppression and
+adaptive thresholding so EasyOCR runs on smaller, cleaner inputs
+"""
+
+import math
+
+import cv2
+import numpy as np
+
+# Named configurations; see preprocess_benchmark.py for their trade-offs
+PRESETS = {
+    'none': {},
+    'fast': {'grayscale': True, 'normalize_text_height': True},
+    'label': {'grayscale': True, 'normalize_text_height': True, 'deskew': True,
+              'suppress_glare': True},
+    'binary': {'grayscale': True, 'normalize_text_height': True, 'deskew': True,
+               'suppress_glare': True, 'threshold': True},
+}
+
+
+class OCRPreprocessor:
+    def __init__(self, grayscale=False, normalize_text_height=False, target_text_height=28,
+                 allow_upscale=False, max_side=1600, deskew=False, max_skew=15.0, suppress_glare=False,
+                 glare_level=245, threshold=False):
+        """
+        Initialize the preprocessor. Every stage is off unless enabled.
+
+        Args:
+            grayscale (bool): Convert to a single channel
+            normalize_text_height (bool): Rescale so typical characters are target_text_height px
+            target_text_height (int): Character height the recogniser works best at
+            allow_upscale (bool): Also enlarge images whose text is smaller than
+                target_text_height (slower; by default images are only shrunk)
+            max_side (int): Never produce an image with a longer side than this
+            deskew (bool): Rotate so text lines are horizontal
+            max_skew (float): Largest rotation (degrees) deskew will correct
+            suppress_glare (bool): Flatten specular highlights and uneven lighting
+            glare_level (int): Gray level treated as saturated
+            threshold (bool): Adaptive threshold to black text on white
+        """
+        self.grayscale = grayscale
+        self.normalize_text_height = normalize_text_height
+        self.target_text_height = target_text_height
+        self.allow_upscale = allow_upscale
+        self.max_side = max_side
+        self.deskew = deskew
+        self.max_skew = max_skew
+        self.suppress_glare = suppress_glare
+        self.glare_level = glare_level
+        self.threshold = threshold
+
+    @classmethod
+    def from_preset(cls, name):
+        """
+        Create a preprocessor from a named preset ('none', 'fast', 'label', 'binary').
+
+        Args:
+            name (str): Preset name
+
+        Returns:
+            OCRPreprocessor: Configured preprocessor
+        """
+        if name not in PRESETS:
+            raise ValueError(f"Unknown preprocessing preset '{name}'. Choose from: {', '.join(PRESETS)}")
+        return cls(**PRESETS[name])
+
+    def config(self):
+        """Return the settings as a dict (used e.g. in cache keys)."""
+        return dict(vars(self))
+
+    def estimate_text_height(self, gray):
+        """
+        Estimate the typical character height from connected components.
+
+        Args:
+            gray (numpy.ndarray): Grayscale image
+
+        Returns:
+            float: Median character height in pixels, or None if no text-like blobs
+        """
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        # Text is usually the minority colour; make it the foreground
+        if cv2.countNonZero(binary) > binary.size / 2:
+            binary = cv2.bitwise_not(binary)
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        height = gray.shape[0]
+        heights = [
+            h for (x, y, w, h, area) in stats[1:count]
+            if 4 <= h <= height / 5 and w <= 4 * h and area >= 0.15 * w * h
+        ]
+        if len(heights) < 5:
+            return None
+        return float(np.median(heights))
+
+    def _glare_mask(self, gray):
+        """Mask of saturated highlight pixels, or None if there is no glare."""
+        mask = (gray >= self.glare_level).astype(np.uint8) * 255
+        fraction = cv2.countNonZero(mask) / mask.size
+        # A white label background is not glare; neither is a handful of pixels
+        if fraction < 0.001 or fraction > 0.3:
+            return None
+        return cv2.dilate(mask, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5)))
+
+    def _skew_angle(self, gray):
+        """Median angle (degrees) of text lines, or 0 if it cannot be measured."""
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        if cv2.countNonZero(binary) > binary.size / 2:
+            binary = cv2.bitwise_not(binary)
+        width = gray.shape[1]
+        lines = cv2.morphologyEx(binary, cv2.MORPH_CLOSE,
+                                 cv2.getStructuringElement(cv2.MORPH_RECT, (max(9, width // 40), 1)))
+
+        contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        angles = []
+        for contour in contours:
+            m = cv2.moments(contour)
+            if m['m00'] < 100:
+                continue
+            # Principal axis from second moments; robust to ascenders/descenders
+            spread = math.hypot(m['mu20'] - m['mu02'], 2 * m['mu11'])
+            major, minor = m['mu20'] + m['mu02'] + spread, m['mu20'] + m['mu02'] - spread
+            # Only long, thin blobs (aspect ratio > ~5) say anything about line direction
+            if minor <= 0 or major / minor < 25:
+                continue
+            angles.append(math.degrees(0.5 * math.atan2(2 * m['mu11'], m['mu20'] - m['mu02'])))
+        if len(angles) < 2:
+            return 0.0
+        return float(np.median(angles))
+
+    def process(self, image):
+        """
+        Run the enabled stages.
+
+        Args:
+            image (numpy.ndarray): BGR or grayscale image
+
+        Returns:
+            tuple: (processed_image, matrix) where matrix is the 3x3 affine
+                   transform from original to processed pixel coordinates
+        """
+        matrix = np.eye(3)
+        out = image
+
+        if self.grayscale and out.ndim == 3:
+            out = cv2.cvtColor(out, cv2.COLOR_BGR2GRAY)
+        gray = out if out.ndim == 2 else cv2.cvtColor(out, cv2.COLOR_BGR2GRAY)
+
+        # Resize first so every later stage works on fewer pixels
+        scale = 1.0
+        if self.normalize_text_height:
+            text_height = self.estimate_text_height(gray)
+            if text_height:
+                scale = np.clip(self.target_text_height / text_height, 0.25, 3.0 if self.allow_upscale else 1.0)
+        longest = max(out.shape[:2])
+        if longest * scale > self.max_side:
+            scale = self.max_side / longest
+        if abs(scale - 1.0) > 0.05:
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+            out = cv2.resize(out, None, fx=scale, fy=scale, interpolation=interpolation)
+            gray = out if out.ndim == 2 else cv2.cvtColor(out, cv2.COLOR_BGR2GRAY)
+            matrix = np.diag([scale, scale, 1.0]) @ matrix
+
+        if self.suppress_glare and self._glare_mask(gray) is not None:
+            # Glare is a smooth additive highlight: divide by a heavily blurred
+            # background estimate (computed small, so it's cheap) to flatten it
+            height, width = gray.shape
+            small = cv2.resize(gray, (max(1, width // 8), max(1, height // 8)),
+                               interpolation=cv2.INTER_AREA)
+            small = cv2.morphologyEx(small, cv2.MORPH_CLOSE,
+                                     cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5)))
+            background = cv2.resize(cv2.GaussianBlur(small, (0, 0), 3), (width, height),
+                                    interpolation=cv2.INTER_LINEAR).astype(np.float32)
+            gain = float(np.median(background)) / np.maximum(background, 1.0)
+            if out.ndim == 3:
+                gain = gain[..., None]
+            out = np.clip(out * gain, 0, 255).astype(np.uint8)
+            gray = out if out.ndim == 2 else cv2.cvtColor(out, cv2.COLOR_BGR2GRAY)
+
+        if self.deskew:
+            angle = self._skew_angle(gray)
+            if 0.5 <= abs(angle) <= self.max_skew:
+                height, width = out.shape[:2]
+                rotation = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+                out = cv2.warpAffine(out, rotation, (width, height),
+                                     flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+                matrix = np.vstack([rotation, [0, 0, 1]]) @ matrix
+
+        if self.threshold:
+            if out.ndim == 3:
+                out = cv2.cvtColor(out, cv2.COLOR_BGR2GRAY)
+            block = int(self.target_text_height * 1.5) | 1
+            out = cv2.adaptiveThreshold(out, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                        cv2.THRESH_BINARY, block, 10)
+            # Keep dark text on a light background whatever the label colours
+            if cv2.countNonZero(out) < out.size / 2:
+                out = cv2.bitwise_not(out)
+
+        return out, matrix
+
+
+def map_points(points, matrix):
+    """
+    Apply a 3x3 affine matrix to a list of [x, y] points.
+
+    Args:
+        points (list): [[x, y], ...]
+        matrix (numpy.ndarray): 3x3 affine transform
+
+    Returns:
+        list: Transformed [[x, y], ...] rounded to ints
+    """
+    pts = np.hstack([np.asarray(points, dtype=np.float64), np.ones((len(points), 1))])
+    mapped = pts @ matrix.T
+    return [[int(round(x)), int(round(y))] for (x, y, _) in mapped]
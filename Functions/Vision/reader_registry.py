@@ -0,0 +1,184 @@
+"""
+Process-wide registry of EasyOCR readers
+Loads each language set/backend once, shares it between OCRReader instances
+and can preload models on a background thread at service start
+"""
+
+import threading
+import time
+
+import easyocr
+
+from Functions.Vision.thread_tuning import apply_threads, load_profile
+
+
+def _load_easyocr(languages):
+    """Default loader: a CPU EasyOCR reader."""
+    return easyocr.Reader(list(languages), gpu=False)
+
+
+def _load_onnx(languages, quantized=False):
+    """EasyOCR reader whose networks run in onnxruntime."""
+    from Functions.Vision.onnx_backend import load_onnx_reader
+    return load_onnx_reader(list(languages), quantized=quantized)
+
+
+# Backend name -> loader taking a tuple of language codes
+LOADERS = {
+    'easyocr': _load_easyocr,
+    'onnx': _load_onnx,
+    'onnx-int8': lambda languages: _load_onnx(languages, quantized=True),
+}
+
+
+class _Entry:
+    def __init__(self, key):
+        self.key = key
+        self.reader = None
+        self.error = None
+        self.state = 'loading'
+        self.started_at = time.time()
+        self.load_seconds = None
+        self.ready = threading.Event()
+
+
+class ReaderRegistry:
+    def __init__(self, loaders=None, tune=True):
+        """
+        Initialize the registry.
+
+        Args:
+            loaders (dict): Backend name -> callable building a reader from a
+                tuple of language codes (defaults to LOADERS)
+            tune (bool): Apply the thread count stored by thread_tuning.py to
+                each reader as it loads
+        """
+        self.loaders = loaders or LOADERS
+        self.tune = tune
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    @staticmethod
+    def make_key(languages, backend='easyocr'):
+        """Normalise a language list so ['en', 'fr'] and ['fr', 'en'] share a reader."""
+        return tuple(sorted(languages)), backend
+
+    def _claim(self, key):
+        """
+        Return (entry, should_load). Only one caller gets should_load=True per load.
+        Failed loads are retried by the next caller.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.state == 'failed':
+                entry = _Entry(key)
+                self.entries[key] = entry
+                return entry, True
+            return entry, False
+
+    def _load(self, entry):
+        """Build the reader for entry and publish the result."""
+        languages, backend = entry.key
+        print(f"Loading OCR models for languages: {list(languages)} ({backend})")
+        start = time.perf_counter()
+        try:
+            if backend not in self.loaders:
+                raise ValueError(f"Unknown OCR backend '{backend}'. Choose from: {', '.join(self.loaders)}")
+            reader = self.loaders[backend](languages)
+            # Once, before the reader is shared: resizing thread pools under a running inference is unsafe
+            profile = load_profile(backend) if self.tune else None
+            if profile:
+                apply_threads(reader, profile['threads'])
+                print(f"Using tuned profile: {profile['threads']} thread(s)")
+            entry.reader = reader
+            entry.state = 'ready'
+        except Exception as e:
+            entry.error = str(e)
+            entry.state = 'failed'
+            print(f"Error loading OCR models: {e}")
+        entry.load_seconds = time.perf_counter() - start
+        if entry.state == 'ready':
+            print(f"OCR models ready in {entry.load_seconds:.1f}s")
+        entry.ready.set()
+
+    def get(self, languages, timeout=None, backend='easyocr'):
+        """
+        Get the shared reader for a language set, loading it if needed.
+
+        Args:
+            languages (list): Language codes
+            timeout (float): Maximum seconds to wait for a load in progress (None = forever)
+            backend (str): Inference backend ('easyocr', 'onnx', 'onnx-int8')
+
+        Returns:
+            easyocr.Reader: Shared reader, or None if loading failed or timed out
+        """
+        entry, should_load = self._claim(self.make_key(languages, backend))
+        if should_load:
+            self._load(entry)
+        elif not entry.ready.wait(timeout):
+            print("Timed out waiting for OCR models to load")
+            return None
+        return entry.reader
+
+    def preload(self, languages, backend='easyocr'):
+        """
+        Start loading a language set on a background thread.
+
+        Args:
+            languages (list): Language codes
+            backend (str): Inference backend ('easyocr', 'onnx', 'onnx-int8')
+
+        Returns:
+            threading.Event: Set once loading finishes (successfully or not)
+        """
+        entry, should_load = self._claim(self.make_key(languages, backend))
+        if should_load:
+            thread = threading.Thread(target=self._load, args=(entry,),
+                                      name="OCRPreload", daemon=True)
+            thread.start()
+        return entry.ready
+
+    def is_ready(self, languages, backend='easyocr'):
+        """Check whether a reader for the language set is loaded."""
+        with self.lock:
+            entry = self.entries.get(self.make_key(languages, backend))
+        return entry is not None and entry.state == 'ready'
+
+    def status(self):
+        """
+        Get readiness and load-time metrics for every language set.
+
+        Returns:
+            dict: {(languages, backend): {'state', 'load_seconds', 'elapsed_seconds', 'error'}}
+        """
+        with self.lock:
+            entries = list(self.entries.values())
+        return {
+            entry.key: {
+                'state': entry.state,
+                'load_seconds': entry.load_seconds,
+                'elapsed_seconds': time.time() - entry.started_at if entry.state == 'loading' else None,
+                'error': entry.error
+            }
+            for entry in entries
+        }
+
+
+# Shared by every OCRReader in the process
+registry = ReaderRegistry()
+
+
+def get_reader(languages, timeout=None, backend='easyocr'):
+    """Get the process-wide reader for a language set (see ReaderRegistry.get)."""
+    return registry.get(languages, timeout=timeout, backend=backend)
+
+
+def preload_reader(languages=('en',), backend='easyocr'):
+    """Start loading the process-wide reader in the background (see ReaderRegistry.preload)."""
+    return registry.preload(languages, backend=backend)
+
+
+def reader_status():
+    """Readiness and load-time metrics for the process-wide readers."""
+    return registry.status()
@@ -0,0 +1,196 @@
+"""
+Region-of-interest detection for food and label images
+Finds the text-dense label or dominant object with cheap OpenCV operations
+so OCR and the vision model only process the relevant pixels
+"""
+
+import cv2
+import numpy as np
+
+# Detection runs on a downscaled copy; boxes are mapped back to full size
+WORK_SIZE = 640
+
+
+def _prepare(image):
+    """Convert to a downscaled grayscale working image and return the scale."""
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape
+    scale = min(1.0, WORK_SIZE / max(height, width))
+    if scale < 1.0:
+        gray = cv2.resize(gray, (int(width * scale), int(height * scale)),
+                          interpolation=cv2.INTER_AREA)
+    return gray, scale
+
+
+def _union(boxes):
+    """Bounding box (x, y, w, h) enclosing all boxes."""
+    x0 = min(x for (x, y, w, h) in boxes)
+    y0 = min(y for (x, y, w, h) in boxes)
+    x1 = max(x + w for (x, y, w, h) in boxes)
+    y1 = max(y + h for (x, y, w, h) in boxes)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def find_text_region(gray, min_coverage=0.02, min_block_fraction=0.1):
+    """
+    Locate the text in a grayscale image.
+
+    Args:
+        gray (numpy.ndarray): Grayscale image
+        min_coverage (float): Minimum fraction of the image covered by text lines
+        min_block_fraction (float): Text blocks holding at least this fraction of
+            all text are kept (so a separate "Contains:" statement isn't cut
+            off); smaller ones are treated as clutter
+
+    Returns:
+        tuple: (x, y, w, h) of the label region, or None if no text found
+    """
+    height, width = gray.shape
+
+    # Black-hat/top-hat keep strokes smaller than the kernel (dark or light text)
+    # while suppressing large shapes such as the label border
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 7))
+    strokes = cv2.max(cv2.morphologyEx(gray, cv2.MORPH_BLACKHAT, kernel),
+                      cv2.morphologyEx(gray, cv2.MORPH_TOPHAT, kernel))
+    _, binary = cv2.threshold(strokes, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    # Close horizontally to join characters into lines
+    lines = cv2.morphologyEx(binary, cv2.MORPH_CLOSE,
+                             cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    text_mask = np.zeros_like(gray)
+    text_area = 0
+    line_heights = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        # Keep line-shaped blobs that are mostly filled with edges
+        if h < 6 or w < 2 * h or h > height // 4:
+            continue
+        if cv2.countNonZero(binary[y:y + h, x:x + w]) < 0.3 * w * h:
+            continue
+        text_mask[y:y + h, x:x + w] = 255
+        text_area += w * h
+        line_heights.append(h)
+
+    if text_area < min_coverage * width * height:
+        return None
+
+    # Merge lines closer than about one line spacing into blocks and keep
+    # every block holding a significant share of the text
+    merge = int(2 * np.median(line_heights)) + 1
+    blocks = cv2.dilate(text_mask, cv2.getStructuringElement(cv2.MORPH_RECT, (merge, merge)))
+    contours, _ = cv2.findContours(blocks, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    total_text = cv2.countNonZero(text_mask)
+    significant = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if cv2.countNonZero(text_mask[y:y + h, x:x + w]) >= min_block_fraction * total_text:
+            significant.append((x, y, w, h))
+
+    return _union(significant) if significant else None
+
+
+def find_object_region(gray, min_area=0.05, min_part_fraction=0.25):
+    """
+    Locate the dominant object in a grayscale image from its edges.
+
+    Args:
+        gray (numpy.ndarray): Grayscale image
+        min_area (float): Minimum fraction of the image the object must cover
+        min_part_fraction (float): Outlines at least this large relative to the
+            largest are kept as parts of the object (e.g. food split by a shadow)
+
+    Returns:
+        tuple: (x, y, w, h) of the object, or None if nothing large enough
+    """
+    height, width = gray.shape
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    # Low thresholds so low-contrast food on a plate still produces an outline
+    edges = cv2.Canny(blurred, 30, 90)
+    edges = cv2.dilate(edges, cv2.getStructuringElement(cv2.MORPH_RECT, (7, 7)))
+
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+
+    largest = max(cv2.contourArea(contour) for contour in contours)
+    x, y, w, h = _union([cv2.boundingRect(contour) for contour in contours
+                         if cv2.contourArea(contour) >= min_part_fraction * largest])
+    if w * h < min_area * width * height:
+        return None
+    return x, y, w, h
+
+
+def find_roi(image, padding=0.05, max_fraction=0.9):
+    """
+    Find the region worth analysing: a text label if present, else the main object.
+
+    Args:
+        image (numpy.ndarray): BGR or grayscale image
+        padding (float): Margin added around the region, as a fraction of its size
+        max_fraction (float): Regions covering more than this fraction of the
+            image are not worth cropping
+
+    Returns:
+        dict: {'bbox': (x, y, w, h), 'kind': 'label' or 'object'} in full-image
+              coordinates, or None to keep the whole image
+    """
+    gray, scale = _prepare(image)
+
+    kind = 'label'
+    region = find_text_region(gray)
+    if region is None:
+        kind = 'object'
+        region = find_object_region(gray)
+    if region is None:
+        return None
+
+    height, width = image.shape[:2]
+    x, y, w, h = (int(round(v / scale)) for v in region)
+    pad_x, pad_y = int(w * padding), int(h * padding)
+    x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+    x1, y1 = min(width, x + w + pad_x), min(height, y + h + pad_y)
+
+    if (x1 - x0) * (y1 - y0) > max_fraction * width * height:
+        return None
+
+    return {'bbox': (x0, y0, x1 - x0, y1 - y0), 'kind': kind}
+
+
+def crop_to_roi(image, padding=0.05):
+    """
+    Crop an image to its region of interest.
+
+    Args:
+        image (numpy.ndarray): BGR or grayscale image
+        padding (float): Margin added around the region
+
+    Returns:
+        tuple: (cropped_image, roi) where roi is the find_roi() dict, or
+               (image, None) when the whole image should be used
+    """
+    roi = find_roi(image, padding=padding)
+    if roi is None:
+        return image, None
+
+    x, y, w, h = roi['bbox']
+    return image[y:y + h, x:x + w], roi
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python roi.py <image_path>")
+        sys.exit(1)
+
+    image = cv2.imread(sys.argv[1])
+    cropped, roi = crop_to_roi(image)
+
+    if roi:
+        print(f"ROI ({roi['kind']}): {roi['bbox']}")
+        print(f"Pixels: {image.shape[0] * image.shape[1]} -> {cropped.shape[0] * cropped.shape[1]}")
+    else:
+        print("No ROI found, using full image")
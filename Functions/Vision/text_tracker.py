@@ -0,0 +1,219 @@
+"""
+Two-stage OCR for steady video of a label
+Runs text detection once, follows the boxes from frame to frame with phase
+correlation and only re-runs recognition on boxes whose pixels changed,
+re-detecting periodically or when the view moves too much
+"""
+
+import cv2
+import numpy as np
+
+
+class _Box:
+    def __init__(self, x, y, width, height):
+        self.x = float(x)
+        self.y = float(y)
+        self.width = width
+        self.height = height
+        self.text = None
+        self.confidence = 0.0
+        self.patch = None
+
+    def rect(self):
+        """Integer (x_min, y_min, x_max, y_max) at the current position."""
+        x, y = int(round(self.x)), int(round(self.y))
+        return x, y, x + self.width, y + self.height
+
+    def bbox(self):
+        """Corner points in EasyOCR's [[x, y], ...] format."""
+        x_min, y_min, x_max, y_max = self.rect()
+        return [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+
+
+class TextTracker:
+    def __init__(self, reader, redetect_every=30, max_shift=0.1, min_response=0.2,
+                 min_similarity=0.95, search_radius=4, track_scale=0.5, batch_size=8):
+        """
+        Initialize the tracker.
+
+        Args:
+            reader: Loaded easyocr.Reader (e.g. OCRReader.reader)
+            redetect_every (int): Run full detection at least every N frames
+            max_shift (float): Re-detect when the view moves more than this
+                fraction of the frame width between frames
+            min_response (float): Re-detect when phase correlation confidence drops below this
+            min_similarity (float): Normalised correlation with the last recognised
+                pixels below which a box counts as changed (1.0 = identical)
+            search_radius (int): Pixels each box may move beyond the global shift
+            track_scale (float): Downscale used for motion estimation
+            batch_size (int): Text boxes per recognition batch
+        """
+        self.reader = reader
+        self.redetect_every = redetect_every
+        self.max_shift = max_shift
+        self.min_response = min_response
+        self.min_similarity = min_similarity
+        self.search_radius = search_radius
+        self.track_scale = track_scale
+        self.batch_size = batch_size
+
+        self.boxes = []
+        self.previous = None
+        self.window = None
+        self.frames_since_detect = 0
+        self.stats = {'frames': 0, 'detections': 0, 'recognised': 0, 'reused': 0}
+
+    def reset(self):
+        """Forget tracked boxes; the next frame runs full detection."""
+        self.boxes = []
+        self.previous = None
+        self.frames_since_detect = 0
+
+    def _motion_image(self, gray):
+        """Small float image used for phase correlation."""
+        small = cv2.resize(gray, None, fx=self.track_scale, fy=self.track_scale,
+                           interpolation=cv2.INTER_AREA)
+        return np.float32(small)
+
+    @staticmethod
+    def _patch(gray, box):
+        """Lightly blurred pixels under a box (None if it left the frame)."""
+        x_min, y_min, x_max, y_max = box.rect()
+        height, width = gray.shape
+        if x_min < 0 or y_min < 0 or x_max > width or y_max > height:
+            return None
+        # Blur so sub-pixel misalignment doesn't count as change
+        return cv2.GaussianBlur(gray[y_min:y_max, x_min:x_max], (5, 5), 0)
+
+    def _refine(self, gray, box):
+        """
+        Snap a box to its stored pixels within a few pixels of where the
+        global shift put it, correcting per-box drift.
+
+        Returns:
+            float: Normalised correlation at the best match (robust to exposure
+                   changes), or None if the box is (partly) out of view
+        """
+        x_min, y_min, x_max, y_max = box.rect()
+        height, width = gray.shape
+        s = self.search_radius
+        if x_min - s < 0 or y_min - s < 0 or x_max + s > width or y_max + s > height:
+            return None
+        window = cv2.GaussianBlur(gray[y_min - s:y_max + s, x_min - s:x_max + s], (5, 5), 0)
+        scores = cv2.matchTemplate(window, box.patch, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (dx, dy) = cv2.minMaxLoc(scores)
+        box.x += dx - s
+        box.y += dy - s
+        return best
+
+    def _detect(self, gray):
+        """Run the text detector and start tracking its boxes."""
+        horizontal, free = self.reader.detect(gray)
+        rects = [list(map(int, box)) for box in horizontal[0]]
+        # Rotated boxes are tracked by their upright bounding rectangle
+        for points in free[0]:
+            xs, ys = [p[0] for p in points], [p[1] for p in points]
+            rects.append([int(min(xs)), int(max(xs)), int(min(ys)), int(max(ys))])
+
+        height, width = gray.shape
+        self.boxes = []
+        for x_min, x_max, y_min, y_max in rects:
+            x_min, y_min = max(0, x_min), max(0, y_min)
+            x_max, y_max = min(width, x_max), min(height, y_max)
+            if x_max - x_min > 1 and y_max - y_min > 1:
+                self.boxes.append(_Box(x_min, y_min, x_max - x_min, y_max - y_min))
+        self.frames_since_detect = 0
+        self.stats['detections'] += 1
+        return list(self.boxes)
+
+    def _recognise(self, gray, boxes):
+        """Recognise boxes in one batched pass and store their text and pixels."""
+        if not boxes:
+            return
+        by_corner = {}
+        horizontal = []
+        for box in boxes:
+            x_min, y_min, x_max, y_max = box.rect()
+            by_corner[(x_min, y_min)] = box
+            horizontal.append([x_min, x_max, y_min, y_max])
+        results = self.reader.recognize(gray, horizontal_list=horizontal, free_list=[],
+                                        batch_size=self.batch_size)
+        for box in boxes:
+            box.text, box.confidence = "", 0.0
+        # EasyOCR returns results sorted top-to-bottom; match them back by corner
+        for (bbox, text, confidence) in results:
+            box = by_corner.get((int(bbox[0][0]), int(bbox[0][1])))
+            if box is not None:
+                box.text, box.confidence = text, float(confidence)
+        for box in boxes:
+            box.patch = self._patch(gray, box)
+        self.stats['recognised'] += len(boxes)
+
+    def _track(self, gray):
+        """
+        Move boxes by the global shift since the last frame.
+
+        Returns:
+            bool: False if the motion is too large or unreliable to follow
+        """
+        current = self._motion_image(gray)
+        if self.previous is None or self.previous.shape != current.shape:
+            self.previous = current
+            return False
+        if self.window is None or self.window.shape != current.shape:
+            self.window = cv2.createHanningWindow(current.shape[::-1], cv2.CV_32F)
+
+        (dx, dy), response = cv2.phaseCorrelate(self.previous, current, self.window)
+        self.previous = current
+        dx, dy = dx / self.track_scale, dy / self.track_scale
+        if response < self.min_response or np.hypot(dx, dy) > self.max_shift * gray.shape[1]:
+            return False
+
+        for box in self.boxes:
+            box.x += dx
+            box.y += dy
+        return True
+
+    def update(self, frame):
+        """
+        Read text from the next video frame.
+
+        Args:
+            frame: Image array (numpy array from OpenCV)
+
+        Returns:
+            list: List of tuples containing (bounding_box, text, confidence)
+                  in frame coordinates
+        """
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.stats['frames'] += 1
+        self.frames_since_detect += 1
+
+        tracked = self._track(gray)
+        if not self.boxes or not tracked or self.frames_since_detect >= self.redetect_every:
+            self._recognise(gray, self._detect(gray))
+        else:
+            changed = []
+            for box in self.boxes:
+                if box.patch is None:
+                    # Was out of view when last recognised
+                    if self._patch(gray, box) is not None:
+                        changed.append(box)
+                    continue
+                similarity = self._refine(gray, box)
+                if similarity is None:
+                    continue
+                if similarity < self.min_similarity:
+                    changed.append(box)
+                else:
+                    self.stats['reused'] += 1
+            self._recognise(gray, changed)
+
+        height, width = gray.shape
+        results = []
+        for box in self.boxes:
+            x_min, y_min, x_max, y_max = box.rect()
+            # Boxes that drifted out of view are kept (they may come back) but not reported
+            if box.text and x_min >= 0 and y_min >= 0 and x_max <= width and y_max <= height:
+                results.append((box.bbox(), box.text, box.confidence))
+        return results
@@ -0,0 +1,150 @@
+"""
+CPU thread tuning for OCR inference
+Measures OCR throughput across intra-op thread counts and recognition batch
+sizes, stores the best profile per backend and applies it when the shared
+reader loads, so inference doesn't oversubscribe cores shared with audio
+capture and the camera thread
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import json
+import time
+
+PROFILE_PATH = os.environ.get('BAYMIN_OCR_PROFILE',
+                              os.path.join(os.path.expanduser('~'), '.EasyOCR', 'thread_profile.json'))
+
+# A setting within this fraction of the best throughput counts as a tie;
+# ties go to fewer threads to leave cores for everything else
+TIE_FRACTION = 0.05
+
+
+def apply_threads(reader, threads):
+    """
+    Set the intra-op thread count for a loaded reader.
+
+    Args:
+        reader: easyocr.Reader (PyTorch or onnxruntime backed)
+        threads (int): Thread count
+    """
+    import torch
+    torch.set_num_threads(threads)
+    # onnxruntime sessions carry their own thread pools (see onnx_backend.OnnxModule)
+    for network in (getattr(reader, 'detector', None), getattr(reader, 'recognizer', None)):
+        if hasattr(network, 'set_num_threads'):
+            network.set_num_threads(threads)
+
+
+def _read_profiles(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Could not read OCR thread profile: {e}")
+        return {}
+
+
+def load_profile(backend, path=PROFILE_PATH):
+    """
+    Get the stored profile for a backend on this machine.
+
+    Returns:
+        dict: {'threads', 'batch_size', ...} or None if not calibrated here
+    """
+    profile = _read_profiles(path).get(backend)
+    if profile is None:
+        return None
+    if profile.get('cpu_count') != os.cpu_count():
+        print(f"Ignoring OCR thread profile calibrated for {profile.get('cpu_count')} CPUs")
+        return None
+    return profile
+
+
+def save_profile(backend, profile, path=PROFILE_PATH):
+    """Store a backend's profile, keeping other backends' profiles."""
+    profiles = _read_profiles(path)
+    profiles[backend] = profile
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(profiles, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def calibrate(ocr, images, thread_counts=None, batch_sizes=(1, 4, 8), repeats=2):
+    """
+    Measure throughput for every thread count x batch size.
+
+    Args:
+        ocr (OCRReader): Initialised reader (its cache should be off)
+        images (list): Representative images
+        thread_counts (list): Candidates (default 1..cpu_count)
+        batch_sizes (list): Recognition batch sizes to try
+        repeats (int): Timed passes per setting (best is kept)
+
+    Returns:
+        dict: Best profile with 'threads', 'batch_size', 'images_per_second',
+              'cpu_count' and all 'measurements'
+    """
+    thread_counts = thread_counts or range(1, (os.cpu_count() or 1) + 1)
+    measurements = []
+
+    for threads in thread_counts:
+        apply_threads(ocr.reader, threads)
+        ocr.read_text_batch(images[:1])  # warm-up after pool resize
+        for batch_size in batch_sizes:
+            best = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                ocr.read_text_batch(images, batch_size=batch_size)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            rate = len(images) / best
+            measurements.append({'threads': threads, 'batch_size': batch_size, 'images_per_second': rate})
+            print(f"  threads={threads} batch_size={batch_size}: {rate:.2f} images/s")
+
+    top = max(m['images_per_second'] for m in measurements)
+    good = [m for m in measurements if m['images_per_second'] >= top * (1 - TIE_FRACTION)]
+    choice = min(good, key=lambda m: (m['threads'], -m['images_per_second']))
+    return dict(choice, cpu_count=os.cpu_count(), measured_at=time.time(), measurements=measurements)
+
+
+def main():
+    """Calibrate OCRReader on the synthetic corpus and store the best profile."""
+    import argparse
+
+    from Functions.Vision import ocr_corpus
+    from Functions.Vision.ocr_reader import DEFAULT_BACKEND, OCRReader
+
+    parser = argparse.ArgumentParser(description='Calibrate OCR thread count and batch size')
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, help='OCR backend to calibrate')
+    parser.add_argument('--threads', help='Comma-separated thread counts (default 1..cpu_count)')
+    parser.add_argument('--batch-sizes', default='1,4,8', help='Comma-separated recognition batch sizes')
+    parser.add_argument('--samples', type=int, default=5, help='Corpus images per pass')
+    parser.add_argument('--profile', default=PROFILE_PATH, help='Profile file to update')
+
+    args = parser.parse_args()
+    ocr = OCRReader(backend=args.backend, tune=False)
+    if not ocr.initialize():
+        sys.exit(1)
+
+    images = [entry['image'] for entry in ocr_corpus.load()[:args.samples]]
+    print(f"Calibrating {args.backend} on {len(images)} images ({os.cpu_count()} CPUs)")
+    profile = calibrate(
+        ocr, images,
+        thread_counts=[int(t) for t in args.threads.split(',')] if args.threads else None,
+        batch_sizes=[int(b) for b in args.batch_sizes.split(',')]
+    )
+    save_profile(args.backend, profile, args.profile)
+    print(f"Best: threads={profile['threads']} batch_size={profile['batch_size']} "
+          f"({profile['images_per_second']:.2f} images/s); saved to {args.profile}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 """
 Wake word detection using speech recognition
-Continuously listens for "hey baymax" and opens camera window
+Runs as a long-lived service: listens for "hey baymax", takes a photo,
+checks it for allergens, announces the verdict and goes back to listening
 Works on Windows/Mac/Linux
+
+Two engines: 'local' spots the wake phrase on-device against enrolled
+recordings (see WakeSpotter.py), 'google' transcribes each phrase online
 """
 
 import sys
@@ -9,28 +13,66 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from Peripherals.camera import Camera
+from Peripherals.audio_hub import get_hub
+from Peripherals.mic import track_noise_floor
 from WakeCamera import WakeCameraCapture
+from WakeSpotter import FEATURE_RATE, WakeSpotter
 import speech_recognition as sr
 import time
 import cv2
 
+# Service states
+IDLE = "idle"
+LISTENING = "listening"
+CAPTURING = "capturing"
+ANALYSING = "analysing"
+ANNOUNCING = "announcing"
+
+
 class WakeWordDetector:
-    def __init__(self, wake_word="hey", device_index=None):
+    def __init__(self, wake_word="hey", device_index=None, engine="local", cooldown=3.0):
         """
         Initialize wake word detection with speech recognition.
         
         Args:
-            wake_word (str): Wake phrase to listen for
-            device_index (int): Microphone device index (None for default)
+            wake_word (str): Wake phrase to listen for (google engine)
+            device_index (int or str): Microphone device index or part of its
+                name (None = BAYMIN_MIC_DEVICE, else the default device)
+            engine (str): 'local' for the offline spotter (falls back to
+                'google' if no wake phrase is enrolled) or 'google'
+            cooldown (float): Seconds after a scan during which wake words are
+                ignored (so the spoken verdict can't re-trigger it)
         """
         self.wake_word = wake_word.lower()
         self.device_index = device_index
-        self.camera_capture = WakeCameraCapture()
+        self.engine = engine
+        self.cooldown = cooldown
+        self.spotter = None
         self.is_running = False
         self.recognizer = sr.Recognizer()
         
+        # One input stream shared with everything else that listens (commands, recording)
+        self.hub = get_hub(device=device_index, speech_rate=FEATURE_RATE)
+        self.attached = False
+        
+        # Created once and reused for every wake: camera, capture store,
+        # allergy checker and TTS engine
+        self.camera_capture = WakeCameraCapture()
+        
+        self.state = IDLE
+        self.scans = 0
+        self.max_scans = None
+        self.cooldown_until = 0.0
+        
         print(f"Initializing wake word detection...")
-        print(f"Wake word: '{wake_word}'")
+        if engine == "local":
+            self.spotter = WakeSpotter()
+            if not self.spotter.enrolled:
+                print("No wake phrase enrolled (run WakeSpotter.py enroll); using Google recognition")
+                self.engine = "google"
+                self.spotter = None
+        if self.engine == "google":
+            print(f"Wake word: '{wake_word}'")
         
     def initialize(self):
         """Initialize speech recognition."""
@@ -39,9 +81,15 @@ class WakeWordDetector:
             for i, name in enumerate(sr.Microphone.list_microphone_names()):
                 print(f"  {i}: {name}")
             
-            # Test microphone access
-            with sr.Microphone(device_index=self.device_index) as source:
-                print(f"\nUsing microphone: {self.device_index or 'default'}")
+            # Open the shared input and keep it open while the service runs
+            if not self.attached:
+                self.attached = self.hub.attach()
+            if not self.attached:
+                return False
+            device = self.hub.device_index
+            print(f"\nUsing microphone: {'default' if device is None else device}")
+            
+            with self.hub.source("calibration") as source:
                 print("Adjusting for ambient noise...")
                 self.recognizer.adjust_for_ambient_noise(source, duration=1)
                 print("Ready!")
@@ -51,58 +99,154 @@ class WakeWordDetector:
             print(f"Error initializing: {e}")
             return False
     
-    def listen_continuously(self):
-        """Continuously listen for the wake word."""
+    def _set_state(self, state):
+        """Move to a new service state."""
+        if state != self.state:
+            print(f"[{self.state} -> {state}]")
+            self.state = state
+    
+    def _cooling_down(self):
+        """True while wake words are being ignored after a scan."""
+        return time.monotonic() < self.cooldown_until
+    
+    def _speculate(self, speaking):
+        """
+        Follow speech onset/offset: start opening the camera and the API
+        connection when speech starts, drop them if it wasn't the wake word.
+        """
+        if speaking and not self._cooling_down():
+            self.camera_capture.prepare()
+        elif not speaking:
+            self.camera_capture.discard()
+    
+    def _on_wake(self, source):
+        """
+        Run one capture -> analyse -> announce cycle, then resume listening.
+        
+        Args:
+            source (HubSource): Audio source being listened to
+        """
+        if self._cooling_down():
+            print("Wake word ignored (cooling down)")
+            self.camera_capture.discard()
+            return
+        
         print("\n" + "=" * 60)
-        print("Listening for wake word: '%s'" % self.wake_word)
+        print("WAKE WORD DETECTED!")
+        print("=" * 60)
+        
+        try:
+            self._set_state(CAPTURING)
+            photo_path = self.camera_capture.capture_photo()
+            
+            result = None
+            if photo_path:
+                self._set_state(ANALYSING)
+                result = self.camera_capture.analyse(photo_path)
+            
+            if result:
+                self._set_state(ANNOUNCING)
+                self.camera_capture.announce(result)
+                print(f"\nImage: {result['image_path']}")
+                print(f"Verdict: {result['verdict']}")
+                if result['allergies_found']:
+                    print(f"Allergens: {', '.join(result['allergies_found'])}")
+            elif photo_path:
+                print(f"Photo saved: {photo_path}")
+        except Exception as e:
+            # A failed scan must not take the service down
+            print(f"Error during scan: {e}")
+        
+        self.scans += 1
+        self.cooldown_until = time.monotonic() + self.cooldown
+        # Audio heard during the scan (including our own announcement) is stale:
+        # resume reading at the newest audio instead of the start of the scan
+        source.stream.skip_to_now()
+        if self.spotter:
+            self.spotter.reset()
+        
+        if self.max_scans and self.scans >= self.max_scans:
+            print("\nScan limit reached. Exiting...")
+            self.is_running = False
+            return
+        
+        self._set_state(LISTENING)
+        print("\nListening for the next wake word...")
+    
+    def _listen_local(self, source):
+        """Stream audio through the offline spotter until the wake phrase matches."""
+        self.spotter.set_sample_rate(source.SAMPLE_RATE)
+        speaking = False
+        while self.is_running:
+            match = self.spotter.process(source.stream.read(source.CHUNK))
+            if match:
+                print(f"Heard wake phrase (distance {match['distance']:.2f})")
+                self._on_wake(source)
+            elif self.spotter.speaking != speaking:
+                self._speculate(self.spotter.speaking)
+            speaking = self.spotter.speaking
+    
+    def _listen_google(self, source):
+        """Transcribe each phrase online and look for the wake word in the text."""
+        # The energy threshold follows the noise floor from the audio being
+        # listened to, so there is no recalibration pause before each phrase
+        track_noise_floor(self.recognizer, source)
+        while self.is_running:
+            try:
+                # Listen for speech
+                audio = self.recognizer.listen(source, timeout=2, phrase_time_limit=3)
+                
+                # Get the camera going while the phrase is being transcribed
+                self._speculate(True)
+                
+                # Recognize speech
+                text = self.recognizer.recognize_google(audio).lower()
+                print(f"Heard: '{text}'")
+                
+                # Check for wake word
+                if self.wake_word in text:
+                    self._on_wake(source)
+                else:
+                    self._speculate(False)
+                    
+            except sr.WaitTimeoutError:
+                # No speech detected, continue
+                continue
+            except sr.UnknownValueError:
+                # Speech not understood, continue
+                self._speculate(False)
+                continue
+            except sr.RequestError as e:
+                print(f"Speech recognition error: {e}")
+                self._speculate(False)
+                continue
+    
+    def listen_continuously(self, max_scans=None):
+        """
+        Listen for the wake word and run a scan on each one until stopped.
+        
+        Args:
+            max_scans (int): Exit after this many scans (None = run until stopped)
+        """
+        print("\n" + "=" * 60)
+        if self.engine == "local":
+            print("Listening for the enrolled wake phrase (offline)")
+        else:
+            print("Listening for wake word: '%s'" % self.wake_word)
         print("Press Ctrl+C to stop")
         print("=" * 60 + "\n")
         
         self.is_running = True
+        self.max_scans = max_scans
+        self._set_state(LISTENING)
         
         try:
-            with sr.Microphone(device_index=self.device_index) as source:
-                while self.is_running:
-                    try:
-                        # Listen for speech
-                        self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
-                        audio = self.recognizer.listen(source, timeout=2, phrase_time_limit=3)
-                        
-                        # Recognize speech
-                        text = self.recognizer.recognize_google(audio).lower()
-                        print(f"Heard: '{text}'")
-                        
-                        # Check for wake word
-                        if self.wake_word in text:
-                            print("\n" + "=" * 60)
-                            print("WAKE WORD DETECTED!")
-                            print("=" * 60)
-                            
-                            # Trigger camera capture and allergy check
-                            result = self.camera_capture.capture_on_wake()
-                            
-                            if result:
-                                if isinstance(result, dict):
-                                    print(f"\nImage: {result['image_path']}")
-                                    print(f"Verdict: {result['verdict']}")
-                                    if result['allergies_found']:
-                                        print(f"Allergens: {', '.join(result['allergies_found'])}")
-                                else:
-                                    print(f"Photo saved: {result}")
-                            
-                            print("\nAnalysis complete. Exiting...")
-                            self.is_running = False
-                            break
-                            
-                    except sr.WaitTimeoutError:
-                        # No speech detected, continue
-                        continue
-                    except sr.UnknownValueError:
-                        # Speech not understood, continue
-                        continue
-                    except sr.RequestError as e:
-                        print(f"Speech recognition error: {e}")
-                        continue
+            # Reads continue from the shared buffer: no device open per session
+            with self.hub.source("wake") as source:
+                if self.engine == "local":
+                    self._listen_local(source)
+                else:
+                    self._listen_google(source)
                         
         except KeyboardInterrupt:
             print("\n\nStopping wake word detection...")
@@ -110,9 +254,23 @@ class WakeWordDetector:
             self.is_running = False
             self.cleanup()
     
+    def stop(self):
+        """Ask the service loop to finish (safe to call from another thread)."""
+        self.is_running = False
+    
     def cleanup(self):
         """Clean up resources."""
         self.is_running = False
+        self._set_state(IDLE)
+        if self.attached:
+            self.attached = False
+            self.hub.detach()
+        self.camera_capture.discard(immediate=True)
+        self.camera_capture.storage.stop()
+        stats = self.camera_capture.speculation_stats
+        if stats['started']:
+            print(f"Speculative captures: {stats['started']} started, "
+                  f"{stats['committed']} used, {stats['discarded']} discarded")
         cv2.destroyAllWindows()
         print("Cleanup complete")
 
@@ -134,9 +292,19 @@ if __name__ == "__main__":
     logging.info("BAYMIN WAKE WORD SERVICE STARTING")
     logging.info("=" * 60)
     
+    # Optionally load OCR models in the background so the first scan doesn't stall
+    # (e.g. BAYMIN_OCR_PRELOAD=en or BAYMIN_OCR_PRELOAD=en,fr)
+    ocr_languages = os.getenv('BAYMIN_OCR_PRELOAD')
+    if ocr_languages:
+        from Functions.Vision.reader_registry import preload_reader
+        preload_reader(ocr_languages.split(','), backend=os.getenv('BAYMIN_OCR_BACKEND', 'easyocr'))
+        logging.info(f"Preloading OCR models for: {ocr_languages}")
+    
     # Create wake word detector
-    # Set device_index=None for default mic, or specify a number from the list
-    detector = WakeWordDetector(wake_word="hey", device_index=None)
+    # Set device_index=None for the default mic (or BAYMIN_MIC_DEVICE), or a number/name from the list
+    # BAYMIN_WAKE_ENGINE=google uses online transcription instead of the offline spotter
+    detector = WakeWordDetector(wake_word="hey", device_index=None,
+                                engine=os.getenv('BAYMIN_WAKE_ENGINE', 'local'))
     
     # Initialize
     if detector.initialize():
@@ -7,29 +7,120 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from Peripherals.camera import Camera
+from Peripherals.camera import create_camera
+from Peripherals.frame_grabber import FrameGrabber
 from AllergyCheck import AllergyChecker
+from CaptureStorage import CaptureStorage
 from VoiceAnnounce import TextToSpeech
 import cv2
+import threading
 import time
-from datetime import datetime
-import os
+
+
+class _SpeculativeCamera:
+    """
+    Camera opened and warmed up in the background on a guess that a photo
+    will be wanted. take() uses it; cancel() closes it without waiting.
+    
+    The Camera is shared with every other speculation and the direct capture
+    path, so it is only touched while holding camera_lock: a speculation
+    acquires it before opening and releases it after closing what it opened.
+    """
+    
+    def __init__(self, camera, camera_lock):
+        self.camera = camera
+        self.camera_lock = camera_lock
+        self.owns_camera = False
+        self.grabber = None
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.cancelled = False
+        self.closed = False
+        self.expires = None
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._open, name="SpeculativeCamera", daemon=True)
+        self.thread.start()
+    
+    def _open(self):
+        """Initialize (including auto-exposure warm-up) and start buffering frames."""
+        # Waits for an earlier speculation (or a direct capture) to let go of the camera
+        self.camera_lock.acquire()
+        self.owns_camera = True
+        with self.lock:
+            abandoned = self.cancelled or self.closed
+        opened = not abandoned and self.camera.initialize()
+        with self.lock:
+            keep = opened and not (self.cancelled or self.closed)
+            if keep:
+                self.grabber = FrameGrabber(self.camera.camera)
+                self.grabber.start()
+            self.ready.set()
+        if not keep:
+            self._release()
+    
+    def take(self, timeout=5.0):
+        """
+        Get a frame captured after this call, then close the camera.
+        
+        Returns:
+            numpy.ndarray: Frame, or None if the camera didn't come up in time
+        """
+        self.ready.wait(timeout)
+        frame = None
+        with self.lock:
+            grabber = self.grabber
+        if grabber is not None:
+            frame_id, _ = grabber.read()
+            _, frame = grabber.wait_for_frame(frame_id, timeout=1.0)
+        self.close()
+        return frame
+    
+    def cancel(self):
+        """Abandon the speculation; the camera is closed once it finishes opening."""
+        with self.lock:
+            self.cancelled = True
+        threading.Thread(target=self.close, daemon=True).start()
+    
+    def close(self):
+        """Stop buffering and release the camera (idempotent)."""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            if not self.ready.is_set():
+                return  # still opening: _open releases it when it gets there
+            grabber, self.grabber = self.grabber, None
+        self._release(grabber)
+    
+    def _release(self, grabber=None):
+        """Release what this speculation opened and hand the camera back."""
+        if grabber:
+            grabber.stop()
+        if self.owns_camera:
+            self.owns_camera = False
+            self.camera.release()
+            self.camera_lock.release()
+
 
 class WakeCameraCapture:
-    def __init__(self, save_path="/tmp/baymin_captures", check_allergies=True):
+    def __init__(self, save_path="/tmp/baymin_captures", check_allergies=True, speculation_linger=1.0):
         """
         Initialize wake camera capture.
         
         Args:
             save_path (str): Directory to save captured images
             check_allergies (bool): Whether to check images for allergens using Gemini
+            speculation_linger (float): Seconds a discarded speculation stays open
+                in case speech resumes (debounces rapid onsets)
         """
-        self.camera = Camera()
+        self.camera = create_camera()
+        self.camera_lock = threading.Lock()
         self.save_path = save_path
         self.check_allergies = check_allergies
         
-        # Create save directory if it doesn't exist
-        os.makedirs(save_path, exist_ok=True)
+        # Rotating, de-duplicated capture store (creates save_path)
+        self.storage = CaptureStorage(save_path)
+        self.storage.start_background_compaction()
         
         # Initialize allergy checker if enabled
         self.allergy_checker = None
@@ -43,15 +134,89 @@ class WakeCameraCapture:
                 print(f"Allergy checker disabled: {e}")
                 self.check_allergies = False
         
-    def capture_on_wake(self):
+        self.speculation = None
+        self.speculation_linger = speculation_linger
+        self.speculation_lock = threading.Lock()
+        self.speculation_stats = {'started': 0, 'committed': 0, 'discarded': 0}
+    
+    def prepare(self):
         """
-        Take ONE photo immediately when wake word is detected.
+        Speculatively get ready for a photo (call at speech onset): open and
+        warm up the camera, buffer frames and open the API connection in the
+        background. capture_photo() then uses the warm camera; discard()
+        drops it if the wake word isn't confirmed.
+        """
+        with self.speculation_lock:
+            if self.speculation is not None:
+                # Speech resumed before a pending discard: keep the open camera
+                self.speculation.expires = None
+                return
+            self.speculation = _SpeculativeCamera(self.camera, self.camera_lock)
+            self.speculation_stats['started'] += 1
+        if self.check_allergies and self.allergy_checker:
+            threading.Thread(target=self.allergy_checker.warm_up, name="APIWarmUp", daemon=True).start()
+    
+    def discard(self, immediate=False):
+        """
+        Drop a speculative preparation without blocking the caller.
+        
+        Args:
+            immediate (bool): Close now instead of after speculation_linger
+        """
+        with self.speculation_lock:
+            speculation = self.speculation
+            if speculation is None:
+                return
+            if immediate or self.speculation_linger <= 0:
+                speculation.expires = 0.0
+            elif speculation.expires is None:
+                speculation.expires = time.monotonic() + self.speculation_linger
+                timer = threading.Timer(self.speculation_linger, self._expire, args=(speculation,))
+                timer.daemon = True
+                timer.start()
+                return
+            else:
+                return  # already scheduled
+        self._expire(speculation)
+    
+    def _expire(self, speculation):
+        """Cancel a discarded speculation unless speech resumed or it was used meanwhile."""
+        with self.speculation_lock:
+            if (self.speculation is not speculation or speculation.expires is None
+                    or time.monotonic() < speculation.expires):
+                return
+            self.speculation = None
+            self.speculation_stats['discarded'] += 1
+        speculation.cancel()
+        
+    def capture_photo(self):
+        """
+        Open the camera, take one photo and close it again.
+        
+        Uses the camera already warmed up by prepare() when there is one.
         
         Returns:
-            str or dict: Path to saved image, or result dict with allergy info
+            str: Path to the saved photo, or None if capture failed
         """
-        print("\nWake word detected! Taking photo...")
+        with self.speculation_lock:
+            speculation, self.speculation = self.speculation, None
+            if speculation is not None:
+                self.speculation_stats['committed'] += 1
+        if speculation is not None:
+            image = speculation.take()
+            print(f"Speculative capture: photo {(time.perf_counter() - speculation.started_at) * 1000:.0f} ms after onset")
+            if image is not None:
+                photo_path = self.storage.save(image, prefix="wake", dedup=False)
+                print(f"Photo saved: {photo_path}")
+                return photo_path
+            print("Speculative camera not ready; opening it now")
         
+        # Wait for any speculation still closing to hand the camera back
+        with self.camera_lock:
+            return self._capture_direct()
+    
+    def _capture_direct(self):
+        """Open, shoot and close (caller holds camera_lock)."""
         # Initialize camera
         if not self.camera.initialize():
             print("Failed to initialize camera")
@@ -60,15 +225,15 @@ class WakeCameraCapture:
         photo_path = None
         
         try:
-            # Warm up camera (Windows needs a few frames)
-            for _ in range(10):
-                self.camera.capture_image()
-                time.sleep(0.1)
+            # Camera.initialize already waited for auto-exposure to settle
+            warmup = self.camera.warmup_stats
+            if warmup:
+                print(f"Warm-up: {warmup['frames']} frames, {warmup['ms']:.0f} ms")
             
             # Take the photo
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"wake_{timestamp}.jpg"
-            image, photo_path = self.camera.capture_and_save(self.save_path, filename)
+            image = self.camera.capture_image()
+            if image is not None:
+                photo_path = self.storage.save(image, prefix="wake", dedup=False)
             
             if photo_path:
                 print(f"Photo saved: {photo_path}")
@@ -81,25 +246,58 @@ class WakeCameraCapture:
             self.camera.release()
             print("Camera closed\n")
         
-        # Check for allergies if photo was taken
-        if photo_path and self.check_allergies and self.allergy_checker:
-            result = self.allergy_checker.check_food_safety(photo_path)
-            
-            # Announce verdict with TTS including reasoning
-            self.tts.announce_verdict(
-                safe=result['safe'],
-                allergies_found=result['allergies_found'],
-                reasoning=result.get('analysis', '')
-            )
+        return photo_path
+    
+    def analyse(self, photo_path):
+        """
+        Check a photo for the current user's allergens.
+        
+        Args:
+            photo_path (str): Saved photo
             
-            # Return result with allergy info
-            return {
-                'image_path': photo_path,
-                'safe': result['safe'],
-                'allergies_found': result['allergies_found'],
-                'verdict': "DO NOT EAT" if result['safe'] is False else "SAFE TO EAT",
-                'reasoning': result.get('analysis', '')
-            }
+        Returns:
+            dict: Result with image_path, safe, allergies_found, verdict and
+                  reasoning, or None if allergy checking is disabled
+        """
+        if not (self.check_allergies and self.allergy_checker):
+            return None
+        
+        # The logged-in user can change between scans in a long-running service
+        self.allergy_checker.current_user = self.allergy_checker.load_user_data()
+        result = self.allergy_checker.check_food_safety(photo_path)
+        
+        return {
+            'image_path': photo_path,
+            'safe': result['safe'],
+            'allergies_found': result['allergies_found'],
+            'verdict': "DO NOT EAT" if result['safe'] is False else "SAFE TO EAT",
+            'reasoning': result.get('analysis', '')
+        }
+    
+    def announce(self, result):
+        """Speak the verdict of an analysis, including the reasoning."""
+        self.tts.announce_verdict(
+            safe=result['safe'],
+            allergies_found=result['allergies_found'],
+            reasoning=result['reasoning']
+        )
+    
+    def capture_on_wake(self):
+        """
+        Take ONE photo immediately when wake word is detected.
+        
+        Returns:
+            str or dict: Path to saved image, or result dict with allergy info
+        """
+        print("\nWake word detected! Taking photo...")
+        
+        photo_path = self.capture_photo()
+        
+        # Check for allergies if photo was taken
+        result = self.analyse(photo_path) if photo_path else None
+        if result:
+            self.announce(result)
+            return result
         
         return photo_path
 
@@ -0,0 +1,367 @@
+"""
+Offline wake-word spotting
+Energy-based voice activity detection cuts the audio stream into short
+utterances; each one is turned into MFCC features and compared with
+enrolled recordings of the wake phrase using dynamic time warping.
+Runs entirely on-device: no audio leaves the machine and no network is needed.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copy
+
+import numpy as np
+
+FEATURE_RATE = 16000
+DEFAULT_TEMPLATES = os.getenv(
+    'BAYMIN_WAKE_TEMPLATES',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'wake_templates.npz')
+)
+
+_mel_cache = {}
+
+
+def to_feature_rate(samples, sample_rate):
+    """Linearly resample int16/float samples to FEATURE_RATE as float32."""
+    samples = np.asarray(samples, dtype=np.float32)
+    if sample_rate == FEATURE_RATE or len(samples) == 0:
+        return samples
+    duration = len(samples) / sample_rate
+    target = np.arange(int(duration * FEATURE_RATE)) / FEATURE_RATE
+    return np.interp(target, np.arange(len(samples)) / sample_rate, samples).astype(np.float32)
+
+
+def _mel_filterbank(n_fft, n_mels, sample_rate):
+    """Triangular mel filters as an (n_mels, n_fft // 2 + 1) matrix."""
+    key = (n_fft, n_mels, sample_rate)
+    if key not in _mel_cache:
+        def hz_to_mel(hz):
+            return 2595 * np.log10(1 + hz / 700)
+
+        def mel_to_hz(mel):
+            return 700 * (10 ** (mel / 2595) - 1)
+
+        mels = np.linspace(hz_to_mel(60), hz_to_mel(sample_rate / 2), n_mels + 2)
+        bins = np.floor((n_fft + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+        filters = np.zeros((n_mels, n_fft // 2 + 1), np.float32)
+        for m in range(1, n_mels + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                filters[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                filters[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        _mel_cache[key] = filters
+    return _mel_cache[key]
+
+
+def mfcc(samples, sample_rate=FEATURE_RATE, frame_ms=25, hop_ms=10, n_mels=26, n_mfcc=13):
+    """
+    Mel-frequency cepstral coefficients with per-utterance mean normalisation.
+
+    Args:
+        samples: Mono audio samples (int16 or float)
+        sample_rate (int): Sample rate of samples
+
+    Returns:
+        numpy.ndarray: (frames, n_mfcc - 1) features (c0/loudness dropped)
+    """
+    signal = to_feature_rate(samples, sample_rate)
+    frame = int(FEATURE_RATE * frame_ms / 1000)
+    hop = int(FEATURE_RATE * hop_ms / 1000)
+    if len(signal) < frame:
+        return np.zeros((0, n_mfcc - 1), np.float32)
+
+    # Pre-emphasis, then overlapping Hamming-windowed frames
+    signal = np.append(signal[0], signal[1:] - 0.97 * signal[:-1])
+    count = 1 + (len(signal) - frame) // hop
+    index = np.arange(frame)[None, :] + hop * np.arange(count)[:, None]
+    frames = signal[index] * np.hamming(frame)
+
+    n_fft = 512
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+    energies = np.log(power @ _mel_filterbank(n_fft, n_mels, FEATURE_RATE).T + 1e-6)
+
+    # DCT-II of the log mel energies
+    n = np.arange(n_mels)
+    dct = np.cos(np.pi / n_mels * (n[None, :] + 0.5) * np.arange(n_mfcc)[:, None])
+    features = energies @ dct.T
+    features = features[:, 1:]
+    return (features - features.mean(axis=0)).astype(np.float32)
+
+
+def dtw_distance(a, b):
+    """
+    Length-normalised DTW distance between two feature sequences.
+
+    Steps are limited to slopes between 1/2 and 2 (so one word can't be
+    matched against a stretch of unrelated audio), which also lets each row
+    be computed from the two previous rows in one vectorised step.
+    """
+    n, m = len(a), len(b)
+    if n == 0 or m == 0 or n > 2 * m or m > 2 * n:
+        return np.inf
+    cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+
+    total = np.full((n, m), np.inf)
+    total[0, 0] = 2 * cost[0, 0]
+    for i in range(1, n):
+        best = np.full(m, np.inf)
+        best[1:] = total[i - 1, :-1] + 2 * cost[i, 1:]
+        if i >= 2:
+            best[1:] = np.minimum(best[1:], total[i - 2, :-1] + 3 * cost[i, 1:])
+        best[2:] = np.minimum(best[2:], total[i - 1, :-2] + 3 * cost[i, 2:])
+        total[i] = best
+    return total[-1, -1] / (n + m)
+
+
+class WakeSpotter:
+    def __init__(self, templates_path=DEFAULT_TEMPLATES, sample_rate=16000, threshold=None,
+                 vad_ratio=3.0, min_speech_ms=200, max_speech_ms=2000, hangover_ms=300,
+                 frame_ms=20):
+        """
+        Initialize the spotter.
+
+        Args:
+            templates_path (str): .npz file with enrolled wake-phrase features
+            sample_rate (int): Rate of the audio passed to process()
+            threshold (float): DTW distance that counts as a match (None = value
+                stored at enrollment)
+            vad_ratio (float): Frame energy over the noise floor that counts as speech
+            min_speech_ms (int): Ignore bursts shorter than this (clicks, taps)
+            max_speech_ms (int): Utterances longer than this are not the wake phrase
+            hangover_ms (int): Silence that ends an utterance
+            frame_ms (int): VAD frame length
+        """
+        self.templates_path = templates_path
+        self.vad_ratio = vad_ratio
+        self.frame_ms = frame_ms
+        self.set_sample_rate(sample_rate)
+        self.min_frames = int(min_speech_ms / frame_ms)
+        self.max_frames = int(max_speech_ms / frame_ms)
+        self.hangover_frames = int(hangover_ms / frame_ms)
+
+        self.templates = []
+        self.threshold = None
+        if os.path.exists(templates_path):
+            self.load()
+        if threshold is not None:
+            self.threshold = threshold
+
+        self.noise_floor = None
+        self.pending = np.zeros(0, np.int16)
+        self.segment = []
+        self.silent_frames = 0
+        self.too_long = False
+
+    def set_sample_rate(self, sample_rate):
+        """Match the rate of the stream passed to process()."""
+        self.sample_rate = sample_rate
+        self.frame = int(sample_rate * self.frame_ms / 1000)
+
+    @property
+    def enrolled(self):
+        return bool(self.templates) and self.threshold is not None
+
+    def load(self):
+        """Load enrolled templates and the match threshold."""
+        with np.load(self.templates_path) as data:
+            self.threshold = float(data['threshold'])
+            self.templates = [data[name] for name in sorted(data.files) if name.startswith('template_')]
+        print(f"Loaded {len(self.templates)} wake word template(s)")
+
+    def save(self):
+        """Write templates and threshold to templates_path."""
+        arrays = {f"template_{i:02d}": t for i, t in enumerate(self.templates)}
+        np.savez(self.templates_path, threshold=np.float32(self.threshold), **arrays)
+        print(f"Saved {len(self.templates)} wake word template(s) to {self.templates_path}")
+
+    def enroll(self, recordings, sample_rate, margin=1.3):
+        """
+        Add recordings of the wake phrase and recompute the threshold.
+
+        Args:
+            recordings (list): int16 sample arrays, one phrase each
+            sample_rate (int): Their sample rate
+            margin (float): Threshold = margin x the largest distance between
+                any template and its nearest neighbour
+        """
+        for samples in recordings:
+            # Cut exactly as live audio is cut, so templates and live utterances line up
+            utterance = self.endpoint(samples, sample_rate)
+            if utterance is None:
+                print("No speech found in a recording; skipping it")
+                continue
+            features = mfcc(utterance, sample_rate)
+            if len(features):
+                self.templates.append(features)
+
+        if len(self.templates) < 2:
+            raise ValueError("Enroll at least two recordings of the wake phrase")
+
+        nearest = []
+        for i, template in enumerate(self.templates):
+            nearest.append(min(dtw_distance(template, other)
+                               for j, other in enumerate(self.templates) if j != i))
+        self.threshold = margin * max(nearest)
+
+    def endpoint(self, samples, sample_rate):
+        """
+        Cut a recording with the same VAD that process() applies to the stream.
+
+        Args:
+            samples: int16 mono samples (should start with a moment of silence,
+                as the live noise floor does)
+            sample_rate (int): Their sample rate
+
+        Returns:
+            numpy.ndarray: The longest utterance found, or None
+        """
+        vad = copy.copy(self)
+        vad.noise_floor = None
+        vad.reset()
+        vad.set_sample_rate(sample_rate)
+        samples = np.asarray(samples, dtype=np.int16)
+        # Trailing silence ends an utterance that runs to the end of the recording
+        tail = np.zeros(vad.frame * (vad.hangover_frames + 1), np.int16)
+        utterances = list(vad._utterances(np.concatenate([samples, tail])))
+        return max(utterances, key=len) if utterances else None
+
+    def score(self, samples, sample_rate=None):
+        """Smallest DTW distance between an utterance and the templates."""
+        features = mfcc(samples, sample_rate or self.sample_rate)
+        if not len(features) or not self.templates:
+            return np.inf
+        return min(dtw_distance(features, template) for template in self.templates)
+
+    @property
+    def speaking(self):
+        """True while an utterance that could still be the wake phrase is in progress."""
+        return bool(self.segment) and not self.too_long
+    
+    def reset(self):
+        """Drop any partial utterance (e.g. after the pipeline ran)."""
+        self.pending = np.zeros(0, np.int16)
+        self.segment = []
+        self.silent_frames = 0
+        self.too_long = False
+
+    def _end_segment(self):
+        """Close the current utterance; returns its voiced samples, or None if it can't be the phrase."""
+        frames, self.segment = self.segment, []
+        too_long, self.too_long = self.too_long, False
+        self.silent_frames = 0
+        voiced = len(frames) - self.hangover_frames
+        if too_long or voiced < self.min_frames:
+            return None
+        return np.concatenate(frames[:voiced])
+
+    def process(self, chunk):
+        """
+        Feed raw 16-bit mono audio from the stream.
+
+        Args:
+            chunk (bytes or numpy.ndarray): Next block of samples
+
+        Returns:
+            dict: {'distance', 'duration'} when an utterance matched the wake
+                  phrase, else None
+        """
+        samples = np.frombuffer(chunk, dtype=np.int16) if isinstance(chunk, bytes) else chunk
+        match = None
+        for utterance in self._utterances(samples):
+            distance = self.score(utterance)
+            if distance <= self.threshold:
+                match = {'distance': float(distance), 'duration': len(utterance) / self.sample_rate}
+        return match
+
+    def _utterances(self, samples):
+        """Run VAD over the next samples, yielding each finished utterance's voiced samples."""
+        self.pending = np.concatenate([self.pending, samples])
+
+        while len(self.pending) >= self.frame:
+            frame, self.pending = self.pending[:self.frame], self.pending[self.frame:]
+            rms = float(np.sqrt((frame.astype(np.float32) ** 2).mean()))
+            if self.noise_floor is None:
+                self.noise_floor = max(rms, 1.0)
+            speech = rms > self.noise_floor * self.vad_ratio
+
+            if not speech:
+                # Track the floor only in silence: fast down, slow up
+                rate = 0.3 if rms < self.noise_floor else 0.02
+                self.noise_floor = max(1.0, self.noise_floor + rate * (rms - self.noise_floor))
+
+            if self.segment:
+                # Past max length the utterance is only followed to its end, not kept
+                if len(self.segment) > self.max_frames:
+                    self.too_long = True
+                    self.segment = self.segment[-self.hangover_frames:]
+                self.segment.append(frame)
+                self.silent_frames = 0 if speech else self.silent_frames + 1
+                if self.silent_frames >= self.hangover_frames:
+                    utterance = self._end_segment()
+                    if utterance is not None:
+                        yield utterance
+            elif speech:
+                self.segment = [frame]
+                self.silent_frames = 0
+
+
+def _record_phrase(recognizer, source):
+    """Record one phrase with speech_recognition's own endpointing."""
+    import speech_recognition as sr
+    while True:
+        try:
+            audio = recognizer.listen(source, timeout=10, phrase_time_limit=3)
+        except sr.WaitTimeoutError:
+            continue
+        return np.frombuffer(audio.get_raw_data(convert_rate=FEATURE_RATE, convert_width=2), np.int16)
+
+
+def main():
+    """Enroll the wake phrase, or test the enrolled templates live."""
+    import argparse
+    import speech_recognition as sr
+
+    from Peripherals.audio_hub import get_hub
+
+    parser = argparse.ArgumentParser(description='Offline wake word spotter')
+    parser.add_argument('command', choices=['enroll', 'test'])
+    parser.add_argument('--count', type=int, default=5, help='Recordings to enroll')
+    parser.add_argument('--device', default=None, help='Microphone device index or part of its name')
+    parser.add_argument('--templates', default=DEFAULT_TEMPLATES, help='Template file')
+
+    args = parser.parse_args()
+    recognizer = sr.Recognizer()
+
+    with get_hub(device=args.device, speech_rate=FEATURE_RATE).source("spotter") as source:
+        recognizer.adjust_for_ambient_noise(source, duration=1)
+
+        if args.command == 'enroll':
+            spotter = WakeSpotter(args.templates)
+            recordings = []
+            for i in range(args.count):
+                print(f"Say the wake phrase ({i + 1}/{args.count})...")
+                recordings.append(_record_phrase(recognizer, source))
+            spotter.enroll(recordings, FEATURE_RATE)
+            spotter.save()
+            print(f"Threshold: {spotter.threshold:.2f}")
+            return
+
+        spotter = WakeSpotter(args.templates, sample_rate=source.SAMPLE_RATE)
+        if not spotter.enrolled:
+            print("No templates enrolled; run with 'enroll' first")
+            sys.exit(1)
+        print("Listening (Ctrl+C to stop)...")
+        try:
+            while True:
+                match = spotter.process(source.stream.read(source.CHUNK))
+                if match:
+                    print(f"Wake word! distance={match['distance']:.2f} (threshold {spotter.threshold:.2f})")
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Wake detection benchmark
+Replays recordings of the wake phrase and of other speech through
+ReplayMicrophone and measures detection latency, false rejects (missed wake
+phrases) and false accepts (triggers on anything else), reproducibly and
+without a microphone
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import random
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+from Peripherals.mic import track_noise_floor
+from Peripherals.replay_mic import ReplayMicrophone
+from WakeSpotter import DEFAULT_TEMPLATES, WakeSpotter
+
+# A detection this long after a clip ends still counts as hearing that clip
+ATTRIBUTION_WINDOW = 1.5
+
+
+def _wav_files(paths):
+    """Expand directories into the WAV files they contain."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.lower().endswith('.wav')))
+        else:
+            files.append(path)
+    return files
+
+
+def run_local(source, templates=DEFAULT_TEMPLATES, threshold=None):
+    """
+    Stream the replay through the offline spotter.
+
+    Returns:
+        tuple: (detection times in replay seconds, seconds spent processing)
+    """
+    spotter = WakeSpotter(templates, sample_rate=source.SAMPLE_RATE, threshold=threshold)
+    if not spotter.enrolled:
+        raise RuntimeError(f"No wake phrase enrolled in {templates}")
+    detections = []
+    busy = 0.0
+    while not source.stream.finished:
+        chunk = source.stream.read(source.CHUNK)
+        start = time.perf_counter()
+        match = spotter.process(chunk)
+        busy += time.perf_counter() - start
+        if match:
+            detections.append(source.stream.seconds)
+    return detections, busy
+
+
+def run_google(source, wake_word="hey"):
+    """
+    Transcribe each phrase of the replay online, like the Google wake engine.
+
+    Returns:
+        tuple: (detection times in replay seconds, seconds spent processing)
+    """
+    recognizer = sr.Recognizer()
+    track_noise_floor(recognizer, source)
+    detections = []
+    busy = 0.0
+    while not source.stream.finished:
+        try:
+            audio = recognizer.listen(source, timeout=2, phrase_time_limit=3)
+        except sr.WaitTimeoutError:
+            continue
+        start = time.perf_counter()
+        try:
+            text = recognizer.recognize_google(audio).lower()
+        except sr.UnknownValueError:
+            text = ""
+        elapsed = time.perf_counter() - start
+        busy += elapsed
+        if wake_word in text:
+            # The replay clock stands still while we wait for the transcription
+            detections.append(source.stream.seconds + elapsed)
+    return detections, busy
+
+
+def score(events, detections, window=ATTRIBUTION_WINDOW):
+    """
+    Match detections to the clips that caused them.
+
+    Args:
+        events (list): ReplayMicrophone.events, labelled 'wake' or 'other'
+        detections (list): Detection times in replay seconds
+        window (float): Seconds after a clip ends that a detection is still
+            attributed to it
+
+    Returns:
+        dict: positives, negatives, false_rejects, false_accepts and the
+              latencies (detection time - end of the wake phrase) of true accepts
+    """
+    detected = set()
+    latencies = []
+    false_accepts = 0
+    for t in detections:
+        cause = next((i for i, event in enumerate(events)
+                      if event['start'] <= t <= event['end'] + window), None)
+        if cause is not None and events[cause]['label'] == 'wake' and cause not in detected:
+            detected.add(cause)
+            latencies.append(t - events[cause]['end'])
+        else:
+            # Triggered by other speech, by noise, or twice on one phrase
+            false_accepts += 1
+
+    positives = sum(1 for event in events if event['label'] == 'wake')
+    return {
+        'positives': positives,
+        'negatives': len(events) - positives,
+        'false_rejects': positives - len(detected),
+        'false_accepts': false_accepts,
+        'latencies': latencies,
+    }
+
+
+def main():
+    """Print latency and error rates for a replayed set of recordings."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Wake detection benchmark on replayed audio')
+    parser.add_argument('--wake', nargs='+', required=True, help='WAV files/directories of the wake phrase')
+    parser.add_argument('--other', nargs='*', default=[], help='WAV files/directories of other speech')
+    parser.add_argument('--engine', choices=['local', 'google'], default='local')
+    parser.add_argument('--templates', default=DEFAULT_TEMPLATES, help='Spotter template file')
+    parser.add_argument('--threshold', type=float, default=None, help='Override the spotter threshold')
+    parser.add_argument('--wake-word', default='hey', help='Wake word for the google engine')
+    parser.add_argument('--gap', type=float, nargs=2, default=[1.0, 3.0], metavar=('MIN', 'MAX'),
+                        help='Silence between clips in seconds')
+    parser.add_argument('--noise', help='Background noise WAV (default: white noise)')
+    parser.add_argument('--snr', type=float, default=None, help='Speech-to-noise ratio in dB (default: no noise)')
+    parser.add_argument('--realtime', action='store_true', help='Pace the replay like a live microphone')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for clip order, gaps and noise')
+    parser.add_argument('--save', help='Write results to this JSON file')
+
+    args = parser.parse_args()
+    clips = [(path, 'wake') for path in _wav_files(args.wake)]
+    clips += [(path, 'other') for path in _wav_files(args.other)]
+    random.Random(args.seed).shuffle(clips)
+
+    mic = ReplayMicrophone(clips, gap=tuple(args.gap), noise=args.noise, snr_db=args.snr,
+                           realtime=args.realtime, seed=args.seed)
+    print(f"Replaying {len(clips)} clips ({mic.duration:.0f}s of audio) through the {args.engine} engine")
+    with mic as source:
+        if args.engine == 'local':
+            detections, busy = run_local(source, args.templates, args.threshold)
+        else:
+            detections, busy = run_google(source, args.wake_word)
+
+    result = score(mic.events, detections)
+    hours = mic.duration / 3600
+    latencies = result['latencies']
+    print(f"\nWake phrases: {result['positives']}, other clips: {result['negatives']}")
+    if result['positives']:
+        print(f"False reject rate: {result['false_rejects'] / result['positives']:.1%} "
+              f"({result['false_rejects']} missed)")
+    print(f"False accepts: {result['false_accepts']} ({result['false_accepts'] / hours:.1f} per hour)")
+    if latencies:
+        print(f"Latency after phrase end: mean {np.mean(latencies) * 1000:.0f} ms, "
+              f"p50 {np.percentile(latencies, 50) * 1000:.0f} ms, "
+              f"p95 {np.percentile(latencies, 95) * 1000:.0f} ms")
+    print(f"Processing: {busy:.2f}s for {mic.duration:.0f}s of audio "
+          f"(real-time factor {busy / mic.duration:.3f})")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(dict(result, engine=args.engine, seed=args.seed, snr_db=args.snr,
+                           audio_seconds=mic.duration, processing_seconds=busy), f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Shared audio capture hub
+Keeps one input stream open and fans it out: speech (mono, resampled to the
+recogniser's rate) goes into a ring buffer that the wake spotter and the
+command recogniser read through their own cursors, and raw device audio goes
+to taps such as the disk recorder. The device is opened once and nothing
+races for it.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+import numpy as np
+import pyaudio
+import speech_recognition as sr
+
+from Peripherals.mic import AudioRingBuffer, PolyphaseResampler, VADSegmenter
+
+# Input device: an index, or part of its name (e.g. "SoloCast"); unset = system default
+DEFAULT_DEVICE = os.getenv('BAYMIN_MIC_DEVICE')
+
+
+def resolve_device(audio, device=None):
+    """
+    Find the PyAudio input device to open.
+
+    Args:
+        audio (pyaudio.PyAudio): Open PyAudio instance
+        device (int or str): Device index or part of its name (None = BAYMIN_MIC_DEVICE)
+
+    Returns:
+        int: Device index, or None for the system default
+    """
+    if device is None:
+        device = DEFAULT_DEVICE
+    if device is None or device == '':
+        return None
+    if isinstance(device, int) or str(device).isdigit():
+        return int(device)
+    for index in range(audio.get_device_count()):
+        info = audio.get_device_info_by_index(index)
+        if info.get('maxInputChannels', 0) > 0 and device.lower() in info['name'].lower():
+            return index
+    print(f"No input device matching '{device}'; using the default")
+    return None
+
+
+def _speech_rate(speech_rate, sample_rate):
+    """Speech buffer rate for the requested settings (never above the device rate)."""
+    return speech_rate if speech_rate and speech_rate < sample_rate else sample_rate
+
+
+def _device_name(device):
+    """Normalise a device setting for comparison (None and '' mean BAYMIN_MIC_DEVICE)."""
+    if device is None or device == '':
+        device = DEFAULT_DEVICE
+    return None if device is None or device == '' else str(device)
+
+
+class HubStream:
+    """
+    One subscriber's read position in the hub's speech buffer; reads behave
+    like a PyAudio input stream (blocking, raw 16-bit bytes).
+    """
+
+    def __init__(self, hub, name):
+        self.hub = hub
+        self.name = name
+        self.cursor = hub.ring.position
+
+    def skip_to_now(self):
+        """Ignore everything buffered so far."""
+        self.cursor = self.hub.ring.position
+
+    def read(self, size, exception_on_overflow=False):
+        ring = self.hub.ring
+        while not ring.wait_for(self.cursor + size, 0.5):
+            if not self.hub.running:
+                raise OSError("Audio hub stopped")
+        if self.cursor < ring.oldest:
+            print(f"Audio reader '{self.name}' fell behind; skipping ahead")
+            self.cursor = ring.position - size
+        data = ring.read(self.cursor, self.cursor + size)
+        self.cursor += size
+        return data.tobytes()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class HubSource(sr.AudioSource):
+    def __init__(self, hub, name="source", chunk_size=None):
+        """
+        speech_recognition AudioSource reading from the hub, for use with
+        Recognizer.listen / adjust_for_ambient_noise instead of sr.Microphone.
+
+        Args:
+            hub (AudioHub): Hub to read from
+            name (str): Subscriber name (shown in messages)
+            chunk_size (int): Samples per read (default: one device buffer's worth)
+        """
+        self.hub = hub
+        self.name = name
+        self.SAMPLE_RATE = hub.speech_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk_size or max(1, hub.chunk_size * hub.speech_rate // hub.sample_rate)
+        self.format = pyaudio.paInt16
+        self.stream = None
+
+    def __enter__(self):
+        if not self.hub.attach():
+            raise OSError("Could not open the audio input device")
+        self.stream = self.hub.subscribe(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream.close()
+        self.stream = None
+        self.hub.detach()
+
+
+class AudioHub:
+    def __init__(self, device=None, sample_rate=44100, channels=1, chunk_size=1024,
+                 speech_rate=16000, buffer_seconds=10.0):
+        """
+        Initialize the hub (the device is opened by the first attach()).
+
+        Args:
+            device (int or str): Device index or part of its name (None =
+                BAYMIN_MIC_DEVICE, else the system default)
+            sample_rate (int): Device sample rate in Hz
+            channels (int): Device channels (speech is downmixed to mono)
+            chunk_size (int): Frames per device buffer
+            speech_rate (int): Rate of the shared speech buffer
+            buffer_seconds (float): Speech history kept for subscribers
+        """
+        self.device = device
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.chunk_size = chunk_size
+        self.speech_rate = _speech_rate(speech_rate, sample_rate)
+        self.buffer_seconds = buffer_seconds
+
+        self.ring = AudioRingBuffer(int(self.speech_rate * buffer_seconds))
+        self.resampler = None
+        if self.speech_rate != sample_rate:
+            self.resampler = PolyphaseResampler(sample_rate, self.speech_rate)
+
+        self.audio = None
+        self.stream = None
+        self.device_index = None
+        self.running = False
+        self.users = 0
+        self.lock = threading.Lock()
+        self.taps = []
+        self.subscribers = []
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PyAudio callback: feed raw taps, then the shared speech buffer."""
+        for tap in list(self.taps):
+            tap(in_data, frame_count)
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+        if self.resampler:
+            samples = self.resampler.process(samples)
+        self.ring.write(samples)
+        return (None, pyaudio.paContinue)
+
+    def start(self):
+        """
+        Open the input device and start filling the buffer.
+
+        Returns:
+            bool: True if the stream is running
+        """
+        if self.running:
+            return True
+        try:
+            self.audio = pyaudio.PyAudio()
+            self.device_index = resolve_device(self.audio, self.device)
+            if self.resampler:
+                self.resampler.reset()
+            self.stream = self.audio.open(
+                format=pyaudio.paInt16,
+                channels=self.channels,
+                rate=self.sample_rate,
+                input=True,
+                input_device_index=self.device_index,
+                frames_per_buffer=self.chunk_size,
+                stream_callback=self._on_audio
+            )
+            self.stream.start_stream()
+        except Exception as e:
+            print(f"Error opening audio input: {e}")
+            self.stop()
+            return False
+
+        self.running = True
+        device = 'default' if self.device_index is None else self.device_index
+        print(f"Audio hub started (device {device}, {self.sample_rate} Hz -> {self.speech_rate} Hz)")
+        return True
+
+    def stop(self):
+        """Close the device; subscribers' reads fail until it is started again."""
+        self.running = False
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self.audio:
+            self.audio.terminate()
+            self.audio = None
+            print("Audio hub stopped")
+
+    def attach(self):
+        """Register a user, opening the device for the first one; returns False if it can't be opened."""
+        with self.lock:
+            if not self.start():
+                return False
+            self.users += 1
+            return True
+
+    def detach(self):
+        """Unregister a user; the device is closed when the last one leaves."""
+        with self.lock:
+            self.users = max(0, self.users - 1)
+            if self.users == 0:
+                self.stop()
+
+    def subscribe(self, name):
+        """
+        Start reading speech from now on with an independent cursor.
+
+        Returns:
+            HubStream: Blocking reader of speech_rate mono audio
+        """
+        stream = HubStream(self, name)
+        with self.lock:
+            self.subscribers.append(stream)
+        return stream
+
+    def unsubscribe(self, stream):
+        with self.lock:
+            if stream in self.subscribers:
+                self.subscribers.remove(stream)
+
+    def segmenter(self, **options):
+        """VADSegmenter over the shared buffer with its own cursor (options as VADSegmenter)."""
+        return VADSegmenter(self.ring, self.speech_rate, **options)
+
+    def source(self, name="source", chunk_size=None):
+        """speech_recognition AudioSource on the hub (use in a with block)."""
+        return HubSource(self, name, chunk_size)
+
+    def add_tap(self, tap):
+        """
+        Also send raw device audio to tap(data, frame_count). Taps run on the
+        audio callback thread and must not block (see StreamingRecorder.write).
+        """
+        self.taps.append(tap)
+
+    def remove_tap(self, tap):
+        if tap in self.taps:
+            self.taps.remove(tap)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub(**options):
+    """
+    Get the process-wide hub, creating it on first use.
+
+    Args:
+        **options: AudioHub arguments; only the first caller's take effect,
+            and a warning is printed when a later caller asks for different ones
+
+    Returns:
+        AudioHub: The shared hub
+    """
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = AudioHub(**options)
+        else:
+            _warn_conflicts(_hub, options)
+        return _hub
+
+
+def _warn_conflicts(hub, options):
+    """Print which requested settings the existing hub doesn't match."""
+    sample_rate = options.get('sample_rate', hub.sample_rate)
+    conflicts = []
+    for name, value in options.items():
+        current = getattr(hub, name)
+        if name == 'device':
+            value, current = _device_name(value), _device_name(current)
+        elif name == 'speech_rate':
+            value = _speech_rate(value, sample_rate)
+        if value != current:
+            conflicts.append(f"{name}={value!r} (hub has {current!r})")
+    if conflicts:
+        print(f"Warning: audio hub already running with other settings; ignoring {', '.join(conflicts)}")
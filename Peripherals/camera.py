@@ -2,25 +2,47 @@ import cv2
 import numpy as np
 from datetime import datetime
 import os
+import time
+
+
+def frame_metrics(frame):
+    """
+    Compute cheap exposure/focus metrics for a frame.
+    
+    Args:
+        frame (numpy.ndarray): BGR or grayscale image
+        
+    Returns:
+        tuple: (brightness, sharpness) - mean gray level and Laplacian variance
+    """
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    # Metrics only need to track trends, so a thumbnail is plenty
+    small = cv2.resize(gray, (160, 120), interpolation=cv2.INTER_AREA)
+    brightness = float(small.mean())
+    sharpness = float(cv2.Laplacian(small, cv2.CV_64F).var())
+    return brightness, sharpness
+
 
 class Camera:
-    def __init__(self, camera_index=0, resolution=(640, 480)):
+    def __init__(self, camera_index=0, resolution=(640, 480), max_warmup_frames=30):
         """
         Initialize the Camera for the Raspberry Pi.
         
         Args:
             camera_index (int): Camera device index (0 for default camera)
             resolution (tuple): Camera resolution (width, height)
+            max_warmup_frames (int): Cap on frames read while auto-exposure settles
         """
         self.camera_index = camera_index
         self.resolution = resolution
+        self.max_warmup_frames = max_warmup_frames
         self.camera = None
+        self.warmup_stats = None
         
     def initialize(self):
         """Initialize the camera connection."""
         try:
-            # Use DirectShow on Windows for better compatibility
-            self.camera = cv2.VideoCapture(self.camera_index, cv2.CAP_DSHOW)
+            self.camera = self._open_capture()
             self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
             self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
             
@@ -28,9 +50,8 @@ class Camera:
                 print("Error: Could not open camera")
                 return False
             
-            # Warm up camera - Windows needs a few frames
-            for _ in range(5):
-                self.camera.read()
+            # Warm up until auto-exposure settles instead of a fixed frame count
+            self.warm_up(max_frames=self.max_warmup_frames)
             
             print(f"Camera initialized at {self.resolution[0]}x{self.resolution[1]}")
             return True
@@ -38,6 +59,82 @@ class Camera:
             print(f"Error initializing camera: {e}")
             return False
     
+    def warm_up(self, max_frames=30, max_seconds=3.0, stable_frames=3,
+                brightness_tolerance=2.0, sharpness_tolerance=0.1,
+                min_brightness=10.0, min_frames=5):
+        """
+        Read frames until brightness and sharpness stop changing.
+        
+        Args:
+            max_frames (int): Maximum frames to read before giving up
+            max_seconds (float): Maximum time to spend warming up
+            stable_frames (int): Consecutive stable frames required to converge
+            brightness_tolerance (float): Max mean gray-level change between frames
+            sharpness_tolerance (float): Max relative Laplacian variance change
+            min_brightness (float): Darker frames never count as stable (sensors
+                deliver black frames before exposure starts)
+            min_frames (int): Frames to read before convergence is accepted
+            
+        Returns:
+            dict: Warm-up stats (frames, ms, converged, brightness, sharpness)
+        """
+        start = time.perf_counter()
+        previous = None
+        stable = 0
+        frames = 0
+        converged = False
+        brightness = sharpness = None
+        
+        while frames < max_frames and time.perf_counter() - start < max_seconds:
+            ret, frame = self.camera.read()
+            frames += 1
+            if not ret or frame is None:
+                stable = 0
+                continue
+            
+            brightness, sharpness = frame_metrics(frame)
+            if brightness < min_brightness:
+                # Still black: identical dark frames would otherwise look settled
+                stable = 0
+            elif previous is not None:
+                brightness_delta = abs(brightness - previous[0])
+                sharpness_delta = abs(sharpness - previous[1]) / max(previous[1], 1.0)
+                if brightness_delta <= brightness_tolerance and sharpness_delta <= sharpness_tolerance:
+                    stable += 1
+                else:
+                    stable = 0
+            previous = (brightness, sharpness)
+            
+            if stable >= stable_frames and frames >= min_frames:
+                converged = True
+                break
+        
+        self.warmup_stats = {
+            'frames': frames,
+            'ms': (time.perf_counter() - start) * 1000,
+            'converged': converged,
+            'brightness': brightness,
+            'sharpness': sharpness
+        }
+        
+        status = "converged" if converged else "stopped at cap"
+        print(f"Camera warm-up {status} after {frames} frames "
+              f"({self.warmup_stats['ms']:.0f} ms)")
+        return self.warmup_stats
+    
+    def _open_capture(self):
+        """
+        Open the underlying capture device.
+        
+        Subclasses (e.g. ReplayCamera) override this to supply a different
+        frame source with the same read()/set()/isOpened()/release() API.
+        
+        Returns:
+            cv2.VideoCapture: Opened capture object
+        """
+        # Use DirectShow on Windows for better compatibility
+        return cv2.VideoCapture(self.camera_index, cv2.CAP_DSHOW)
+    
     def capture_image(self):
         """
         Capture a single image from the camera.
@@ -146,6 +243,36 @@ class Camera:
         self.release()
 
 
+def create_camera(camera_index=0, resolution=(640, 480)):
+    """
+    Create the camera selected by configuration.
+    
+    Set BAYMIN_CAMERA_REPLAY to a video file or image directory to replay it
+    instead of opening a physical webcam (useful for headless benchmarks).
+    BAYMIN_CAMERA_REPLAY_FPS, BAYMIN_CAMERA_REPLAY_JITTER (seconds) and
+    BAYMIN_CAMERA_REPLAY_DROP (probability 0-1) tune the replay.
+    
+    Args:
+        camera_index (int): Camera device index used when not replaying
+        resolution (tuple): Camera resolution (width, height)
+        
+    Returns:
+        Camera: A Camera or ReplayCamera instance
+    """
+    replay_source = os.getenv('BAYMIN_CAMERA_REPLAY')
+    if not replay_source:
+        return Camera(camera_index=camera_index, resolution=resolution)
+    
+    from Peripherals.replay_camera import ReplayCamera
+    return ReplayCamera(
+        replay_source,
+        fps=float(os.getenv('BAYMIN_CAMERA_REPLAY_FPS', '30')),
+        jitter=float(os.getenv('BAYMIN_CAMERA_REPLAY_JITTER', '0')),
+        drop_rate=float(os.getenv('BAYMIN_CAMERA_REPLAY_DROP', '0')),
+        resolution=resolution
+    )
+
+
 # Example usage
 if __name__ == "__main__":
     # Initialize camera
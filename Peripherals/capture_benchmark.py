@@ -0,0 +1,131 @@
+"""
+Capture path CPU benchmark
+Measures the CPU time the speech capture path spends per second of audio
+when it runs at the device rate versus resampling to the recogniser's rate
+as the audio arrives (see PolyphaseResampler)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+from Peripherals.mic import AudioRingBuffer, PolyphaseResampler, VADSegmenter
+
+
+def synthetic_speech(seconds, sample_rate, seed=0):
+    """
+    Alternating voiced bursts and quiet gaps, ending in silence.
+
+    Returns:
+        numpy.ndarray: int16 samples
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    pitch = 120 + 40 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 20))
+    envelope = (np.sin(2 * np.pi * 0.5 * t) > 0) * np.abs(np.sin(2 * np.pi * 3 * t))
+    envelope[-sample_rate:] = 0
+    audio = 6000 * voiced * envelope + rng.normal(0, 60, len(t))
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def measure(audio, device_rate, speech_rate, chunk_size=1024):
+    """
+    CPU time of each capture stage over the whole clip.
+
+    Args:
+        audio (numpy.ndarray): int16 samples at device_rate
+        device_rate (int): Rate the microphone delivers
+        speech_rate (int): Rate the capture path runs at (== device_rate to skip resampling)
+        chunk_size (int): Samples per device callback
+
+    Returns:
+        dict: Seconds of CPU for 'resample', 'vad', 'spotter' and 'handoff'
+              (converting utterances for the recogniser), plus 'utterances'
+              found and 'samples' kept
+    """
+    from Functions.WakeSpotter import WakeSpotter
+
+    resampler = PolyphaseResampler(device_rate, speech_rate) if speech_rate != device_rate else None
+    ring = AudioRingBuffer(int(len(audio) * speech_rate / device_rate) + chunk_size)
+
+    start = time.process_time()
+    for i in range(0, len(audio), chunk_size):
+        chunk = audio[i:i + chunk_size]
+        ring.write(resampler.process(chunk) if resampler else chunk)
+    resample_time = time.process_time() - start
+
+    segmenter = VADSegmenter(ring, speech_rate)
+    segmenter.cursor = 0
+    utterances = []
+    start = time.process_time()
+    # Everything is buffered already; the timeout only ends the loop (waiting uses no CPU)
+    while True:
+        segment = segmenter.next_segment(timeout=1.0)
+        if segment is None:
+            break
+        utterances.append(segment)
+    vad_time = time.process_time() - start
+
+    # Recognisers take 16 kHz; speech_recognition converts anything else per utterance
+    start = time.process_time()
+    for segment in utterances:
+        sr.AudioData(segment.tobytes(), speech_rate, 2).get_raw_data(convert_rate=16000, convert_width=2)
+    handoff_time = time.process_time() - start
+
+    # No templates: every utterance is still turned into features, then scored as no match
+    spotter = WakeSpotter(templates_path='', sample_rate=speech_rate, threshold=0.0)
+    samples = ring.read(0, ring.position)
+    start = time.process_time()
+    for i in range(0, len(samples), chunk_size):
+        spotter.process(samples[i:i + chunk_size])
+    spotter_time = time.process_time() - start
+
+    return {'resample': resample_time, 'vad': vad_time, 'spotter': spotter_time,
+            'handoff': handoff_time, 'utterances': len(utterances), 'samples': ring.position}
+
+
+def main():
+    """Compare capture CPU cost at the device rate and at the speech rate."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Capture path resampling benchmark')
+    parser.add_argument('--device-rate', type=int, default=44100, help='Microphone sample rate')
+    parser.add_argument('--speech-rate', type=int, default=16000, help='Recogniser sample rate')
+    parser.add_argument('--seconds', type=float, default=60.0, help='Length of synthetic audio')
+    parser.add_argument('--chunk', type=int, default=1024, help='Samples per callback')
+
+    args = parser.parse_args()
+    audio = synthetic_speech(args.seconds, args.device_rate)
+
+    rows = [
+        (f"{args.device_rate} Hz (no resampling)", measure(audio, args.device_rate, args.device_rate, args.chunk)),
+        (f"{args.speech_rate} Hz (resampled)", measure(audio, args.device_rate, args.speech_rate, args.chunk)),
+    ]
+
+    print(f"\nCPU ms per second of audio ({args.seconds:.0f}s clip, {args.chunk}-sample callbacks)")
+    stages = ('resample', 'vad', 'spotter', 'handoff')
+    print(f"{'Capture rate':<28} {'Resample':>9} {'VAD':>7} {'Spotter':>8} {'Handoff':>8} "
+          f"{'Total':>7} {'Utterances':>11} {'KB/s':>6}")
+    print("-" * 91)
+    totals = []
+    for name, row in rows:
+        per_second = {key: row[key] * 1000 / args.seconds for key in stages}
+        total = sum(per_second.values())
+        totals.append(total)
+        print(f"{name:<28} {per_second['resample']:>9.2f} {per_second['vad']:>7.2f} "
+              f"{per_second['spotter']:>8.2f} {per_second['handoff']:>8.2f} {total:>7.2f} "
+              f"{row['utterances']:>11} {row['samples'] * 2 / 1024 / args.seconds:>6.1f}")
+
+    print(f"\nCPU saved by resampling at capture: {(1 - totals[1] / totals[0]):.0%}")
+    print(f"Audio data buffered and sent for recognition: {rows[1][1]['samples'] / rows[0][1]['samples']:.0%} of device rate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Threaded frame grabber
+Reads frames from a capture device on a worker thread and keeps only the
+latest one, so UI and processing code never block on cap.read()
+"""
+
+import cv2
+import threading
+import time
+
+
+class FrameGrabber:
+    def __init__(self, capture, preview_width=None, preview_rgb=True):
+        """
+        Initialize the frame grabber.
+
+        Args:
+            capture: Opened cv2.VideoCapture (or any object with read())
+            preview_width (int): Width of the downscaled preview frame (None to skip)
+            preview_rgb (bool): Convert the preview from BGR to RGB for display
+        """
+        self.capture = capture
+        self.preview_width = preview_width
+        self.preview_rgb = preview_rgb
+
+        # Latest-frame slot: the worker overwrites it, readers never queue up
+        self.frame = None
+        self.preview = None
+        self.frame_id = 0
+        self.frame_time = None
+        self.condition = threading.Condition()
+
+        self.fps = 0.0
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        """Start the capture thread."""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self.thread.start()
+
+    def _make_preview(self, frame):
+        """Downscale (and colour-convert) a frame for display."""
+        if not self.preview_width:
+            return None
+        height, width = frame.shape[:2]
+        preview = frame
+        if width > self.preview_width:
+            preview_height = int(height * self.preview_width / width)
+            preview = cv2.resize(frame, (self.preview_width, preview_height),
+                                 interpolation=cv2.INTER_AREA)
+        if self.preview_rgb:
+            preview = cv2.cvtColor(preview, cv2.COLOR_BGR2RGB)
+        return preview
+
+    def _run(self):
+        """Capture loop running on the worker thread."""
+        last_time = None
+        while self.running:
+            ret, frame = self.capture.read()
+            if not ret or frame is None:
+                time.sleep(0.01)
+                continue
+
+            preview = self._make_preview(frame)
+            now = time.perf_counter()
+
+            # Smoothed capture rate
+            if last_time is not None and now > last_time:
+                instant = 1.0 / (now - last_time)
+                self.fps = instant if self.fps == 0 else 0.9 * self.fps + 0.1 * instant
+            last_time = now
+
+            with self.condition:
+                self.frame = frame
+                self.preview = preview
+                self.frame_id += 1
+                self.frame_time = now
+                self.condition.notify_all()
+
+    def read(self):
+        """
+        Get the latest full-resolution frame.
+
+        Returns:
+            tuple: (frame_id, frame) - frame_id increases with every new frame
+        """
+        with self.condition:
+            return self.frame_id, self.frame
+
+    def read_preview(self):
+        """
+        Get the latest downscaled preview frame.
+
+        Returns:
+            tuple: (frame_id, preview)
+        """
+        with self.condition:
+            return self.frame_id, self.preview
+
+    def wait_for_frame(self, after_id=0, timeout=1.0):
+        """
+        Block until a frame newer than after_id is available.
+
+        Args:
+            after_id (int): Last frame_id the caller has seen
+            timeout (float): Maximum time to wait in seconds
+
+        Returns:
+            tuple: (frame_id, frame), or (after_id, None) on timeout
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.frame_id > after_id, timeout=timeout):
+                return after_id, None
+            return self.frame_id, self.frame
+
+    def stop(self):
+        """Stop the capture thread (the capture device is left open)."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
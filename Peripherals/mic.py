@@ -1,122 +1,729 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import pyaudio
 import wave
-import os
+import collections
+import math
+import queue
+import shutil
+import subprocess
+import threading
+import time
 from datetime import datetime
+import numpy as np
 import speech_recognition as sr
 
+
+class NoiseFloorEstimator:
+    def __init__(self, window_seconds=3.0, ratio=2.0, smoothing=0.3, min_threshold=50.0,
+                 initial_floor=None):
+        """
+        Track the background noise level from the audio stream itself.
+        
+        Uses minimum statistics: the floor is the quietest (smoothed) level
+        seen in the last window_seconds, so speech never raises it but a
+        lasting change in background noise is followed within one window.
+        
+        Args:
+            window_seconds (float): How far back to look for the quietest level
+            ratio (float): Energy threshold = floor x ratio
+            smoothing (float): Weight of each new chunk in the smoothed level
+            min_threshold (float): Lowest threshold ever reported
+            initial_floor (float): Starting floor (e.g. from a one-off calibration)
+        """
+        self.window_seconds = window_seconds
+        self.ratio = ratio
+        self.smoothing = smoothing
+        self.min_threshold = min_threshold
+        self.level = initial_floor
+        self.history = None
+        self.floor = initial_floor
+    
+    @property
+    def threshold(self):
+        """Energy threshold for speech, in the same units as Recognizer.energy_threshold."""
+        if self.floor is None:
+            return None
+        return max(self.min_threshold, self.floor * self.ratio)
+    
+    def update(self, data, sample_rate, sample_width=2):
+        """
+        Feed the next chunk of raw 16-bit audio (bytes or a numpy array).
+        
+        Returns:
+            float: The chunk's RMS energy
+        """
+        if isinstance(data, np.ndarray):
+            samples = data
+        else:
+            samples = np.frombuffer(data, dtype=np.int16 if sample_width == 2 else np.int8)
+        if not len(samples):
+            return 0.0
+        rms = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+        
+        if self.history is None:
+            chunk_seconds = len(samples) / sample_rate
+            self.history = collections.deque(maxlen=max(1, math.ceil(self.window_seconds / chunk_seconds)))
+        
+        self.level = rms if self.level is None else self.level + self.smoothing * (rms - self.level)
+        self.history.append(self.level)
+        self.floor = min(self.history)
+        return rms
+
+
+class NoiseTrackingStream:
+    """
+    Wraps a speech_recognition source stream: every chunk the recognizer
+    reads also updates the noise floor and the recognizer's energy threshold,
+    so listening never pauses to recalibrate.
+    """
+    
+    def __init__(self, stream, estimator, recognizer, sample_rate, sample_width=2):
+        self.stream = stream
+        self.estimator = estimator
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+    
+    def read(self, size):
+        data = self.stream.read(size)
+        self.estimator.update(data, self.sample_rate, self.sample_width)
+        threshold = self.estimator.threshold
+        if threshold is not None:
+            self.recognizer.energy_threshold = threshold
+        return data
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def track_noise_floor(recognizer, source, estimator=None):
+    """
+    Continuously adapt recognizer.energy_threshold from an open sr.Microphone.
+    
+    Call inside the `with sr.Microphone(...) as source:` block. The
+    recognizer's own dynamic threshold is turned off (the estimator replaces it).
+    
+    Args:
+        recognizer (sr.Recognizer): Recognizer to update
+        source (sr.Microphone): Open microphone source
+        estimator (NoiseFloorEstimator): Reuse an existing estimate (e.g. across calls)
+        
+    Returns:
+        NoiseFloorEstimator: The estimator in use
+    """
+    if estimator is None:
+        estimator = NoiseFloorEstimator()
+    if estimator.floor is None:
+        # Seed from whatever calibration the recognizer already has
+        estimator.floor = estimator.level = recognizer.energy_threshold / estimator.ratio
+    recognizer.dynamic_energy_threshold = False
+    if not isinstance(source.stream, NoiseTrackingStream):
+        source.stream = NoiseTrackingStream(source.stream, estimator, recognizer,
+                                            source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+    return estimator
+
+
+class PolyphaseResampler:
+    def __init__(self, source_rate, target_rate, taps_per_phase=64, beta=8.0):
+        """
+        Streaming rational-ratio resampler (polyphase FIR, vectorised in numpy).
+        
+        Only the output samples that are kept are computed, so converting
+        44.1 kHz to 16 kHz costs taps_per_phase multiply-adds per output
+        sample. Delay is taps_per_phase / 2 input samples (under 1 ms at
+        44.1 kHz).
+        
+        Args:
+            source_rate (int): Input sample rate in Hz
+            target_rate (int): Output sample rate in Hz
+            taps_per_phase (int): Filter length in input samples (sharper
+                anti-alias cutoff for more CPU)
+            beta (float): Kaiser window shape (8 gives ~80 dB stopband)
+        """
+        g = math.gcd(source_rate, target_rate)
+        self.up = target_rate // g
+        self.down = source_rate // g
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.taps = taps_per_phase
+        
+        # Low-pass at the lower of the two Nyquist rates, designed at the
+        # upsampled rate and split into one sub-filter per output phase
+        length = taps_per_phase * self.up
+        cutoff = 0.9 / max(self.up, self.down)
+        k = np.arange(length) - (length - 1) / 2
+        h = cutoff * np.sinc(cutoff * k) * np.kaiser(length, beta)
+        h *= self.up / h.sum()
+        # bank[phase, j] multiplies the input sample j steps back
+        bank = h.reshape(taps_per_phase, self.up).T
+        
+        # The phase and input offset of output n repeat every `up` outputs, so
+        # they are laid out in output order once: row k serves output k (mod up),
+        # reversed to line up with an oldest-first window of input samples
+        k = np.arange(self.up)
+        self.period_bank = np.ascontiguousarray(bank[(k * self.down) % self.up, ::-1], dtype=np.float32)
+        self.period_offsets = (k * self.down) // self.up
+        self._extend(2 * self.up)
+        self.reset()
+    
+    def _extend(self, length):
+        """Unroll the per-output filters and offsets to cover `length` consecutive outputs."""
+        k = np.arange(length)
+        self.output_bank = self.period_bank[k % self.up]
+        self.output_offsets = (k // self.up) * self.down + self.period_offsets[k % self.up]
+    
+    def reset(self):
+        """Forget past input (e.g. when the stream restarts)."""
+        self.history = np.zeros(self.taps - 1, np.float32)
+        self.consumed = 0
+        self.next_output = 0
+    
+    def process(self, samples):
+        """
+        Resample the next block of a continuous mono stream.
+        
+        Args:
+            samples (numpy.ndarray): int16 input samples
+            
+        Returns:
+            numpy.ndarray: int16 output samples (length varies by +-1 per block)
+        """
+        x = np.concatenate([self.history, samples.astype(np.float32)])
+        first = self.consumed - (self.taps - 1)  # input index of x[0]
+        total = self.consumed + len(samples)
+        
+        # Every output whose newest input sample has arrived
+        last = (total * self.up - 1) // self.down
+        count = last + 1 - self.next_output
+        period, phase = divmod(self.next_output, self.up)
+        if phase + count > len(self.output_bank):
+            self._extend(phase + count + self.up)
+        
+        newest = period * self.down + self.output_offsets[phase:phase + count] - first
+        # Row i is a view of the taps input samples ending at x[i + taps - 1]
+        windows = np.lib.stride_tricks.as_strided(
+            x, (len(x) - self.taps + 1, self.taps), (x.itemsize, x.itemsize))[newest - (self.taps - 1)]
+        y = np.einsum('ij,ij->i', self.output_bank[phase:phase + count], windows)
+        
+        self.history = x[len(x) - (self.taps - 1):]
+        self.consumed = total
+        self.next_output = last + 1
+        return np.clip(np.round(y), -32768, 32767).astype(np.int16)
+
+
+class AudioRingBuffer:
+    def __init__(self, capacity):
+        """
+        Fixed-size circular buffer of int16 samples addressed by absolute
+        position (samples written since start), so readers can keep their
+        own cursors and look back in time (pre-roll).
+        
+        Args:
+            capacity (int): Samples kept
+        """
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.int16)
+        self.position = 0
+        self.condition = threading.Condition()
+    
+    @property
+    def oldest(self):
+        """Absolute position of the oldest sample still held."""
+        return max(0, self.position - self.capacity)
+    
+    def write(self, samples):
+        """Append samples (called from the audio callback thread)."""
+        samples = samples[-self.capacity:]
+        count = len(samples)
+        with self.condition:
+            start = self.position % self.capacity
+            first = min(count, self.capacity - start)
+            self.data[start:start + first] = samples[:first]
+            self.data[:count - first] = samples[first:]
+            self.position += count
+            self.condition.notify_all()
+    
+    def read(self, start, end):
+        """
+        Copy samples [start, end) by absolute position.
+        
+        Returns:
+            numpy.ndarray: The samples (start is clipped to the oldest one held)
+        """
+        with self.condition:
+            start = max(start, self.oldest)
+            end = min(end, self.position)
+            if end <= start:
+                return np.zeros(0, dtype=np.int16)
+            index = np.arange(start, end) % self.capacity
+            return self.data[index]
+    
+    def wait_for(self, position, timeout=None):
+        """Block until the buffer holds samples up to position; False on timeout."""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.position >= position, timeout)
+
+
+class VADSegmenter:
+    def __init__(self, ring, sample_rate, frame_ms=20, pre_roll_ms=300, hangover_ms=600,
+                 min_speech_ms=150, max_speech_seconds=10.0, estimator=None):
+        """
+        Cut utterances out of a ring buffer with energy-based voice activity detection.
+        
+        Each segmenter keeps its own cursor, so several can read one buffer.
+        
+        Args:
+            ring (AudioRingBuffer): Audio source
+            sample_rate (int): Rate of the samples in ring
+            frame_ms (int): Analysis frame length
+            pre_roll_ms (int): Audio kept from before the detected onset
+            hangover_ms (int): Silence that ends an utterance
+            min_speech_ms (int): Shorter bursts are discarded
+            max_speech_seconds (float): Utterances are cut at this length
+            estimator (NoiseFloorEstimator): Noise floor tracker (a new one by default)
+        """
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.frame = int(sample_rate * frame_ms / 1000)
+        self.pre_roll = int(sample_rate * pre_roll_ms / 1000)
+        self.hangover_frames = max(1, int(hangover_ms / frame_ms))
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.max_speech = int(sample_rate * max_speech_seconds)
+        self.estimator = estimator or NoiseFloorEstimator()
+        self.cursor = ring.position
+    
+    def skip_to_now(self):
+        """Ignore everything buffered so far."""
+        self.cursor = self.ring.position
+    
+    def next_segment(self, timeout=None):
+        """
+        Wait for the next utterance.
+        
+        Args:
+            timeout (float): Give up if no speech starts within this many seconds
+            
+        Returns:
+            numpy.ndarray: int16 samples from pre-roll before onset to the end
+                           of speech, or None on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        onset = None
+        voiced = silent = 0
+        
+        while True:
+            if onset is None and deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+            else:
+                remaining = None
+            if not self.ring.wait_for(self.cursor + self.frame, remaining):
+                return None
+            
+            if self.cursor < self.ring.oldest:
+                print("Audio reader fell behind; skipping ahead")
+                self.cursor = self.ring.oldest
+                onset = None
+            
+            frame = self.ring.read(self.cursor, self.cursor + self.frame)
+            rms = self.estimator.update(frame, self.sample_rate)
+            threshold = self.estimator.threshold or 0.0
+            speech = rms > threshold
+            self.cursor += self.frame
+            
+            if onset is None:
+                if speech:
+                    onset = self.cursor - self.frame
+                    voiced, silent = 1, 0
+                continue
+            
+            if speech:
+                voiced += 1
+                silent = 0
+            else:
+                silent += 1
+            
+            too_long = self.cursor - onset >= self.max_speech
+            if silent >= self.hangover_frames or too_long:
+                if voiced >= self.min_speech_frames:
+                    return self.ring.read(onset - self.pre_roll, self.cursor)
+                onset = None
+
+
+class StreamingRecorder:
+    # Codecs for compressed output, chosen by file extension (encoded by ffmpeg)
+    CODECS = {'.flac': ['-c:a', 'flac'], '.opus': ['-c:a', 'libopus', '-b:a', '32k'],
+              '.ogg': ['-c:a', 'libopus', '-b:a', '32k']}
+    
+    def __init__(self, path, sample_rate, channels=1, max_queue_seconds=5.0, chunk_size=1024):
+        """
+        Write audio to disk as it arrives, from a writer thread.
+        
+        write() never blocks, so it is safe to call from a PyAudio callback;
+        memory is bounded by the queue no matter how long the recording is.
+        
+        Args:
+            path (str): Output file; .wav is written directly, .flac/.opus/.ogg
+                are encoded by ffmpeg
+            sample_rate (int): Audio sample rate in Hz
+            channels (int): Number of interleaved channels
+            max_queue_seconds (float): Audio that may wait for the writer before
+                chunks are dropped
+            chunk_size (int): Typical frames per write (sizes the queue)
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.queue = queue.Queue(maxsize=max(1, int(max_queue_seconds * sample_rate / chunk_size)))
+        self.frames_written = 0
+        self.chunks_dropped = 0
+        self.wav = None
+        self.encoder = None
+        self.thread = None
+        self.error = None
+    
+    @property
+    def seconds(self):
+        """Audio written so far in seconds."""
+        return self.frames_written / self.sample_rate
+    
+    def open(self):
+        """
+        Create the output file and start the writer thread.
+        
+        Returns:
+            bool: True if recording can start
+        """
+        extension = os.path.splitext(self.path)[1].lower()
+        try:
+            if extension in self.CODECS:
+                if not shutil.which('ffmpeg'):
+                    print(f"ffmpeg not found; cannot write {extension} files")
+                    return False
+                self.encoder = subprocess.Popen(
+                    ['ffmpeg', '-loglevel', 'error', '-y', '-f', 's16le', '-ar', str(self.sample_rate),
+                     '-ac', str(self.channels), '-i', 'pipe:0'] + self.CODECS[extension] + [self.path],
+                    stdin=subprocess.PIPE
+                )
+            else:
+                self.wav = wave.open(self.path, 'wb')
+                self.wav.setnchannels(self.channels)
+                self.wav.setsampwidth(2)
+                self.wav.setframerate(self.sample_rate)
+        except Exception as e:
+            print(f"Error opening {self.path}: {e}")
+            return False
+        
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return True
+    
+    def write(self, data):
+        """Queue a chunk of raw 16-bit audio; drops it if the writer has fallen behind."""
+        try:
+            self.queue.put_nowait(data)
+        except queue.Full:
+            self.chunks_dropped += 1
+    
+    def _run(self):
+        """Writer thread: move queued chunks to the file until close() sends None."""
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            if self.error:
+                continue  # keep draining so write() never sees a full queue
+            try:
+                if self.wav:
+                    # wave rewrites the header length on every call, so the
+                    # file is valid even if the process dies mid-recording
+                    self.wav.writeframes(data)
+                else:
+                    self.encoder.stdin.write(data)
+                self.frames_written += len(data) // (2 * self.channels)
+            except Exception as e:
+                self.error = e
+                print(f"Error writing {self.path}: {e}")
+    
+    def close(self):
+        """
+        Flush queued audio and finish the file.
+        
+        Returns:
+            str: Path to the file, or None if writing failed
+        """
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        if self.wav:
+            self.wav.close()
+            self.wav = None
+        if self.encoder:
+            self.encoder.stdin.close()
+            if self.encoder.wait() != 0 and not self.error:
+                self.error = RuntimeError(f"ffmpeg exited with code {self.encoder.returncode}")
+            self.encoder = None
+        if self.chunks_dropped:
+            print(f"Warning: {self.chunks_dropped} audio chunks dropped (disk too slow)")
+        return None if self.error else self.path
+
+
+class CommandDispatcher:
+    POLICIES = ('queue', 'drop', 'coalesce')
+    
+    def __init__(self, callback, num_workers=1, policy='queue', max_pending=8):
+        """
+        Run command handlers on worker threads so listening never waits for them.
+        
+        Args:
+            callback (function): Handler called with each recognised text
+            num_workers (int): Handler threads (commands may run concurrently if > 1)
+            policy (str): What to do with commands that arrive while every worker is busy:
+                'queue' - keep them in order (up to max_pending; the oldest waiting
+                          one is discarded past that)
+                'drop' - discard them
+                'coalesce' - keep only the latest one
+            max_pending (int): Waiting commands kept by the 'queue' policy (None for unlimited)
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown dispatch policy: {policy} (expected one of {', '.join(self.POLICIES)})")
+        self.callback = callback
+        self.num_workers = num_workers
+        self.policy = policy
+        self.max_pending = max_pending
+        
+        self.pending = collections.deque()
+        self.condition = threading.Condition()
+        self.busy = 0
+        self.workers = []
+        self.running = False
+        self.stats = {'received': 0, 'handled': 0, 'failed': 0, 'dropped': 0, 'coalesced': 0}
+    
+    def start(self):
+        """Start the worker threads."""
+        if self.running:
+            return
+        self.running = True
+        self.workers = [
+            threading.Thread(target=self._worker_loop, name=f"CommandWorker-{i}", daemon=True)
+            for i in range(self.num_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+    
+    def submit(self, text):
+        """
+        Hand a recognised command to the workers (never blocks).
+        
+        Returns:
+            bool: False if the command was discarded by the policy
+        """
+        if not self.running:
+            self.start()
+        
+        with self.condition:
+            self.stats['received'] += 1
+            saturated = self.busy + len(self.pending) >= self.num_workers
+            if saturated and self.policy == 'drop':
+                self.stats['dropped'] += 1
+                print(f"Command dropped (handler busy): {text}")
+                return False
+            if saturated and self.policy == 'coalesce' and self.pending:
+                self.stats['coalesced'] += len(self.pending)
+                self.pending.clear()
+            elif self.policy == 'queue' and self.max_pending is not None and len(self.pending) >= self.max_pending:
+                stale = self.pending.popleft()
+                self.stats['dropped'] += 1
+                print(f"Command queue full; discarding: {stale[0]}")
+            self.pending.append((text, time.monotonic()))
+            self.condition.notify()
+        return True
+    
+    def _worker_loop(self):
+        """Worker thread: run queued commands until stopped."""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or not self.running)
+                if not self.pending:
+                    return
+                text, heard_at = self.pending.popleft()
+                self.busy += 1
+            
+            waited = time.monotonic() - heard_at
+            if waited > 1.0:
+                print(f"Handling command queued {waited:.1f}s ago: {text}")
+            try:
+                self.callback(text)
+                self.stats['handled'] += 1
+            except Exception as e:
+                # A failing handler must not stop later commands
+                self.stats['failed'] += 1
+                print(f"Error handling command '{text}': {e}")
+            finally:
+                with self.condition:
+                    self.busy -= 1
+                    self.condition.notify_all()
+    
+    def wait_idle(self, timeout=None):
+        """Block until every submitted command has been handled; False on timeout."""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.busy, timeout)
+    
+    def stop(self, drain=True, timeout=None):
+        """
+        Stop the workers.
+        
+        Args:
+            drain (bool): Handle commands still waiting first (otherwise they are discarded)
+            timeout (float): Longest to wait in total for draining and running
+                handlers (None = until they finish); workers still busy after
+                that are left to finish on their own
+        """
+        if not self.running:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if drain:
+            self.wait_idle(timeout)
+        with self.condition:
+            self.running = False
+            if self.pending:
+                self.stats['dropped'] += len(self.pending)
+                self.pending.clear()
+            self.condition.notify_all()
+        for worker in self.workers:
+            worker.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        self.workers = []
+
+
 class Microphone:
-    def __init__(self, sample_rate=44100, channels=1, chunk_size=1024, device_index=3):
+    def __init__(self, sample_rate=44100, channels=1, chunk_size=1024, device_index=None,
+                 speech_rate=16000, hub=None):
         """
         Initialize the Microphone for audio recording and speech recognition.
         
+        Audio comes from the shared AudioHub, which keeps one input stream open
+        for every user in the process (wake word detection included). The
+        device settings only apply if this is the first user of the hub; a
+        warning is printed if they differ from the running hub's.
+        
         Args:
             sample_rate (int): Audio sample rate in Hz (44100 for HyperX SoloCast)
             channels (int): Number of audio channels (1 for mono, 2 for stereo)
             chunk_size (int): Number of frames per buffer
-            device_index (int): PyAudio device index (3 for HyperX SoloCast)
+            device_index (int or str): PyAudio device index or part of the device
+                name, e.g. "SoloCast" (None = BAYMIN_MIC_DEVICE, else the default device)
+            speech_rate (int): Rate speech is resampled to as it is captured for
+                recognition (None = keep the device rate); recordings keep sample_rate
+            hub (AudioHub): Hub to use instead of the shared one
         """
-        self.sample_rate = sample_rate
-        self.channels = channels
-        self.chunk_size = chunk_size
-        self.device_index = device_index
+        from Peripherals.audio_hub import get_hub
+        
+        self.hub = hub or get_hub(device=device_index, sample_rate=sample_rate, channels=channels,
+                                  chunk_size=chunk_size, speech_rate=speech_rate)
+        self.sample_rate = self.hub.sample_rate
+        self.speech_rate = self.hub.speech_rate
+        self.channels = self.hub.channels
+        self.chunk_size = self.hub.chunk_size
+        self.device_index = self.hub.device
         self.format = pyaudio.paInt16  # 16-bit audio
         
-        self.audio = None
-        self.stream = None
+        self.attached = False
         self.recognizer = sr.Recognizer()
+        self.noise_floor = None
+        
+        # Utterances from the hub's speech buffer (see start_capture)
+        self.segmenter = None
+        
+        # Streaming-to-disk recording (see start_recording)
+        self.recorder = None
+        self.record_frames = 0
+        self.record_limit = None
+        self.record_done = threading.Event()
+        self.record_lock = threading.Lock()
+        self.last_recording = None
         
     def initialize(self):
-        """Initialize PyAudio."""
-        try:
-            self.audio = pyaudio.PyAudio()
-            print("Microphone initialized")
+        """Start using the shared audio input."""
+        if self.attached:
             return True
-        except Exception as e:
-            print(f"Error initializing microphone: {e}")
-            return False
+        self.attached = self.hub.attach()
+        if self.attached:
+            print("Microphone initialized")
+        else:
+            print("Error initializing microphone")
+        return self.attached
     
-    def record_audio(self, duration, save_path=None, filename=None):
+    def record_audio(self, duration, save_path=None, filename=None, streaming=False):
         """
         Record audio for a specified duration.
         
         Args:
-            duration (int): Recording duration in seconds
+            duration (int): Recording duration in seconds (None = until
+                stop_recording() when streaming)
             save_path (str): Directory to save the audio file
-            filename (str): Filename for the audio (auto-generated if None)
+            filename (str): Filename for the audio (auto-generated if None);
+                .flac/.opus/.ogg are compressed when streaming
+            streaming (bool): Write to disk while recording instead of keeping
+                the audio in memory; another thread can end it early with
+                stop_recording()
             
         Returns:
             str: Path to saved audio file, or None if failed
         """
-        if not self.audio:
-            if not self.initialize():
+        if streaming:
+            if not self.start_recording(save_path, filename, max_seconds=duration):
                 return None
+            self.record_done.wait()
+            return self.stop_recording()
         
-        try:
-            print(f"Recording for {duration} seconds...")
-            
-            # Open stream
-            self.stream = self.audio.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=self.device_index,
-                frames_per_buffer=self.chunk_size
-            )
-            
-            frames = []
-            
-            # Calculate number of chunks to record
-            chunks_to_record = int(self.sample_rate / self.chunk_size * duration)
-            
-            # Record
-            for _ in range(chunks_to_record):
-                data = self.stream.read(self.chunk_size)
-                frames.append(data)
-            
-            print("Recording complete")
-            
-            # Stop and close stream
-            self.stream.stop_stream()
-            self.stream.close()
-            self.stream = None
-            
-            # Save to file if path provided
-            if save_path or filename:
-                return self._save_audio(frames, save_path, filename)
-            
-            return frames
-            
-        except Exception as e:
-            print(f"Error recording audio: {e}")
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
+        if not self.initialize():
             return None
-    
-    def _save_audio(self, frames, save_path=None, filename=None):
-        """Save recorded audio frames to a WAV file."""
-        # Generate filename if not provided
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"recording_{timestamp}.wav"
         
-        # Set default save path
-        if save_path is None:
-            save_path = "/tmp"
+        print(f"Recording for {duration} seconds...")
         
-        # Create directory if it doesn't exist
-        os.makedirs(save_path, exist_ok=True)
+        frames = []
         
-        # Full filepath
-        filepath = os.path.join(save_path, filename)
+        # Calculate number of chunks to record
+        chunks_to_record = int(self.sample_rate / self.chunk_size * duration)
+        done = threading.Event()
+        
+        def collect(data, frame_count):
+            if len(frames) < chunks_to_record:
+                frames.append(data)
+            if len(frames) >= chunks_to_record:
+                done.set()
+        
+        # Record from the shared stream
+        self.hub.add_tap(collect)
+        try:
+            if not done.wait(duration + 5):
+                print("Error recording audio: no audio from the input device")
+                return None
+        finally:
+            self.hub.remove_tap(collect)
+        
+        print("Recording complete")
+        
+        # Save to file if path provided
+        if save_path or filename:
+            return self._save_audio(frames, save_path, filename)
+        
+        return frames
+    
+    def _save_audio(self, frames, save_path=None, filename=None):
+        """Save recorded audio frames to a WAV file."""
+        filepath = self._recording_path(save_path, filename)
         
         try:
             # Save as WAV file
             with wave.open(filepath, 'wb') as wf:
                 wf.setnchannels(self.channels)
-                wf.setsampwidth(self.audio.get_sample_size(self.format))
+                wf.setsampwidth(pyaudio.get_sample_size(self.format))
                 wf.setframerate(self.sample_rate)
                 wf.writeframes(b''.join(frames))
             
@@ -127,6 +734,130 @@ class Microphone:
             print(f"Error saving audio: {e}")
             return None
     
+    def _recording_path(self, save_path=None, filename=None):
+        """Output path for a recording; the filename is generated and the directory created as needed."""
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"recording_{timestamp}.wav"
+        if save_path is None:
+            save_path = "/tmp"
+        os.makedirs(save_path, exist_ok=True)
+        return os.path.join(save_path, filename)
+    
+    def _on_record(self, in_data, frame_count):
+        """Hub tap: hand the block to the disk writer."""
+        recorder = self.recorder
+        if recorder is None or self.record_done.is_set():
+            return
+        recorder.write(in_data)
+        self.record_frames += frame_count
+        if self.record_limit is not None and self.record_frames >= self.record_limit:
+            self.record_done.set()
+    
+    def start_recording(self, save_path=None, filename=None, max_seconds=None):
+        """
+        Start recording straight to disk in the background.
+        
+        Args:
+            save_path (str): Directory to save the audio file
+            filename (str): Filename (auto-generated .wav if None); the extension
+                picks the format: .wav, .flac, .opus or .ogg
+            max_seconds (float): Stop automatically after this long (None = until stopped)
+            
+        Returns:
+            bool: True if recording started
+        """
+        if self.recorder:
+            print("Already recording")
+            return False
+        if not self.initialize():
+            return False
+        
+        recorder = StreamingRecorder(self._recording_path(save_path, filename),
+                                     self.sample_rate, self.channels, chunk_size=self.chunk_size)
+        if not recorder.open():
+            return False
+        
+        self.recorder = recorder
+        self.record_frames = 0
+        self.record_limit = int(self.sample_rate * max_seconds) if max_seconds else None
+        self.record_done.clear()
+        self.hub.add_tap(self._on_record)
+        
+        print(f"Recording to {recorder.path}" + (f" for {max_seconds} seconds..." if max_seconds else "..."))
+        return True
+    
+    def stop_recording(self):
+        """
+        Stop a recording started with start_recording (safe to call from any
+        thread, and more than once).
+        
+        Returns:
+            str: Path to the saved audio file, or None if failed
+        """
+        with self.record_lock:
+            if self.recorder is None:
+                return self.last_recording
+            self.hub.remove_tap(self._on_record)
+            recorder, self.recorder = self.recorder, None
+            self.last_recording = recorder.close()
+            self.record_done.set()
+        
+        if self.last_recording:
+            print(f"Recording complete: {recorder.seconds:.1f}s saved to {self.last_recording}")
+        return self.last_recording
+    
+    def start_capture(self, pre_roll_ms=300, hangover_ms=600):
+        """
+        Start cutting utterances out of the hub's continuously filled buffer.
+        
+        listen_for_command then takes utterances from the buffer (including
+        audio from just before speech was detected), and speech that arrives
+        between calls is kept rather than lost.
+        
+        Args:
+            pre_roll_ms (int): Audio kept from before each detected onset
+            hangover_ms (int): Silence that ends an utterance
+            
+        Returns:
+            bool: True if audio is being captured
+        """
+        if self.segmenter:
+            return True
+        if not self.initialize():
+            return False
+        self.segmenter = self.hub.segmenter(pre_roll_ms=pre_roll_ms, hangover_ms=hangover_ms,
+                                            estimator=self.noise_floor)
+        self.noise_floor = self.segmenter.estimator
+        print("Continuous capture started")
+        return True
+    
+    def stop_capture(self):
+        """Stop following the hub's buffer (the shared stream keeps running for other users)."""
+        if self.segmenter:
+            self.segmenter = None
+            print("Continuous capture stopped")
+    
+    def next_utterance(self, timeout=None, max_seconds=None):
+        """
+        Get the next utterance from the continuous capture.
+        
+        Args:
+            timeout (float): Seconds to wait for speech to start (None = forever)
+            max_seconds (float): Cut the utterance at this length
+            
+        Returns:
+            sr.AudioData: Utterance with pre-roll, or None on timeout
+        """
+        if not self.segmenter and not self.start_capture():
+            return None
+        if max_seconds:
+            self.segmenter.max_speech = int(self.speech_rate * max_seconds)
+        samples = self.segmenter.next_segment(timeout)
+        if samples is None:
+            return None
+        return sr.AudioData(samples.tobytes(), self.speech_rate, 2)
+    
     def listen_for_command(self, timeout=5, phrase_time_limit=10):
         """
         Listen for a voice command and convert it to text.
@@ -139,14 +870,28 @@ class Microphone:
             str: Recognized text, or None if failed
         """
         try:
-            with sr.Microphone(
-                sample_rate=self.sample_rate,
-                device_index=self.device_index
-            ) as source:
+            if self.segmenter:
+                print("Listening for command...")
+                audio = self.next_utterance(timeout=timeout, max_seconds=phrase_time_limit)
+                if audio is None:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                print("Processing speech...")
+                text = self.recognizer.recognize_google(audio)
+                print(f"Recognized: {text}")
+                return text
+            
+            # Stay attached so the shared device isn't reopened for every command
+            if not self.initialize():
+                return None
+            
+            with self.hub.source("command") as source:
                 print("Listening for command...")
                 
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                # Calibrate once; afterwards the noise floor is tracked from
+                # the audio being listened to, with no dead time
+                if self.noise_floor is None:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                self.noise_floor = track_noise_floor(self.recognizer, source, self.noise_floor)
                 
                 # Listen for audio
                 audio = self.recognizer.listen(
@@ -175,16 +920,36 @@ class Microphone:
             print(f"Error listening for command: {e}")
             return None
     
-    def listen_continuously(self, callback, timeout=None):
+    def listen_continuously(self, callback, timeout=None, policy='queue', workers=1, max_pending=8,
+                            drain_timeout=5.0):
         """
         Continuously listen for commands and call callback function with recognized text.
         
+        The callback runs on worker threads (see CommandDispatcher) while audio
+        keeps being captured into the ring buffer, so a slow handler doesn't
+        stop listening and commands spoken meanwhile aren't lost.
+        
         Args:
             callback (function): Function to call with recognized text
             timeout (int): Stop after this many seconds (None for infinite)
+            policy (str): 'queue', 'drop' or 'coalesce' for commands heard while
+                the handler is busy; None calls callback inline (blocking)
+            workers (int): Handler threads
+            max_pending (int): Waiting commands kept by the 'queue' policy
+            drain_timeout (float): On timeout, seconds to let waiting commands
+                finish before returning (Ctrl+C discards them and only waits
+                this long for running handlers)
         """
         print("Starting continuous listening... (Press Ctrl+C to stop)")
         
+        dispatcher = None
+        if policy:
+            dispatcher = CommandDispatcher(callback, num_workers=workers, policy=policy,
+                                           max_pending=max_pending)
+            dispatcher.start()
+        started_capture = not self.segmenter and self.start_capture()
+        interrupted = False
+        
         try:
             start_time = datetime.now()
             
@@ -197,21 +962,28 @@ class Microphone:
                 text = self.listen_for_command(timeout=5)
                 
                 if text:
-                    callback(text)
+                    if dispatcher:
+                        dispatcher.submit(text)
+                    else:
+                        callback(text)
                     
         except KeyboardInterrupt:
+            interrupted = True
             print("\nStopped listening")
+        finally:
+            if started_capture:
+                self.stop_capture()
+            if dispatcher:
+                dispatcher.stop(drain=not interrupted, timeout=drain_timeout)
+                print(f"Commands: {dispatcher.stats}")
     
     def release(self):
         """Release audio resources."""
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-            self.stream = None
-        
-        if self.audio:
-            self.audio.terminate()
-            self.audio = None
+        self.stop_recording()
+        self.stop_capture()
+        if self.attached:
+            self.attached = False
+            self.hub.detach()
             print("Microphone released")
     
     def __del__(self):
@@ -225,17 +997,26 @@ if __name__ == "__main__":
     
     # Example 1: Record audio for 5 seconds
     # audio_file = mic.record_audio(duration=5, save_path="/tmp", filename="test.wav")
+    # Long recordings: stream to disk (compressed via ffmpeg), stop any time
+    # audio_file = mic.record_audio(duration=3600, filename="lecture.opus", streaming=True)
     
     # Example 2: Listen for a voice command
     command = mic.listen_for_command(timeout=10)
     if command:
         print(f"You said: {command}")
     
-    # Example 3: Continuous listening
+    # Example 3: Follow the shared buffer; commands keep their pre-roll and
+    # speech between calls isn't lost
+    # mic.start_capture(pre_roll_ms=300)
+    # print(mic.listen_for_command(timeout=10))
+    
+    # Example 4: Continuous listening
     # def handle_command(text):
     #     print(f"Command received: {text}")
     # 
     # mic.listen_continuously(callback=handle_command, timeout=60)
+    # Slow handler: keep only the latest command heard while it runs
+    # mic.listen_continuously(callback=handle_command, policy='coalesce')
     
     # Release resources
     mic.release() 
\ No newline at end of file
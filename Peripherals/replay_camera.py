@@ -0,0 +1,282 @@
+"""
+Replayable fake camera for deterministic benchmarks
+Replays a video file or a directory of images through the Camera interface
+so capture code can run on a headless box without a physical webcam
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import random
+import time
+
+from Peripherals.camera import Camera
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+
+
+class FrameReplay:
+    def __init__(self, source, fps=30.0, jitter=0.0, drop_rate=0.0,
+                 loop=True, realtime=True, seed=0):
+        """
+        Frame source with the subset of the cv2.VideoCapture API used by Camera.
+
+        Args:
+            source (str): Path to a video file or a directory of images
+            fps (float): Replay frame rate
+            jitter (float): Maximum extra delay per frame in seconds
+            drop_rate (float): Probability (0-1) that a read fails like a dropped frame
+            loop (bool): Restart from the first frame when the source is exhausted
+            realtime (bool): Pace reads to the frame rate like a live camera
+            seed (int): Seed for the jitter/drop random generator
+        """
+        self.source = source
+        self.fps = fps
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.loop = loop
+        self.realtime = realtime
+        self.rng = random.Random(seed)
+
+        self.width = None
+        self.height = None
+        self.image_paths = []
+        self.video = None
+        self.opened = False
+
+        self.start_time = None
+        self.last_index = -1
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.frames_skipped = 0
+
+        self._open()
+
+    def _open(self):
+        """Open the replay source."""
+        if os.path.isdir(self.source):
+            self.image_paths = sorted(
+                os.path.join(self.source, name)
+                for name in os.listdir(self.source)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+            self.opened = len(self.image_paths) > 0
+        elif os.path.isfile(self.source):
+            self.video = cv2.VideoCapture(self.source)
+            self.opened = self.video.isOpened()
+
+        if not self.opened:
+            print(f"Error: Could not open replay source: {self.source}")
+
+    def _frame_count(self):
+        """Number of frames in the source (0 if unknown)."""
+        if self.image_paths:
+            return len(self.image_paths)
+        if self.video is not None:
+            return int(self.video.get(cv2.CAP_PROP_FRAME_COUNT))
+        return 0
+
+    def _next_index(self):
+        """Pick the next frame index, sleeping until it is due in realtime mode."""
+        if not self.realtime:
+            return self.last_index + 1
+
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+
+        # A live camera delivers the newest frame, so slow readers skip frames
+        index = max(self.last_index + 1, int((now - self.start_time) * self.fps))
+        due = self.start_time + index / self.fps
+        if self.jitter > 0:
+            due += self.rng.uniform(0, self.jitter)
+
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        return index
+
+    def _load_frame(self, index):
+        """Load frame number index from the source, or None past the end."""
+        count = self._frame_count()
+        if count and index >= count:
+            if not self.loop:
+                return None
+            index %= count
+
+        if self.image_paths:
+            return cv2.imread(self.image_paths[index])
+
+        # Only seek when not reading sequentially
+        if int(self.video.get(cv2.CAP_PROP_POS_FRAMES)) != index:
+            self.video.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ret, frame = self.video.read()
+        return frame if ret else None
+
+    def read(self):
+        """
+        Read the next frame.
+
+        Returns:
+            tuple: (success, frame) like cv2.VideoCapture.read()
+        """
+        if not self.opened:
+            return False, None
+
+        index = self._next_index()
+        self.frames_skipped += index - self.last_index - 1
+        self.last_index = index
+
+        if self.drop_rate > 0 and self.rng.random() < self.drop_rate:
+            self.frames_dropped += 1
+            return False, None
+
+        frame = self._load_frame(index)
+        if frame is None:
+            return False, None
+
+        if self.width and self.height and frame.shape[:2] != (self.height, self.width):
+            frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+
+        self.frames_read += 1
+        return True, frame
+
+    def set(self, prop, value):
+        """Record the requested resolution; other properties are ignored."""
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        else:
+            return False
+        return True
+
+    def get(self, prop):
+        """Return a capture property like cv2.VideoCapture.get()."""
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width or 0)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height or 0)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self._frame_count())
+        return 0.0
+
+    def isOpened(self):
+        """Check whether the replay source is open."""
+        return self.opened
+
+    def release(self):
+        """Close the replay source."""
+        if self.video is not None:
+            self.video.release()
+            self.video = None
+        self.opened = False
+
+    def get_stats(self):
+        """
+        Get replay statistics.
+
+        Returns:
+            dict: Frames read, dropped and skipped by slow readers
+        """
+        return {
+            'frames_read': self.frames_read,
+            'frames_dropped': self.frames_dropped,
+            'frames_skipped': self.frames_skipped
+        }
+
+
+class ReplayCamera(Camera):
+    def __init__(self, source, fps=30.0, jitter=0.0, drop_rate=0.0, loop=True,
+                 realtime=True, seed=0, resolution=(640, 480)):
+        """
+        Drop-in Camera replacement that replays recorded frames.
+
+        Args:
+            source (str): Path to a video file or a directory of images
+            fps (float): Replay frame rate
+            jitter (float): Maximum extra delay per frame in seconds
+            drop_rate (float): Probability (0-1) that a read fails like a dropped frame
+            loop (bool): Restart from the first frame when the source is exhausted
+            realtime (bool): Pace reads to the frame rate (False replays as fast as possible)
+            seed (int): Seed for jitter/drop injection so runs are reproducible
+            resolution (tuple): Output resolution (width, height)
+        """
+        super().__init__(camera_index=None, resolution=resolution)
+        self.source = source
+        self.fps = fps
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.loop = loop
+        self.realtime = realtime
+        self.seed = seed
+
+    def _open_capture(self):
+        """Open the replay source instead of a webcam."""
+        return FrameReplay(
+            self.source,
+            fps=self.fps,
+            jitter=self.jitter,
+            drop_rate=self.drop_rate,
+            loop=self.loop,
+            realtime=self.realtime,
+            seed=self.seed
+        )
+
+    def get_stats(self):
+        """
+        Get replay statistics for the open source.
+
+        Returns:
+            dict: Frames read, dropped and skipped, or empty dict if not open
+        """
+        if self.camera is None:
+            return {}
+        return self.camera.get_stats()
+
+
+def main():
+    """Benchmark capture latency against a replayed source."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Replay camera capture benchmark')
+    parser.add_argument('source', help='Video file or directory of images')
+    parser.add_argument('--fps', type=float, default=30.0, help='Replay frame rate')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Max extra delay per frame (s)')
+    parser.add_argument('--drop', type=float, default=0.0, help='Dropped frame probability')
+    parser.add_argument('--frames', type=int, default=100, help='Frames to capture')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    args = parser.parse_args()
+
+    camera = ReplayCamera(args.source, fps=args.fps, jitter=args.jitter,
+                          drop_rate=args.drop, seed=args.seed)
+    if not camera.initialize():
+        sys.exit(1)
+
+    latencies = []
+    failures = 0
+    for _ in range(args.frames):
+        start = time.perf_counter()
+        frame = camera.capture_image()
+        latencies.append((time.perf_counter() - start) * 1000)
+        if frame is None:
+            failures += 1
+
+    latencies.sort()
+    print(f"\nFrames: {args.frames}, failed reads: {failures}")
+    print(f"Capture latency: mean {sum(latencies) / len(latencies):.2f} ms, "
+          f"p50 {latencies[len(latencies) // 2]:.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms")
+    print(f"Replay stats: {camera.get_stats()}")
+
+    camera.release()
+
+
+if __name__ == "__main__":
+    main()
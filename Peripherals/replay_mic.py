@@ -0,0 +1,222 @@
+"""
+Replayable fake microphone for deterministic wake benchmarks
+Replays WAV files through the speech_recognition AudioSource interface,
+separated by silence and optionally mixed with noise, so the wake loop can
+run on a headless box without a physical microphone
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+import wave
+
+import numpy as np
+import speech_recognition as sr
+
+_WAV_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def load_wav(path, sample_rate):
+    """
+    Read a WAV file as mono 16-bit samples at the given rate.
+
+    Args:
+        path (str): WAV file (8, 16 or 32-bit PCM)
+        sample_rate (int): Rate to resample to
+
+    Returns:
+        numpy.ndarray: float32 samples in 16-bit range
+    """
+    with wave.open(path, 'rb') as wf:
+        width, channels, rate = wf.getsampwidth(), wf.getnchannels(), wf.getframerate()
+        data = wf.readframes(wf.getnframes())
+    if width not in _WAV_DTYPES:
+        raise ValueError(f"Unsupported sample width in {path}: {width * 8}-bit")
+
+    samples = np.frombuffer(data, dtype=_WAV_DTYPES[width]).astype(np.float32)
+    if width == 1:
+        samples = (samples - 128) * 256
+    elif width == 4:
+        samples /= 65536
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate and len(samples):
+        count = int(round(len(samples) * sample_rate / rate))
+        samples = np.interp(np.arange(count) * rate / sample_rate,
+                            np.arange(len(samples)), samples).astype(np.float32)
+    return samples
+
+
+def _rms(samples):
+    return float(np.sqrt(np.mean(samples.astype(np.float64) ** 2))) if len(samples) else 0.0
+
+
+def build_timeline(clips, sample_rate, gap=1.0, lead_in=None, noise=None, snr_db=None, seed=0):
+    """
+    Lay clips out one after another with silence between them.
+
+    Args:
+        clips (list): WAV paths, or (path, label) tuples
+        sample_rate (int): Output rate
+        gap (float or tuple): Seconds of silence between clips, or a (min, max) range
+        lead_in (float): Silence before the first clip (default: same as gap)
+        noise (str): WAV file mixed in under everything (looped); None = white noise
+        snr_db (float): Speech-to-noise ratio of the mix (None = no noise)
+        seed (int): Seed for gap lengths and white noise
+
+    Returns:
+        tuple: (samples as int16, events) where each event is
+               {'file', 'label', 'start', 'end'} in seconds from the start
+    """
+    rng = random.Random(seed)
+
+    def silence_seconds():
+        return rng.uniform(*gap) if isinstance(gap, (tuple, list)) else gap
+
+    pieces = [np.zeros(int(sample_rate * (silence_seconds() if lead_in is None else lead_in)), np.float32)]
+    position = len(pieces[0])
+    events = []
+    speech_levels = []
+    for clip in clips:
+        path, label = clip if isinstance(clip, (tuple, list)) else (clip, None)
+        samples = load_wav(path, sample_rate)
+        events.append({'file': path, 'label': label,
+                       'start': position / sample_rate, 'end': (position + len(samples)) / sample_rate})
+        speech_levels.append(_rms(samples))
+        pieces.append(samples)
+        pieces.append(np.zeros(int(sample_rate * silence_seconds()), np.float32))
+        position += len(samples) + len(pieces[-1])
+    mix = np.concatenate(pieces)
+
+    if snr_db is not None and speech_levels:
+        if noise:
+            background = load_wav(noise, sample_rate)
+            background = np.resize(background, len(mix))  # loops a short noise file
+        else:
+            background = np.random.default_rng(seed).standard_normal(len(mix)).astype(np.float32)
+        level = _rms(background)
+        if level > 0:
+            target = float(np.mean(speech_levels)) / (10 ** (snr_db / 20))
+            mix += background * (target / level)
+
+    return np.clip(np.round(mix), -32768, 32767).astype(np.int16), events
+
+
+class AudioReplay:
+    def __init__(self, samples, sample_rate, realtime=True, loop=False):
+        """
+        Audio stream with the subset of the PyAudio stream API used by
+        speech_recognition and the wake loop.
+
+        Args:
+            samples (numpy.ndarray): int16 mono audio to replay
+            sample_rate (int): Replay rate
+            realtime (bool): Pace reads like a live microphone
+            loop (bool): Restart from the beginning when the audio runs out
+                (otherwise silence follows)
+        """
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.loop = loop
+        self.position = 0
+        self.start_time = None
+        self.active = True
+
+    @property
+    def finished(self):
+        """True once all of the audio has been read (never when looping)."""
+        return not self.loop and self.position >= len(self.samples)
+
+    @property
+    def seconds(self):
+        """Replay clock: seconds of audio delivered so far."""
+        return self.position / self.sample_rate
+
+    def read(self, size, exception_on_overflow=True):
+        """Read the next size samples as raw 16-bit bytes, blocking in realtime mode."""
+        if self.realtime:
+            now = time.perf_counter()
+            if self.start_time is None:
+                self.start_time = now
+            delay = self.start_time + (self.position + size) / self.sample_rate - now
+            if delay > 0:
+                time.sleep(delay)
+
+        if self.loop and len(self.samples):
+            indices = np.arange(self.position, self.position + size) % len(self.samples)
+            chunk = self.samples[indices]
+        else:
+            chunk = self.samples[self.position:self.position + size]
+            if len(chunk) < size:
+                chunk = np.concatenate([chunk, np.zeros(size - len(chunk), np.int16)])
+        self.position += size
+        return chunk.tobytes()
+
+    def get_read_available(self):
+        """Samples a live stream would have buffered by now."""
+        if not self.realtime or self.start_time is None:
+            return 0
+        due = int((time.perf_counter() - self.start_time) * self.sample_rate)
+        return max(0, due - self.position)
+
+    def is_active(self):
+        return self.active
+
+    def stop_stream(self):
+        self.active = False
+
+    def close(self):
+        self.active = False
+
+
+class ReplayMicrophone(sr.AudioSource):
+    def __init__(self, clips, sample_rate=16000, chunk_size=1024, gap=1.0, lead_in=None,
+                 noise=None, snr_db=None, realtime=True, loop=False, seed=0):
+        """
+        Drop-in sr.Microphone replacement that replays WAV files.
+
+        Args:
+            clips (list): WAV paths, or (path, label) tuples
+            sample_rate (int): Replay rate
+            chunk_size (int): Samples per read (like sr.Microphone's chunk_size)
+            gap (float or tuple): Seconds of silence between clips, or a (min, max) range
+            lead_in (float): Silence before the first clip (default: same as gap)
+            noise (str): WAV file mixed in under everything; None = white noise
+            snr_db (float): Speech-to-noise ratio (None = no noise)
+            realtime (bool): Pace reads to the sample rate (False replays as fast as possible)
+            loop (bool): Restart when the audio runs out
+            seed (int): Seed for gaps and noise so runs are reproducible
+        """
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk_size
+        self.format = None
+        self.stream = None
+        self.realtime = realtime
+        self.loop = loop
+        self.samples, self.events = build_timeline(clips, sample_rate, gap, lead_in, noise, snr_db, seed)
+
+    @property
+    def duration(self):
+        """Length of the replayed audio in seconds."""
+        return len(self.samples) / self.SAMPLE_RATE
+
+    def __enter__(self):
+        self.stream = AudioReplay(self.samples, self.SAMPLE_RATE, self.realtime, self.loop)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream.close()
+        self.stream = None
+
+    def save(self, path):
+        """Write the replayed mix to a WAV file (for listening to what was tested)."""
+        with wave.open(path, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.SAMPLE_RATE)
+            wf.writeframes(self.samples.tobytes())
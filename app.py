@@ -2,19 +2,25 @@ import cv2
 import tkinter as tk
 from tkinter import messagebox
 from PIL import Image, ImageTk
-from datetime import datetime
-import os
+import time
+
+from Peripherals.frame_grabber import FrameGrabber
+from Functions.CaptureStorage import CaptureStorage
 
 
 class WebcamApp:
-    def __init__(self, root):
+    def __init__(self, root, display_fps=30, preview_width=480):
         self.root = root
         self.root.title("Webcam Photo Capture")
         
-        # Create captures directory if it doesn't exist
+        # Redraw at the display rate; capture runs independently on a worker thread
+        self.frame_interval = 1.0 / display_fps
+        self.preview_width = preview_width
+        
+        # Captures are rotated and de-duplicated so the SD card never fills
         self.capture_dir = "captures"
-        if not os.path.exists(self.capture_dir):
-            os.makedirs(self.capture_dir)
+        self.storage = CaptureStorage(self.capture_dir)
+        self.storage.start_background_compaction()
         
         # Initialize webcam
         self.cap = cv2.VideoCapture(0)
@@ -24,6 +30,16 @@ class WebcamApp:
             self.root.destroy()
             return
         
+        # Capture on a worker thread; the full-resolution frame is kept for capture_photo
+        self.grabber = FrameGrabber(self.cap, preview_width=self.preview_width)
+        self.grabber.start()
+        
+        self.photo = None
+        self.shown_frame_id = 0
+        self.display_fps = 0.0
+        self.last_draw_time = None
+        self.next_draw_time = time.perf_counter()
+        
         # Create GUI elements
         self.video_label = tk.Label(root)
         self.video_label.pack(padx=10, pady=10)
@@ -43,6 +59,9 @@ class WebcamApp:
         self.info_label = tk.Label(root, text="", font=("Arial", 10))
         self.info_label.pack(pady=5)
         
+        self.fps_label = tk.Label(root, text="", font=("Arial", 9), fg="gray")
+        self.fps_label.pack(pady=(0, 5))
+        
         # Start video feed
         self.update_frame()
         
@@ -50,38 +69,50 @@ class WebcamApp:
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
     def update_frame(self):
-        """Update the video frame continuously"""
-        ret, frame = self.cap.read()
+        """Draw the latest preview frame, paced to the display rate"""
+        frame_id, preview = self.grabber.read_preview()
         
-        if ret:
-            # Convert from BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Store current frame for capture
-            self.current_frame = frame
+        # Only touch Tk when the worker has produced a new frame
+        if preview is not None and frame_id != self.shown_frame_id:
+            self.shown_frame_id = frame_id
+            img = Image.fromarray(preview)
             
-            # Convert to PIL Image
-            img = Image.fromarray(frame_rgb)
+            # Reuse one PhotoImage instead of allocating a new one per frame
+            if self.photo is None or self.photo.width() != img.width or self.photo.height() != img.height:
+                self.photo = ImageTk.PhotoImage(image=img)
+                self.video_label.configure(image=self.photo)
+            else:
+                self.photo.paste(img)
             
-            # Convert to ImageTk
-            imgtk = ImageTk.PhotoImage(image=img)
+            now = time.perf_counter()
+            if self.last_draw_time is not None:
+                instant = 1.0 / max(now - self.last_draw_time, 1e-6)
+                self.display_fps = 0.9 * self.display_fps + 0.1 * instant if self.display_fps else instant
+            self.last_draw_time = now
             
-            # Update label
-            self.video_label.imgtk = imgtk
-            self.video_label.configure(image=imgtk)
+            self.fps_label.config(
+                text=f"Camera {self.grabber.fps:.1f} fps | Display {self.display_fps:.1f} fps"
+            )
         
-        # Schedule next update
-        self.root.after(10, self.update_frame)
+        # Schedule next update on a fixed cadence so timing drift does not accumulate
+        now = time.perf_counter()
+        self.next_draw_time = max(self.next_draw_time + self.frame_interval, now)
+        delay_ms = max(1, int((self.next_draw_time - now) * 1000))
+        self.root.after(delay_ms, self.update_frame)
+    
+    def get_fps(self):
+        """Return the achieved (capture_fps, display_fps)"""
+        return self.grabber.fps, self.display_fps
     
     def capture_photo(self):
         """Capture and save the current frame"""
-        if hasattr(self, 'current_frame'):
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self.capture_dir}/photo_{timestamp}.jpg"
-            
+        frame_id, frame = self.grabber.read()
+        if frame is not None:
             # Save the image
-            cv2.imwrite(filename, self.current_frame)
+            filename = self.storage.save(frame, prefix="photo")
+            if filename is None:
+                self.info_label.config(text="Failed to save photo", fg="red")
+                return
             
             # Update info label
             self.info_label.config(text=f"Photo saved: {filename}", fg="green")
@@ -92,6 +123,8 @@ class WebcamApp:
     
     def on_closing(self):
         """Clean up resources when closing"""
+        self.grabber.stop()
+        self.storage.stop()
         if self.cap.isOpened():
             self.cap.release()
         self.root.destroy()